@@ -1,4 +1,4 @@
-"""GET /api/bookmakers - Return list of supported bookmakers."""
+"""GET /api/bookmakers - Return list of supported bookmakers (?regions=us,uk, default ODDS_REGIONS)."""
 
 import os
 import sys
@@ -6,8 +6,9 @@ import sys
 # Add parent directory to path for imports
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-from flask import Flask, jsonify
+from flask import Flask, jsonify, request
 from lib.markets import get_bookmakers_list
+from lib.regions import parse_regions
 
 app = Flask(__name__)
 
@@ -15,7 +16,7 @@ app = Flask(__name__)
 @app.route('/api/bookmakers', methods=['GET'])
 def get_bookmakers():
     try:
-        bookmakers = get_bookmakers_list()
+        bookmakers = get_bookmakers_list(parse_regions(request.args.get('regions')))
 
         response = jsonify({'bookmakers': bookmakers})
         response.headers.add('Access-Control-Allow-Origin', '*')
@@ -0,0 +1,83 @@
+"""
+GET /api/feed - Server-sent events with live changes to a sport's opportunities.
+
+Query: sport_key, bookmakers (optional, comma-separated keys; only
+opportunities placeable with them are sent). The first event is a 'snapshot'
+of every current opportunity; after that only 'delta' events with the
+opportunities added, changed or removed since the previous scan are sent.
+
+This function never scans. The feed is published to the shared store by one
+publisher process for the sports in FEED_SPORTS:
+
+    python api/feed.py
+
+The stream closes after FEED_STREAM_SECONDS so the function invocation ends;
+EventSource reconnects with Last-Event-ID and picks up the missed deltas.
+"""
+
+import os
+import sys
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from flask import Flask, Response, jsonify, request, stream_with_context
+from lib.feed import feed_bookmakers, feed_include_props, feed_sports, head_key, run_publisher, subscribe
+from lib.storage import shared_store
+
+app = Flask(__name__)
+
+STREAM_SECONDS = float(os.environ.get('FEED_STREAM_SECONDS', 55))
+
+
+@app.route('/api/feed', methods=['GET'])
+def feed():
+    try:
+        sport_key = request.args.get('sport_key')
+        bookmakers_list = [b for b in request.args.get('bookmakers', '').split(',') if b]
+
+        if not sport_key:
+            response = jsonify({'error': 'sport_key is required'})
+            response.status_code = 400
+            response.headers.add('Access-Control-Allow-Origin', '*')
+            return response
+
+        store = shared_store()
+        if not store.shared:
+            response = jsonify({'error': 'The live feed needs a shared store (KV_REST_API_URL)'})
+            response.status_code = 503
+            response.headers.add('Access-Control-Allow-Origin', '*')
+            return response
+
+        if store.get(head_key(sport_key)) is None:
+            response = jsonify({'error': f'No live feed is published for {sport_key}'})
+            response.status_code = 404
+            response.headers.add('Access-Control-Allow-Origin', '*')
+            return response
+
+        last_event_id = request.headers.get('Last-Event-ID') or request.args.get('since')
+        last_version = int(last_event_id) if last_event_id and last_event_id.isdigit() else None
+
+        events = subscribe(sport_key, last_version, bookmakers_list or None, max_seconds=STREAM_SECONDS, store=store)
+
+        response = Response(stream_with_context(events), mimetype='text/event-stream')
+        response.headers.add('Cache-Control', 'no-cache')
+        response.headers.add('X-Accel-Buffering', 'no')
+        response.headers.add('Access-Control-Allow-Origin', '*')
+        return response
+
+    except Exception as e:
+        response = jsonify({'error': f'Internal error: {str(e)}'})
+        response.status_code = 500
+        response.headers.add('Access-Control-Allow-Origin', '*')
+        return response
+
+
+if __name__ == '__main__':
+    # The one publisher: scan the feed sports and write their changes to the shared store
+    sports = feed_sports()
+    if not sports:
+        sys.exit("Set FEED_SPORTS to the comma-separated sport keys to publish")
+    print(f"Publishing live feeds for {', '.join(sports)} "
+          f"({feed_bookmakers()}{', with player props' if feed_include_props() else ''})")
+    run_publisher(sports)
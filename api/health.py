@@ -1,7 +1,13 @@
 """GET /api/health - Health check endpoint."""
 
 import os
+import sys
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
 from flask import Flask, jsonify
+from lib.circuit_breaker import load_breaker_states
 
 app = Flask(__name__)
 
@@ -9,10 +15,13 @@ app = Flask(__name__)
 @app.route('/api/health', methods=['GET'])
 def health_check():
     api_key_configured = bool(os.environ.get('API_KEY'))
+    # Open breakers mean the matching endpoint/sport is being skipped
+    breakers = load_breaker_states()
 
     response = jsonify({
-        'status': 'healthy',
-        'api_key_configured': api_key_configured
+        'status': 'degraded' if breakers else 'healthy',
+        'api_key_configured': api_key_configured,
+        'breakers': breakers
     })
     response.headers.add('Access-Control-Allow-Origin', '*')
     return response
@@ -0,0 +1,141 @@
+"""
+POST /api/jobs - Enqueue a background scan job.
+GET /api/jobs - Job status and the results found since a cursor.
+
+Scans of many sports (with props for every event) don't fit in one function
+invocation, so they run as jobs. Each GET also works the queue for up to
+JOB_INLINE_SECONDS before answering, so polling clients drive a job forward.
+Run `python api/jobs.py` as a dedicated worker (and set JOB_INLINE_SECONDS=0)
+next to a long-running server such as `flask --app api/jobs.py run`.
+
+The queue is a SQLite file in the state dir, shared by the processes of one
+machine only. On Vercel every instance would have its own queue, so this
+function is excluded from deployment (.vercelignore).
+"""
+
+import os
+import sys
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from flask import Flask, jsonify, request
+from lib.api_client import APIClient, APIError
+from lib.jobs import DONE, JobError, JobQueue, JobWorker
+from lib.metrics import metrics
+from lib.responses import compact_opportunities, json_response, wants_compact
+
+app = Flask(__name__)
+queue = JobQueue()
+
+MAX_PAGE_SIZE = 500
+INLINE_SECONDS = float(os.environ.get('JOB_INLINE_SECONDS', 8))
+WORKER_THREADS = int(os.environ.get('JOB_WORKER_THREADS', 4))
+
+
+@app.teardown_request
+def flush_metrics(exc):
+    metrics.flush()
+
+
+@app.route('/api/jobs', methods=['GET', 'POST', 'OPTIONS'])
+def jobs():
+    # Handle CORS preflight
+    if request.method == 'OPTIONS':
+        response = jsonify({})
+        response.headers.add('Access-Control-Allow-Origin', '*')
+        response.headers.add('Access-Control-Allow-Methods', 'GET, POST, OPTIONS')
+        response.headers.add('Access-Control-Allow-Headers', 'Content-Type')
+        return response
+
+    try:
+        if request.method == 'POST':
+            return create_job()
+        return job_status()
+
+    except JobError as e:
+        response = jsonify({'error': str(e)})
+        response.status_code = 404
+        response.headers.add('Access-Control-Allow-Origin', '*')
+        return response
+
+    except APIError as e:
+        response = jsonify({'error': str(e)})
+        response.status_code = 400
+        response.headers.add('Access-Control-Allow-Origin', '*')
+        return response
+
+    except Exception as e:
+        response = jsonify({'error': f'Internal error: {str(e)}'})
+        response.status_code = 500
+        response.headers.add('Access-Control-Allow-Origin', '*')
+        return response
+
+
+def create_job():
+    body = request.get_json() or {}
+    sport_keys = body.get('sport_keys') or ([body['sport_key']] if body.get('sport_key') else [])
+    bookmakers_list = body.get('bookmakers', [])
+
+    if sport_keys == 'all':
+        # Every active sport; the sports endpoint costs no credits
+        sport_keys = [s['key'] for s in APIClient().get_sports()['data'] if s.get('active', True)]
+
+    if not isinstance(sport_keys, list) or not all(isinstance(key, str) and key for key in sport_keys):
+        response = jsonify({'error': 'sport_keys must be a list of sport keys or "all"'})
+        response.status_code = 400
+        response.headers.add('Access-Control-Allow-Origin', '*')
+        return response
+
+    if not sport_keys:
+        response = jsonify({'error': 'sport_keys is required'})
+        response.status_code = 400
+        response.headers.add('Access-Control-Allow-Origin', '*')
+        return response
+
+    if len(bookmakers_list) < 2:
+        response = jsonify({'error': 'At least 2 bookmakers are required'})
+        response.status_code = 400
+        response.headers.add('Access-Control-Allow-Origin', '*')
+        return response
+
+    job_id = queue.enqueue(
+        sport_keys,
+        ','.join(bookmakers_list),
+        include_props=body.get('include_props', True),
+        max_prop_events=body.get('max_prop_events')
+    )
+
+    response = jsonify({'job_id': job_id, 'status': 'queued', 'tasks': len(sport_keys)})
+    response.status_code = 202
+    response.headers.add('Location', f'/api/jobs?job_id={job_id}')
+    response.headers.add('Access-Control-Allow-Origin', '*')
+    return response
+
+
+def job_status():
+    job_id = request.args.get('job_id')
+    if not job_id:
+        response = jsonify({'error': 'job_id is required'})
+        response.status_code = 400
+        response.headers.add('Access-Control-Allow-Origin', '*')
+        return response
+
+    if queue.status(job_id)['status'] != DONE and INLINE_SECONDS > 0:
+        JobWorker(queue, threads=WORKER_THREADS).run(deadline=INLINE_SECONDS)
+
+    cursor = request.args.get('cursor', 0, type=int)
+    limit = min(max(request.args.get('limit', MAX_PAGE_SIZE, type=int), 1), MAX_PAGE_SIZE)
+    page = queue.results(job_id, cursor=cursor, limit=limit)
+    if wants_compact():
+        page['opportunities'] = compact_opportunities(page['opportunities'])
+
+    response = json_response(dict(queue.status(job_id), **page))
+    response.headers.add('Access-Control-Allow-Origin', '*')
+    return response
+
+
+if __name__ == '__main__':
+    # Dedicated worker: keep polling the queue shared through ARB_STATE_DIR
+    print(f"Scan job worker on {queue.path} with {WORKER_THREADS} threads")
+    JobWorker(queue, threads=WORKER_THREADS).run(until_idle=False)
@@ -1,10 +1,25 @@
 """API client for The Odds API - serverless-friendly version."""
 
 import os
+import time
 import requests
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from typing import Dict, List, Optional, Any
 
+from .circuit_breaker import CircuitBreakers, breaker_key
 from .markets import get_markets_for_sport
+from .metrics import metrics
+from .regions import lowest_remaining, merge_event, merge_events, parse_regions, split_bookmakers
+from .retry import (
+    RETRYABLE_STATUS_CODES,
+    HedgePolicy,
+    LatencyTracker,
+    RetryPolicy,
+    endpoint_kind,
+    estimate_request_cost
+)
+from .singleflight import SingleFlight
+from .transport import ReplayTransport, open_transport
 
 
 class APIError(Exception):
@@ -12,27 +27,132 @@ class APIError(Exception):
     pass
 
 
+class TransientAPIError(APIError):
+    """Upstream timed out, was unreachable or returned 5xx on every attempt."""
+    pass
+
+
+class CircuitOpenError(APIError):
+    """Request refused because its endpoint's circuit breaker is open."""
+
+    def __init__(self, key: str, retry_in: Optional[float]):
+        super().__init__(f"Upstream {key} is failing; skipped (retry in {retry_in or 0:.0f}s).")
+        self.key = key
+        self.retry_in = retry_in
+
+
+# Shared across client instances so a warm serverless instance keeps its
+# latency history between invocations.
+_latency_tracker = LatencyTracker()
+_hedge_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix='odds-hedge')
+# Runs the per-region parts of a multi-region request concurrently
+_region_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix='odds-region')
+# Concurrent scans on the same instance share identical in-flight upstream calls.
+_inflight = SingleFlight()
+_breakers = CircuitBreakers()
+
+
+def _close_response(future) -> None:
+    """Release the connection of a hedge attempt that lost the race."""
+    if not future.cancelled() and future.exception() is None:
+        future.result().close()
+
+
+def request_key(endpoint: str, params: Optional[Dict]) -> tuple:
+    """Identity of an upstream request, independent of the API key used."""
+    return (endpoint, tuple(sorted((k, str(v)) for k, v in (params or {}).items() if k != 'apiKey')))
+
+
 class APIClient:
     """Client for The Odds API with simplified serverless-friendly design."""
 
-    def __init__(self, api_key: Optional[str] = None):
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        hedge_policy: Optional[HedgePolicy] = None,
+        transport=None
+    ):
         """
         Initialize the API client.
 
         Args:
             api_key: The Odds API key. Falls back to API_KEY env var.
+            retry_policy: Backoff policy for transient failures
+            hedge_policy: Enables hedged requests. Defaults to on when the
+                HEDGE_REQUESTS env var is set.
+            transport: Session used for HTTP. Defaults to the one selected by
+                ODDS_TRANSPORT (live, record or replay).
         """
+        self.session = transport if transport is not None else open_transport()
         self.api_key = api_key or os.environ.get('API_KEY')
+        if not self.api_key and isinstance(self.session, ReplayTransport):
+            # Replayed requests are matched without the key
+            self.api_key = 'replay'
         if not self.api_key:
             raise APIError("API_KEY not configured")
 
-        self.session = requests.Session()
         self.base_url = 'https://api.the-odds-api.com/v4/'
         self.remaining_credits = None
+        self.timeout = 25
+
+        self.retry_policy = retry_policy or RetryPolicy()
+        if hedge_policy is None and os.environ.get('HEDGE_REQUESTS'):
+            hedge_policy = HedgePolicy()
+        self.hedge_policy = hedge_policy
+        self.latency = _latency_tracker
+        self.inflight = _inflight
+        self.coalesced_calls = 0
+        self.breakers = _breakers
+        self.skipped: Dict[str, Optional[float]] = {}
 
     def _request(self, endpoint: str, params: Dict = None) -> Dict:
         """
-        Make an API request.
+        Make an API request, sharing it with identical concurrent requests.
+
+        Fails fast with CircuitOpenError while the breaker for the endpoint
+        kind and sport is open.
+
+        Args:
+            endpoint: API endpoint path
+            params: Query parameters
+
+        Returns:
+            Dict with 'data' and 'remaining' keys
+        """
+        result, shared = self.inflight.do(
+            request_key(endpoint, params),
+            lambda: self._guarded_request(endpoint, params)
+        )
+        if shared:
+            self.coalesced_calls += 1
+            self.remaining_credits = result['remaining']
+        return result
+
+    def _guarded_request(self, endpoint: str, params: Dict = None) -> Dict:
+        """Run an upstream request through its circuit breaker."""
+        key = breaker_key(endpoint_kind(endpoint), endpoint)
+        allowed, retry_in = self.breakers.allow(key)
+        if not allowed:
+            self.skipped[key] = retry_in
+            raise CircuitOpenError(key, retry_in)
+
+        try:
+            result = self._request_upstream(endpoint, params)
+        except TransientAPIError:
+            self.breakers.record_failure(key)
+            raise
+        except Exception:
+            # Never leave a half-open probe slot taken
+            self.breakers.release(key)
+            raise
+
+        self.breakers.record_success(key)
+        return result
+
+    def _request_upstream(self, endpoint: str, params: Dict = None) -> Dict:
+        """
+        Make an API request, retrying transient failures with jittered backoff.
 
         Args:
             endpoint: API endpoint path
@@ -41,33 +161,185 @@ class APIClient:
         Returns:
             Dict with 'data' and 'remaining' keys
         """
-        params = params or {}
+        params = dict(params or {})
         params['apiKey'] = self.api_key
 
         url = f"{self.base_url}{endpoint}"
+        kind = endpoint_kind(endpoint)
+        cost = estimate_request_cost(endpoint, params)
+        policy = self.retry_policy
+
+        started = time.monotonic()
+        last_error = TransientAPIError("API request failed.")
+
+        for attempt in range(1, policy.max_attempts + 1):
+            elapsed = time.monotonic() - started
+            if attempt > 1:
+                delay = policy.backoff(attempt - 1)
+                if elapsed + delay >= policy.total_timeout:
+                    break
+                time.sleep(delay)
+                elapsed += delay
+
+            timeout = min(self.timeout, max(1.0, policy.total_timeout - elapsed))
+            sent = time.monotonic()
+
+            try:
+                response = self._send_hedged(kind, url, params, cost, timeout)
+            except requests.exceptions.Timeout:
+                metrics.record_upstream(kind, 'timeout')
+                last_error = TransientAPIError("API request timed out.")
+                continue
+            except requests.exceptions.ConnectionError as e:
+                metrics.record_upstream(kind, 'error')
+                last_error = TransientAPIError(f"Network error: {str(e)}")
+                continue
+            except requests.exceptions.RequestException as e:
+                metrics.record_upstream(kind, 'error')
+                raise APIError(f"Network error: {str(e)}")
+
+            metrics.record_upstream(kind, str(response.status_code), time.monotonic() - sent, response.headers,
+                                    api_key=self.api_key)
+
+            if response.status_code in RETRYABLE_STATUS_CODES:
+                last_error = TransientAPIError(f"Upstream error: HTTP {response.status_code}")
+                continue
+
+            return self._handle_response(kind, response, cost, time.monotonic() - sent)
+
+        raise last_error
+
+    def _send(self, url: str, params: Dict, timeout: float, session=None) -> requests.Response:
+        """Send a single GET request."""
+        return (session or self.session).get(url, params=params, timeout=timeout)
+
+    def _send_hedged(
+        self,
+        kind: str,
+        url: str,
+        params: Dict,
+        cost: int,
+        timeout: float
+    ) -> requests.Response:
+        """
+        Send a request, duplicating it if it outlives the endpoint's p95 latency.
+
+        Hedging is skipped until the endpoint has enough latency samples and
+        whenever the credit guards in the hedge policy refuse the extra cost.
+        A live hedge gets its own session; whichever attempt loses has its
+        response closed as soon as it finishes, returning its connection.
+        """
+        hedge = self.hedge_policy
+        delay = hedge.delay_for(self.latency, kind) if hedge else None
+        if delay is None or not hedge.allows(cost):
+            return self._send(url, params, timeout)
+
+        primary = _hedge_executor.submit(self._send, url, params, timeout)
+        done, _ = wait([primary], timeout=delay)
+        if done or not hedge.allows(cost):
+            return primary.result()
+
+        hedge.record_spend(cost, hedged=True)
+        hedge_session = requests.Session() if type(self.session) is requests.Session else None
+        secondary = _hedge_executor.submit(self._send, url, params, timeout, hedge_session)
+        if hedge_session is not None:
+            secondary.add_done_callback(lambda _: hedge_session.close())
+        pending = {primary, secondary}
+        error = None
+
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                try:
+                    response = future.result()
+                except requests.exceptions.RequestException as e:
+                    error = e
+                    continue
+                for loser in pending:
+                    loser.add_done_callback(_close_response)
+                return response
+
+        raise error
+
+    def _handle_response(
+        self,
+        kind: str,
+        response: requests.Response,
+        cost: int,
+        latency: float
+    ) -> Dict:
+        """Validate a response and record its latency and credit usage."""
+        if response.status_code == 429:
+            raise APIError("API rate limit exceeded. Try again later.")
+
+        if response.status_code == 401:
+            raise APIError("Invalid API key.")
 
         try:
-            response = self.session.get(url, params=params, timeout=25)
+            response.raise_for_status()
+        except requests.exceptions.RequestException as e:
+            raise APIError(f"Network error: {str(e)}")
 
-            if response.status_code == 429:
-                raise APIError("API rate limit exceeded. Try again later.")
+        self.latency.record(kind, latency)
+        if self.hedge_policy:
+            self.hedge_policy.record_spend(cost)
 
-            if response.status_code == 401:
-                raise APIError("Invalid API key.")
+        try:
+            data = response.json()
+        except ValueError:
+            # e.g. a proxy or maintenance page served with 200
+            raise TransientAPIError(f"Upstream returned a non-JSON body ({response.headers.get('content-type')}).")
 
-            response.raise_for_status()
+        self.remaining_credits = response.headers.get('x-requests-remaining', 'unknown')
 
-            self.remaining_credits = response.headers.get('x-requests-remaining', 'unknown')
+        return {
+            'data': data,
+            'remaining': self.remaining_credits
+        }
 
-            return {
-                'data': response.json(),
-                'remaining': self.remaining_credits
-            }
+    def _request_split(self, endpoint: str, params: Dict, bookmakers: Optional[str], regions: Optional[str],
+                       merge) -> Dict:
+        """
+        Make a request once per region (or per ten bookmakers) concurrently.
 
-        except requests.exceptions.Timeout:
-            raise APIError("API request timed out.")
-        except requests.exceptions.RequestException as e:
-            raise APIError(f"Network error: {str(e)}")
+        Args:
+            endpoint: API endpoint path
+            params: Query parameters shared by every part
+            bookmakers: Comma-separated bookmaker keys; takes precedence over regions
+            regions: Comma-separated regions, defaulting to ODDS_REGIONS (us)
+            merge: Combines the parts' data (regions.merge_events or merge_event)
+
+        Returns:
+            Dict with the merged 'data' and the lowest 'remaining' count. A
+            part that fails is left out and recorded in skipped as
+            '<kind>:<sport>:<region or bookmakers>'; its error is raised only
+            when every part fails.
+        """
+        if bookmakers:
+            parts = [{'bookmakers': chunk} for chunk in split_bookmakers(bookmakers)]
+        else:
+            parts = [{'regions': region} for region in parse_regions(regions)]
+
+        if len(parts) == 1:
+            return self._request(endpoint, dict(params, **parts[0]))
+
+        futures = [_region_executor.submit(self._request, endpoint, dict(params, **part)) for part in parts]
+        results = []
+        error = None
+        for part, future in zip(parts, futures):
+            try:
+                results.append(future.result())
+            except APIError as e:
+                error = error or e
+                key = f"{breaker_key(endpoint_kind(endpoint), endpoint)}:{next(iter(part.values()))}"
+                self.skipped[key] = getattr(e, 'retry_in', None)
+        if not results:
+            raise error
+        self.remaining_credits = lowest_remaining(result['remaining'] for result in results)
+        return {
+            'data': merge([result['data'] for result in results]),
+            'remaining': self.remaining_credits
+        }
 
     def get_sports(self) -> Dict:
         """
@@ -90,7 +362,7 @@ class APIClient:
         """
         return self._request(f'sports/{sport_key}/events')
 
-    def get_event_odds(self, sport_key: str, event_id: str, bookmakers: str = None) -> Dict:
+    def get_event_odds(self, sport_key: str, event_id: str, bookmakers: str = None, regions: str = None) -> Dict:
         """
         Get odds for a specific event with player props.
 
@@ -98,6 +370,8 @@ class APIClient:
             sport_key: Sport identifier
             event_id: Event identifier
             bookmakers: Comma-separated bookmaker keys
+            regions: Comma-separated regions when no bookmakers are given
+                (default ODDS_REGIONS, us); each is fetched concurrently
 
         Returns:
             Dict with odds data and remaining credits
@@ -109,19 +383,16 @@ class APIClient:
             'oddsFormat': 'american'
         }
 
-        if bookmakers:
-            params['bookmakers'] = bookmakers
-        else:
-            params['regions'] = 'us'
-
-        return self._request(f'sports/{sport_key}/events/{event_id}/odds', params)
+        return self._request_split(f'sports/{sport_key}/events/{event_id}/odds', params, bookmakers, regions,
+                                   merge_event)
 
     def get_sports_odds(
         self,
         sport_key: str,
         bookmakers: str = None,
         markets: str = 'h2h,spreads,totals',
-        odds_format: str = 'american'
+        odds_format: str = 'american',
+        regions: str = None
     ) -> Dict:
         """
         Get odds for all events in a sport.
@@ -131,18 +402,16 @@ class APIClient:
             bookmakers: Comma-separated bookmaker keys
             markets: Comma-separated market types
             odds_format: Odds format (american/decimal)
+            regions: Comma-separated regions when no bookmakers are given
+                (default ODDS_REGIONS, us); each is fetched concurrently
 
         Returns:
-            Dict with odds data and remaining credits
+            Dict with odds data and remaining credits, with events from
+            every region merged by id
         """
         params = {
             'markets': markets,
             'oddsFormat': odds_format
         }
 
-        if bookmakers:
-            params['bookmakers'] = bookmakers
-        else:
-            params['regions'] = 'us'
-
-        return self._request(f'sports/{sport_key}/odds/', params)
+        return self._request_split(f'sports/{sport_key}/odds/', params, bookmakers, regions, merge_events)
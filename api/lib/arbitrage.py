@@ -1,6 +1,7 @@
 """Arbitrage calculation and analysis functions."""
 
 from datetime import datetime, timedelta, timezone
+from functools import lru_cache
 from typing import Dict, List, Optional, Tuple, Any
 
 
@@ -8,32 +9,39 @@ class ArbitrageAgent:
     """Static class for calculating arbitrage opportunities."""
 
     @staticmethod
-    def find_arbitrage(odds1: float, odds2: float, odds3: float = None) -> Dict:
+    def find_arbitrage(*odds: float) -> Dict:
         """
         Calculate arbitrage opportunity from American odds.
 
+        Works for any number of mutually exclusive outcomes: 2-way and 3-way
+        markets as well as outrights with dozens of runners. Computed in a
+        single pass over the odds.
+
         Args:
-            odds1: First outcome American odds
-            odds2: Second outcome American odds
-            odds3: Optional third outcome American odds (for 3-way markets)
+            *odds: American odds of each outcome (at least two); None entries
+                are ignored so optional 3-way odds can be passed through
 
         Returns:
             Dict with roi, bet_percentages, and bet_amounts_1000
         """
-        def american_to_decimal(american_odds: float) -> float:
+        implied = []
+        inverse_sum = 0.0
+        for american_odds in odds:
+            if american_odds is None:
+                continue
             if american_odds > 0:
-                return (american_odds / 100) + 1
+                probability = 100 / (american_odds + 100)
             else:
-                return (100 / abs(american_odds)) + 1
+                probability = -american_odds / (100 - american_odds)
+            implied.append(probability)
+            inverse_sum += probability
 
-        odds_list = [odds1, odds2]
-        if odds3 is not None:
-            odds_list.append(odds3)
+        if len(implied) < 2:
+            raise ValueError("At least two outcomes are required.")
 
-        decimal_odds = [american_to_decimal(odds) for odds in odds_list]
-        inverse_sum = sum(1/odds for odds in decimal_odds)
         roi = (1 - inverse_sum) * 100
-        bet_percentages = [(1/odds) / inverse_sum * 100 for odds in decimal_odds]
+        scale = 100 / inverse_sum
+        bet_percentages = [p * scale for p in implied]
         bet_amounts_1000 = [pct * 10 for pct in bet_percentages]
 
         return {
@@ -43,7 +51,23 @@ class ArbitrageAgent:
         }
 
 
-def parse_and_filter_event_time(commence_time_iso: str, minutes_buffer: int = 10) -> Tuple[bool, str]:
+@lru_cache(maxsize=4096)
+def parse_commence_time(commence_time_iso: str) -> Tuple[datetime, str]:
+    """
+    Parse an ISO 8601 start time into local time and its display string.
+
+    Cached because the same events are parsed by every scan stage.
+    """
+    normalized = commence_time_iso.replace('Z', '+00:00')
+    local_time = datetime.fromisoformat(normalized).astimezone()
+    return local_time, local_time.strftime("%Y-%m-%d %I:%M %p")
+
+
+def parse_and_filter_event_time(
+    commence_time_iso: str,
+    minutes_buffer: int = 10,
+    now: Optional[datetime] = None
+) -> Tuple[bool, str]:
     """
     Parse ISO 8601 datetime string and determine if event is still valid for betting.
 
@@ -54,6 +78,8 @@ def parse_and_filter_event_time(commence_time_iso: str, minutes_buffer: int = 10
     Args:
         commence_time_iso: ISO 8601 formatted datetime from API
         minutes_buffer: Minutes to exclude before game start (default 10)
+        now: Clock to filter against (default: current time). Pass one value
+            for a whole batch of events, or a snapshot time when replaying.
 
     Returns:
         Tuple of (is_valid: bool, formatted_time: str)
@@ -62,15 +88,13 @@ def parse_and_filter_event_time(commence_time_iso: str, minutes_buffer: int = 10
         if not commence_time_iso:
             return False, "Time unavailable"
 
-        normalized = commence_time_iso.replace('Z', '+00:00')
-        utc_time = datetime.fromisoformat(normalized)
-        local_time = utc_time.astimezone()
+        local_time, formatted_time = parse_commence_time(commence_time_iso)
 
-        now = datetime.now(timezone.utc).astimezone()
+        if now is None:
+            now = datetime.now(timezone.utc)
         buffer_time = now + timedelta(minutes=minutes_buffer)
 
         is_valid = local_time > buffer_time
-        formatted_time = local_time.strftime("%Y-%m-%d %I:%M %p")
 
         return is_valid, formatted_time
 
@@ -126,17 +150,42 @@ def analyze_player_prop_arbitrage(player_props: Dict) -> Optional[Dict]:
     }
 
 
+def full_field_odds(market_data: Dict) -> Dict:
+    """
+    Keep only the bookmakers that price every runner of an outright field.
+
+    A book that lists part of the field leaves the rest uncovered, so mixing
+    its prices with other books' would show an arbitrage that is not one.
+
+    Args:
+        market_data: Dict of runner -> list of (bookmaker, odds)
+
+    Returns:
+        The same shape restricted to full-field bookmakers, or {} if none
+    """
+    runners = [runner for runner, odds_list in market_data.items() if odds_list]
+    books = None
+    for runner in runners:
+        quoted = {item[0] for item in market_data[runner]}
+        books = quoted if books is None else books & quoted
+    if not books:
+        return {}
+    return {runner: [item for item in market_data[runner] if item[0] in books] for runner in runners}
+
+
 def analyze_market_arbitrage(market_data: Dict, market_key: str) -> Optional[Dict]:
     """
     Analyze a market for arbitrage opportunities.
 
     Args:
         market_data: Dict of outcome data with odds from various bookmakers
-        market_key: Type of market (h2h, spreads, totals)
+        market_key: Type of market (h2h, spreads, totals, outrights)
 
     Returns:
         Dict with arbitrage details or None if no opportunity
     """
+    if market_key == 'outrights':
+        market_data = full_field_odds(market_data)
     if not market_data or len(market_data) < 2:
         return None
 
@@ -173,7 +222,7 @@ def analyze_market_arbitrage(market_data: Dict, market_key: str) -> Optional[Dic
                 outcome_names.append(f"{outcome} {point}")
 
             if len(best_odds) >= 2:
-                arb_result = ArbitrageAgent.find_arbitrage(*best_odds[:3])
+                arb_result = ArbitrageAgent.find_arbitrage(*best_odds)
                 if arb_result['roi'] > best_roi:
                     best_roi = arb_result['roi']
                     best_result = {
@@ -204,7 +253,7 @@ def analyze_market_arbitrage(market_data: Dict, market_key: str) -> Optional[Dic
         if len(best_odds) < 2:
             return None
 
-        arb_result = ArbitrageAgent.find_arbitrage(*best_odds[:3])
+        arb_result = ArbitrageAgent.find_arbitrage(*best_odds)
         return {
             'roi': arb_result['roi'],
             'bookmakers': bookmakers_used,
@@ -0,0 +1,396 @@
+"""
+Historical replay of recorded odds snapshots through the live analyzers.
+
+Two sources are read:
+
+- A corpus recorded with ODDS_TRANSPORT=record (or the CLI's --transport
+  record). Every successful bulk odds and event odds response in it is a
+  snapshot, timed by when it was recorded, and each day is one time slice.
+- Snapshot files: JSON lines (optionally gzip-compressed, *.jsonl.gz), one
+  record per upstream response, ordered by time within a file, each file
+  one time slice:
+
+    {"ts": "2025-12-01T19:30:00Z", "sport": "basketball_nba",
+     "kind": "odds", "data": [...bulk odds response...]}
+    {"ts": "...", "sport": "...", "kind": "event_odds", "data": {...event odds...}}
+
+Slices are replayed in parallel worker processes and their arbitrage
+episodes are stitched together at the boundaries afterwards.
+"""
+
+import gzip
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from typing import Dict, Iterator, List, NamedTuple, Optional, Sequence, Tuple, Union
+
+from .arbitrage import (
+    analyze_market_arbitrage,
+    analyze_player_prop_arbitrage,
+    parse_and_filter_event_time,
+    parse_commence_time
+)
+from .markets import get_markets_for_sport
+from .scanner import build_market_odds, build_props_odds
+from .transport import Corpus
+
+try:
+    import orjson
+    _loads = orjson.loads
+except ImportError:
+    _loads = json.loads
+
+
+DEFAULT_ROI_THRESHOLDS = (0.0, 1.0, 2.0, 5.0)
+DEFAULT_BUFFERS = (0, 5, 10, 15, 30, 60)
+
+
+def parse_timestamp(ts: str) -> datetime:
+    return datetime.fromisoformat(ts.replace('Z', '+00:00'))
+
+
+def iter_snapshots(path: str) -> Iterator[Dict]:
+    """Yield snapshot records from one JSON lines file."""
+    opener = gzip.open if path.endswith('.gz') else open
+    with opener(path, 'rb') as f:
+        for line in f:
+            if line.strip():
+                yield _loads(line)
+
+
+def snapshot_files(directory: str) -> List[str]:
+    """List snapshot files in time order (file names are expected to sort by time)."""
+    names = sorted(n for n in os.listdir(directory) if n.endswith(('.jsonl', '.jsonl.gz')))
+    return [os.path.join(directory, n) for n in names]
+
+
+class CorpusSlice(NamedTuple):
+    """One UTC day of a recorded corpus."""
+    directory: str
+    day: str
+
+
+def is_corpus(directory: str) -> bool:
+    """True for a directory written by the record transport."""
+    return os.path.isdir(os.path.join(directory, 'requests'))
+
+
+def _corpus_kind(url: str) -> Optional[Tuple[str, str]]:
+    """(sport, kind) of a recorded odds request, or None for other endpoints."""
+    parts = [p for p in url.split('/v4/', 1)[-1].split('/') if p]
+    if len(parts) == 3 and parts[0] == 'sports' and parts[2] == 'odds':
+        return parts[1], 'odds'
+    if len(parts) == 5 and parts[0] == 'sports' and parts[2] == 'events' and parts[4] == 'odds':
+        return parts[1], 'event_odds'
+    return None
+
+
+def _corpus_exchanges(directory: str) -> Iterator[Tuple[str, str, str, Dict]]:
+    """Yield (request digest, sport, kind, exchange) for every successful odds response."""
+    corpus = Corpus(directory)
+    for name in os.listdir(corpus.requests_dir):
+        if not name.endswith('.json.gz'):
+            continue
+        digest = name[:-len('.json.gz')]
+        entry = corpus.load(digest)
+        parsed = _corpus_kind(entry['url']) if entry else None
+        if parsed is None:
+            continue
+        for exchange in entry['responses']:
+            if exchange['status'] == 200:
+                yield digest, parsed[0], parsed[1], exchange
+
+
+def _utc_day(timestamp: float) -> str:
+    return datetime.fromtimestamp(timestamp, timezone.utc).strftime('%Y-%m-%d')
+
+
+def corpus_slices(directory: str) -> List[CorpusSlice]:
+    """One slice per UTC day with recorded odds, in time order."""
+    days = {_utc_day(exchange['recorded_at']) for _, _, _, exchange in _corpus_exchanges(directory)}
+    return [CorpusSlice(directory, day) for day in sorted(days)]
+
+
+def iter_corpus_snapshots(corpus_slice: CorpusSlice) -> Iterator[Dict]:
+    """
+    Yield one day of a corpus as snapshot records, in recorded order.
+
+    Each record carries its request digest as 'stream', so responses to
+    different requests (other bookmakers or regions) are tracked apart.
+    """
+    exchanges = sorted(
+        (exchange['recorded_at'], digest, sport, kind, exchange['body'])
+        for digest, sport, kind, exchange in _corpus_exchanges(corpus_slice.directory)
+        if _utc_day(exchange['recorded_at']) == corpus_slice.day
+    )
+    corpus = Corpus(corpus_slice.directory)
+    for recorded_at, digest, sport, kind, body in exchanges:
+        yield {
+            'ts': datetime.fromtimestamp(recorded_at, timezone.utc).isoformat().replace('+00:00', 'Z'),
+            'sport': sport,
+            'kind': kind,
+            'stream': digest,
+            'data': _loads(corpus.get_body(body))
+        }
+
+
+Source = Union[str, CorpusSlice]
+
+
+def snapshot_sources(directory: str) -> List[Source]:
+    """Time slices of a corpus or a folder of snapshot files, in time order."""
+    return corpus_slices(directory) if is_corpus(directory) else snapshot_files(directory)
+
+
+def iter_records(source: Source) -> Iterator[Dict]:
+    if isinstance(source, CorpusSlice):
+        return iter_corpus_snapshots(source)
+    return iter_snapshots(source)
+
+
+def _event_signature(payload: Dict) -> str:
+    """Cheap change detector for an event payload: per-bookmaker last_update stamps."""
+    stamps = [(b.get('key'), b.get('last_update')) for b in payload.get('bookmakers', [])]
+    if stamps and all(stamp for _, stamp in stamps):
+        return repr(stamps)
+    return json.dumps(payload.get('bookmakers', []), sort_keys=True)
+
+
+def _analyze_event(sport: str, kind: str, payload: Dict) -> List[Tuple[tuple, float]]:
+    """Run the live analyzers over one event; return (arb key, roi) pairs."""
+    found = []
+    event_id = payload.get('id')
+
+    if kind == 'odds':
+        for market_key, market_data in build_market_odds(payload).items():
+            result = analyze_market_arbitrage(market_data, market_key)
+            if result and result['roi'] > 0:
+                key = (event_id, market_key, tuple(result['outcomes']), tuple(result['bookmakers']))
+                found.append((key, result['roi']))
+    else:
+        markets = get_markets_for_sport(sport)
+        if not markets:
+            return found
+        for market_key, market_data in build_props_odds(payload, markets.split(',')).items():
+            for player_key, player_props in market_data.items():
+                result = analyze_player_prop_arbitrage(player_props)
+                if result and result['roi'] > 0:
+                    key = (event_id, f"{market_key} - {player_key}", tuple(result['outcomes']),
+                           tuple(result['bookmakers']))
+                    found.append((key, result['roi']))
+
+    return found
+
+
+def replay_slice(source: Source) -> Dict:
+    """
+    Replay one time slice and collect arbitrage episodes.
+
+    An episode is an arbitrage (same event, market, outcomes and bookmakers)
+    seen in consecutive snapshots of the same stream: one sport's bulk odds,
+    or one event's odds. Events whose bookmaker payload has not changed since
+    the previous snapshot reuse their earlier analysis instead of being
+    re-analyzed.
+    """
+    started = time.perf_counter()
+    analysis_cache: Dict[tuple, Tuple[str, List]] = {}
+    open_episodes: Dict[tuple, Dict[tuple, Dict]] = {}
+    first_ts: Dict[tuple, str] = {}
+    last_ts: Dict[tuple, str] = {}
+    closed: List[Dict] = []
+    snapshots = 0
+    reused = 0
+    span = [None, None]
+
+    for record in iter_records(source):
+        snapshots += 1
+        ts, sport, kind = record['ts'], record['sport'], record['kind']
+        now = parse_timestamp(ts)
+        # Each event odds record holds one event, so it only speaks for that event's episodes
+        stream_id = record.get('stream') or (record['data'].get('id') if kind == 'event_odds' else '')
+        stream = (sport, kind, stream_id)
+        first_ts.setdefault(stream, ts)
+        last_ts[stream] = ts
+        span[0] = span[0] or ts
+        span[1] = ts
+
+        payloads = record['data'] if kind == 'odds' else [record['data']]
+        active: Dict[tuple, Dict] = {}
+
+        for payload in payloads:
+            commence = payload.get('commence_time')
+            # Same filter as live scans, without the buffer; buffers are swept below
+            is_valid, _ = parse_and_filter_event_time(commence, 0, now=now)
+            if not is_valid:
+                continue
+            lead_minutes = (parse_commence_time(commence)[0] - now).total_seconds() / 60
+
+            cache_key = (stream, payload.get('id'))
+            signature = _event_signature(payload)
+            cached = analysis_cache.get(cache_key)
+            if cached and cached[0] == signature:
+                found = cached[1]
+                reused += 1
+            else:
+                found = _analyze_event(sport, kind, payload)
+                analysis_cache[cache_key] = (signature, found)
+
+            for key, roi in found:
+                active[key] = {'roi': roi, 'lead': lead_minutes}
+
+        episodes = open_episodes.setdefault(stream, {})
+        for key in list(episodes):
+            if key not in active:
+                closed.append(episodes.pop(key))
+        for key, seen in active.items():
+            episode = episodes.get(key)
+            if episode is None:
+                episodes[key] = {
+                    'key': key, 'stream': stream, 'start': ts, 'end': ts,
+                    'max_roi': seen['roi'], 'max_lead': seen['lead'], 'observations': 1
+                }
+            else:
+                episode['end'] = ts
+                episode['max_roi'] = max(episode['max_roi'], seen['roi'])
+                episode['max_lead'] = max(episode['max_lead'], seen['lead'])
+                episode['observations'] += 1
+
+    still_open = [e for episodes in open_episodes.values() for e in episodes.values()]
+    for episode in still_open:
+        episode['open_at_end'] = episode['end'] == last_ts[episode['stream']]
+    for episode in closed + still_open:
+        episode['open_at_start'] = episode['start'] == first_ts[episode['stream']]
+
+    return {
+        'source': source,
+        'snapshots': snapshots,
+        'reused_analyses': reused,
+        'span': span,
+        'episodes': closed + still_open,
+        'seconds': time.perf_counter() - started
+    }
+
+
+def stitch_episodes(slices: Sequence[Dict]) -> List[Dict]:
+    """Join episodes that were cut in two at slice boundaries."""
+    episodes: List[Dict] = []
+    carried: Dict[tuple, Dict] = {}
+
+    for slice_result in slices:
+        next_carried = {}
+        for episode in slice_result['episodes']:
+            ident = (episode['stream'], episode['key'])
+            previous = carried.pop(ident, None) if episode.get('open_at_start') else None
+            if previous is not None:
+                previous['end'] = episode['end']
+                previous['max_roi'] = max(previous['max_roi'], episode['max_roi'])
+                previous['max_lead'] = max(previous['max_lead'], episode['max_lead'])
+                previous['observations'] += episode['observations']
+                previous['open_at_end'] = episode.get('open_at_end', False)
+                episode = previous
+            if episode.get('open_at_end'):
+                next_carried[ident] = episode
+            else:
+                episodes.append(episode)
+        episodes.extend(carried.values())
+        carried = next_carried
+
+    episodes.extend(carried.values())
+    return episodes
+
+
+def _percentile(values: List[float], pct: float) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def summarize(
+    episodes: List[Dict],
+    roi_thresholds: Sequence[float] = DEFAULT_ROI_THRESHOLDS,
+    buffers: Sequence[int] = DEFAULT_BUFFERS
+) -> Dict:
+    """
+    Aggregate episodes into per-day counts, survival times and a buffer sweep.
+
+    The buffer sweep shows, for each candidate minutes_buffer, how many
+    episodes would still have been surfaced by parse_and_filter_event_time.
+    """
+    per_day: Dict[str, Dict[str, int]] = {}
+    durations = []
+
+    for episode in episodes:
+        day = episode['start'][:10]
+        counts = per_day.setdefault(day, {str(t): 0 for t in roi_thresholds})
+        for threshold in roi_thresholds:
+            if episode['max_roi'] > threshold:
+                counts[str(threshold)] += 1
+        durations.append((parse_timestamp(episode['end']) - parse_timestamp(episode['start'])).total_seconds())
+
+    sweep = {
+        str(buffer): sum(1 for e in episodes if e['max_lead'] > buffer)
+        for buffer in buffers
+    }
+
+    return {
+        'episodes': len(episodes),
+        'per_day': dict(sorted(per_day.items())),
+        'survival_seconds': {
+            'median': _percentile(durations, 50),
+            'p90': _percentile(durations, 90),
+            'max': max(durations) if durations else None
+        },
+        'buffer_sweep': sweep
+    }
+
+
+def run_backtest(
+    directory: str,
+    workers: Optional[int] = None,
+    roi_thresholds: Sequence[float] = DEFAULT_ROI_THRESHOLDS,
+    buffers: Sequence[int] = DEFAULT_BUFFERS
+) -> Dict:
+    """
+    Replay a recorded corpus or folder of snapshot files and report arbitrage statistics.
+
+    Args:
+        directory: Corpus written by the record transport, or a folder of
+            snapshot files with one time slice per file
+        workers: Worker processes (default: CPU count); 1 replays in-process
+        roi_thresholds: ROI levels (percent) to count episodes above
+        buffers: Candidate minutes_buffer values to sweep
+
+    Returns:
+        Summary dict including throughput in snapshots per second
+    """
+    sources = snapshot_sources(directory)
+    started = time.perf_counter()
+
+    if workers == 1 or len(sources) <= 1:
+        slices = [replay_slice(source) for source in sources]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            slices = list(pool.map(replay_slice, sources))
+
+    episodes = stitch_episodes(slices)
+    wall = time.perf_counter() - started
+    snapshots = sum(s['snapshots'] for s in slices)
+
+    summary = summarize(episodes, roi_thresholds, buffers)
+    replayed_seconds = 0.0
+    spans = [s['span'] for s in slices if s['span'][0]]
+    if spans:
+        replayed_seconds = (parse_timestamp(spans[-1][1]) - parse_timestamp(spans[0][0])).total_seconds()
+
+    summary.update({
+        'slices': len(sources),
+        'snapshots': snapshots,
+        'reused_analyses': sum(s['reused_analyses'] for s in slices),
+        'wall_seconds': wall,
+        'snapshots_per_second': snapshots / wall if wall else None,
+        'speedup_vs_realtime': replayed_seconds / wall if wall else None
+    })
+    return summary
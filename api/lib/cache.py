@@ -0,0 +1,108 @@
+"""Short-lived response cache shared by every function through the shared store."""
+
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Optional
+
+from .metrics import metrics
+from .storage import StorageError, shared_store
+
+
+class TTLCache:
+    """
+    Time-bounded cache kept in memory and mirrored to the shared store.
+
+    The memory tier serves repeat lookups in the same process; the store tier
+    lets other functions (and, with KV configured, other instances) reuse an
+    entry, which is what lets /api/prewarm warm the cache /api/scan reads.
+    """
+
+    def __init__(self, namespace: str, ttl: float, memory_slots: int = 64, store=None):
+        """
+        Initialize the cache.
+
+        Args:
+            namespace: Prefix of this cache's keys in the store
+            ttl: Seconds an entry stays valid
+            memory_slots: Number of entries kept in memory
+            store: Backing key-value store. Defaults to storage.shared_store().
+        """
+        self.namespace = namespace
+        self._store = store
+        self.ttl = ttl
+        self.memory_slots = memory_slots
+        self.hits = 0
+        self.misses = 0
+        self._memory: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def store(self):
+        return self._store or shared_store()
+
+    @property
+    def shared(self) -> bool:
+        """Whether entries set here are seen by every function of the deployment."""
+        return self.store.shared
+
+    def _path(self, key: Any) -> str:
+        digest = hashlib.sha1(json.dumps(key, sort_keys=True, default=str).encode()).hexdigest()
+        return f"cache:{self.namespace}:{digest}"
+
+    def _load(self, path: str) -> Optional[dict]:
+        with self._lock:
+            entry = self._memory.get(path)
+        if entry is None:
+            try:
+                entry = self.store.get(path)
+            except StorageError:
+                return None
+        return entry
+
+    def get(self, key: Any) -> Optional[Any]:
+        """Get a cached value, or None if missing or older than the TTL."""
+        path = self._path(key)
+        now = time.time()
+        entry = self._load(path)
+
+        if entry is None or entry['stored_at'] + entry.get('ttl', self.ttl) < now:
+            self.misses += 1
+            metrics.record_cache(self.namespace, hit=False)
+            return None
+
+        with self._lock:
+            self._remember(path, entry)
+        self.hits += 1
+        metrics.record_cache(self.namespace, hit=True)
+        return entry['value']
+
+    def age(self, key: Any) -> Optional[float]:
+        """Seconds since the entry was stored, or None if not cached."""
+        entry = self._load(self._path(key))
+        return time.time() - entry['stored_at'] if entry else None
+
+    def set(self, key: Any, value: Any, ttl: Optional[float] = None) -> None:
+        """Store a value; ttl overrides the cache's TTL for this entry."""
+        path = self._path(key)
+        entry = {'stored_at': time.time(), 'value': value}
+        if ttl is not None:
+            entry['ttl'] = ttl
+        try:
+            self.store.set(path, entry, ttl=entry.get('ttl', self.ttl))
+        except StorageError:
+            pass
+        with self._lock:
+            self._remember(path, entry)
+
+    def hit_ratio(self) -> Optional[float]:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else None
+
+    def _remember(self, path: str, entry: dict) -> None:
+        self._memory[path] = entry
+        self._memory.move_to_end(path)
+        while len(self._memory) > self.memory_slots:
+            self._memory.popitem(last=False)
@@ -0,0 +1,176 @@
+"""Circuit breakers for upstream endpoints, keyed by endpoint kind and sport."""
+
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+from .storage import StorageError, shared_store
+
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+def breaker_key(kind: str, endpoint: str) -> str:
+    """Key a request by endpoint kind and sport, e.g. 'event_odds:basketball_nba'."""
+    parts = endpoint.strip('/').split('/')
+    sport = parts[1] if len(parts) > 1 and parts[0] == 'sports' else '*'
+    return f"{kind}:{sport}"
+
+
+class CircuitBreakers:
+    """
+    Closed / open / half-open breakers for upstream calls.
+
+    A breaker opens after failure_threshold consecutive transient failures
+    (timeouts, network errors, 5xx). While open, calls fail fast. Once
+    reset_timeout has passed a single probe is let through (half-open): a
+    success closes the breaker, a failure reopens it with the timeout
+    doubled, up to max_reset_timeout.
+
+    State is written to the shared store on every transition so other
+    functions (e.g. /api/health) can report it, and is loaded from it on
+    first use so a new instance starts with the breakers already open.
+    """
+
+    # Hash in the shared store holding one field per breaker
+    STORE_KEY = 'breakers'
+
+    def __init__(
+        self,
+        failure_threshold: int = 3,
+        reset_timeout: float = 30.0,
+        max_reset_timeout: float = 300.0,
+        store=None
+    ):
+        """
+        Initialize the breakers.
+
+        Args:
+            failure_threshold: Consecutive failures that open a breaker
+            reset_timeout: Seconds before the first probe of an open breaker
+            max_reset_timeout: Cap for the doubled timeout after failed probes
+            store: Where state is shared. Defaults to storage.shared_store().
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.max_reset_timeout = max_reset_timeout
+        self._store = store
+        self._lock = threading.Lock()
+        self._states: Optional[Dict[str, Dict]] = None
+
+    @property
+    def store(self):
+        return self._store or shared_store()
+
+    def _load(self) -> Dict[str, Dict]:
+        # Lazily, so creating the instance-wide breakers at import does no I/O
+        if self._states is None:
+            try:
+                self._states = self.store.hgetall(self.STORE_KEY)
+            except StorageError:
+                self._states = {}
+            for state in self._states.values():
+                state['probing'] = False
+        return self._states
+
+    def _state(self, key: str) -> Dict:
+        state = self._load().get(key)
+        if state is None:
+            state = self._states[key] = {
+                'state': CLOSED, 'failures': 0, 'opened_at': None,
+                'reset_timeout': self.reset_timeout, 'probing': False
+            }
+        return state
+
+    def allow(self, key: str) -> Tuple[bool, Optional[float]]:
+        """
+        Check whether a call may go upstream.
+
+        Returns:
+            Tuple of (allowed, seconds until the next probe if refused)
+        """
+        with self._lock:
+            state = self._state(key)
+            if state['state'] == CLOSED:
+                return True, None
+
+            wait = state['opened_at'] + state['reset_timeout'] - time.time()
+            if state['state'] == OPEN and wait <= 0:
+                state['state'] = HALF_OPEN
+                state['probing'] = True
+                self._persist(key)
+                return True, None
+
+            if state['state'] == HALF_OPEN and not state['probing']:
+                state['probing'] = True
+                return True, None
+
+            return False, max(0.0, wait)
+
+    def record_success(self, key: str) -> None:
+        with self._lock:
+            state = self._state(key)
+            changed = state['state'] != CLOSED
+            state.update({
+                'state': CLOSED, 'failures': 0, 'opened_at': None,
+                'reset_timeout': self.reset_timeout, 'probing': False
+            })
+            if changed:
+                self._persist(key)
+
+    def record_failure(self, key: str) -> None:
+        with self._lock:
+            state = self._state(key)
+            state['failures'] += 1
+            state['probing'] = False
+
+            if state['state'] == HALF_OPEN:
+                state['reset_timeout'] = min(state['reset_timeout'] * 2, self.max_reset_timeout)
+            elif state['state'] == OPEN or state['failures'] < self.failure_threshold:
+                return
+
+            state['state'] = OPEN
+            state['opened_at'] = time.time()
+            self._persist(key)
+
+    def release(self, key: str) -> None:
+        """End a half-open probe that neither succeeded nor failed transiently."""
+        with self._lock:
+            self._state(key)['probing'] = False
+
+    def snapshot(self) -> Dict[str, Dict]:
+        """
+        Breakers that are not closed, with seconds until their next probe.
+
+        An open breaker whose reset time has passed is left out: the next
+        call probes it, and the instance that tripped it may be gone. So is a
+        half-open one whose probe never reported back.
+        """
+        with self._lock:
+            now = time.time()
+            snapshot = {}
+            for key, state in self._load().items():
+                if state['state'] == CLOSED:
+                    continue
+                wait = state['opened_at'] + state['reset_timeout'] - now
+                if (state['state'] == OPEN and wait <= 0) or wait < -self.max_reset_timeout:
+                    continue
+                snapshot[key] = {
+                    'state': state['state'],
+                    'failures': state['failures'],
+                    'retry_in': round(max(0.0, wait), 1)
+                }
+            return snapshot
+
+    def _persist(self, key: str) -> None:
+        try:
+            self.store.hset(self.STORE_KEY, key, self._states[key])
+        except StorageError:
+            pass
+
+
+def load_breaker_states(store=None) -> Dict[str, Dict]:
+    """Read shared breaker state without holding a CircuitBreakers instance."""
+    return CircuitBreakers(store=store).snapshot()
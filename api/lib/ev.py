@@ -0,0 +1,308 @@
+"""
+No-vig fair odds and positive expected value (+EV) bets.
+
+A second pass over the odds a scan already fetched. Each bookmaker's line
+(both sides of a total, all runners of a moneyline, both sides of a player
+prop) is normalized to remove that book's margin, the no-vig probabilities
+are averaged across bookmakers into a consensus fair probability, and every
+price that pays more than that fair probability implies is a +EV bet.
+
+Prices from every market of every event are collected into flat arrays and
+evaluated in one batch, with numpy when it is installed and a pure Python
+loop with the same results otherwise. numpy is pinned in api/requirements.txt
+so deployments take the vectorized path; the fallback, two to three times
+slower than the arbitrage analysis it runs beside (benchmarks/bench_ev.py),
+is for local installs without it.
+"""
+
+import os
+from array import array
+from typing import Dict, List, Optional, Tuple
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+# Smallest edge reported, in percent of stake
+MIN_EV_PERCENT = float(os.environ.get('EV_MIN_PERCENT', 1.0))
+# Bookmakers with a complete line needed before a consensus is trusted
+MIN_BOOKS = int(os.environ.get('EV_MIN_BOOKS', 2))
+
+def american_to_probability(odds: float) -> float:
+    """Implied probability of American odds."""
+    if odds > 0:
+        return 100 / (odds + 100)
+    return -odds / (100 - odds)
+
+
+def probability_to_american(probability: float) -> int:
+    """American odds that exactly price a probability."""
+    if probability >= 0.5:
+        return round(-100 * probability / (1 - probability)) if probability < 1 else -100000
+    return round(100 * (1 - probability) / probability)
+
+
+def _odds(value: float):
+    # Prices are stored as floats; American odds read back as ints
+    return int(value) if value.is_integer() else value
+
+
+class EVBatch:
+    """Collects a scan's prices for one vectorized no-vig pass."""
+
+    def __init__(self):
+        # One row per bookmaker price, in typed arrays numpy reads without
+        # copying. A line is one market of one event at one point and each
+        # bookmaker's prices for a line are de-vigged together; a selection
+        # is one outcome of a line. A row stores only its selection, whose
+        # line is looked up in selection_line.
+        self.prices = array('d')
+        self.books = array('q')
+        self.selections = array('q')
+
+        self.events: List[Dict] = []
+        self.line_info: List[Tuple[int, str]] = []
+        self.book_names: List[str] = []
+        self.selection_line = array('q')
+        self.selection_names: List[str] = []
+        self._book_ids: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.prices)
+
+    def _book(self, name: str) -> int:
+        book_id = self._book_ids.get(name)
+        if book_id is None:
+            book_id = self._book_ids[name] = len(self.book_names)
+            self.book_names.append(name)
+        return book_id
+
+    def _selection(self, event_index: int, lines: Dict[tuple, int], line_key: tuple, market: str,
+                   name: str) -> int:
+        """Register a new selection, and its line if that is new too."""
+        line_id = lines.get(line_key)
+        if line_id is None:
+            line_id = lines[line_key] = len(self.line_info)
+            self.line_info.append((event_index, market))
+        self.selection_line.append(line_id)
+        self.selection_names.append(name)
+        return len(self.selection_names) - 1
+
+    def add_markets(self, event_info: Dict, odds_dict: Dict) -> None:
+        """
+        Add an event's main markets.
+
+        Args:
+            event_info: Event summary from scanner.event_info_for
+            odds_dict: Output of scanner.build_market_odds for the event
+        """
+        event_index = len(self.events)
+        self.events.append(event_info)
+        lines: Dict[tuple, int] = {}
+        selection_ids: Dict[tuple, int] = {}
+        selections, books, prices = [], [], []
+
+        for market_key, outcomes in odds_dict.items():
+            for outcome_name, odds_list in outcomes.items():
+                for item in odds_list:
+                    if len(item) >= 3:
+                        # Spread sides carry opposite signs of the same line
+                        point = item[2]
+                        line = abs(point) if market_key == 'spreads' else point
+                        outcome = f"{outcome_name} {point}"
+                    else:
+                        line = None
+                        outcome = outcome_name
+                    selection_id = selection_ids.get((market_key, outcome))
+                    if selection_id is None:
+                        selection_id = selection_ids[(market_key, outcome)] = self._selection(
+                            event_index, lines, (market_key, line), market_key, outcome)
+                    selections.append(selection_id)
+                    books.append(self._book(item[0]))
+                    prices.append(item[1])
+
+        self.selections.extend(selections)
+        self.books.extend(books)
+        self.prices.extend(prices)
+
+    def add_props(self, event_info: Dict, event_odds: Dict, market_list: List[str]) -> None:
+        """
+        Add an event's player prop lines.
+
+        Reads the event odds payload rather than scanner.build_props_odds,
+        which keeps a single side per bookmaker and so can't be de-vigged.
+        Rows are gathered per event and appended to the arrays in bulk.
+
+        Args:
+            event_info: Event summary from scanner.event_info_for
+            event_odds: Response data from the event odds endpoint
+            market_list: Prop market keys to include
+        """
+        event_index = len(self.events)
+        self.events.append(event_info)
+        markets = set(market_list)
+        lines: Dict[tuple, int] = {}
+        selection_ids: Dict[tuple, int] = {}
+        selections, books, prices = [], [], []
+        add_selection, add_price = selections.append, prices.append
+
+        for bookmaker in event_odds.get('bookmakers', []):
+            book_id = self._book(bookmaker.get('title', bookmaker.get('key', 'Unknown')))
+            rows = len(selections)
+            for market in bookmaker.get('markets', []):
+                market_key = market['key']
+                if market_key not in markets:
+                    continue
+                for outcome in market.get('outcomes', []):
+                    description = outcome.get('description')
+                    if description is None:
+                        continue
+                    point = outcome.get('point')
+                    name = outcome['name']
+                    key = (market_key, description, point, name)
+                    selection_id = selection_ids.get(key)
+                    if selection_id is None:
+                        selection_id = selection_ids[key] = self._selection(
+                            event_index, lines, key[:3], f"{market_key} - {description}", f"{name} {point}")
+                    add_selection(selection_id)
+                    add_price(outcome['price'])
+            books.extend([book_id] * (len(selections) - rows))
+
+        self.selections.extend(selections)
+        self.books.extend(books)
+        self.prices.extend(prices)
+
+    def evaluate(self, min_ev: Optional[float] = None, min_books: Optional[int] = None) -> List[Dict]:
+        """
+        Find +EV bets across everything added so far.
+
+        Args:
+            min_ev: Smallest edge to report in percent (EV_MIN_PERCENT, default 1)
+            min_books: Bookmakers with a complete line required for a consensus
+                (EV_MIN_BOOKS, default 2)
+
+        Returns:
+            The best priced +EV bet of each outcome, sorted by EV descending
+        """
+        if not self.prices:
+            return []
+        min_ev = MIN_EV_PERCENT if min_ev is None else min_ev
+        min_books = MIN_BOOKS if min_books is None else min_books
+
+        evaluate = _evaluate_numpy if np is not None else _evaluate_python
+        rows = evaluate(self, min_ev / 100, min_books)
+
+        # Imported here: scanner imports this module
+        from .scanner import event_name
+        names = [event_name(event_info) for event_info in self.events]
+
+        bets = []
+        for row, fair_probability, books, ev in rows:
+            event_index, market = self.line_info[self.selection_line[self.selections[row]]]
+            event_info = self.events[event_index]
+            bets.append({
+                'event': names[event_index],
+                'sport': event_info['sport'],
+                'market': market,
+                'commence_time': event_info['commence_time'],
+                'outcome': self.selection_names[self.selections[row]],
+                'bookmaker': self.book_names[self.books[row]],
+                'odds': _odds(self.prices[row]),
+                'fair_odds': probability_to_american(fair_probability),
+                'fair_probability': round(fair_probability * 100, 2),
+                'ev': round(ev * 100, 2),
+                'books': books
+            })
+        bets.sort(key=lambda x: x['ev'], reverse=True)
+        return bets
+
+
+def _evaluate_numpy(batch: EVBatch, min_ev: float, min_books: int) -> List[Tuple[int, float, int, float]]:
+    """Vectorized evaluation; returns (row, fair probability, books, ev) of each best +EV price."""
+    prices = np.frombuffer(batch.prices, dtype=np.float64)
+    book_ids = np.frombuffer(batch.books, dtype=np.int64)
+    selections = np.frombuffer(batch.selections, dtype=np.int64)
+    selection_line = np.frombuffer(batch.selection_line, dtype=np.int64)
+    lines = selection_line[selections]
+    line_count, selection_count = len(batch.line_info), len(batch.selection_names)
+
+    positive = prices > 0
+    implied = np.where(positive, 100 / (np.abs(prices) + 100), np.abs(prices) / (np.abs(prices) + 100))
+    decimal = np.where(positive, 1 + prices / 100, 1 + 100 / np.abs(prices))
+
+    # A bookmaker's line is usable only when it prices every outcome of a
+    # line with two or more outcomes, each exactly once
+    groups = lines * len(batch.book_names) + book_ids
+    group_count = line_count * len(batch.book_names)
+    line_outcomes = np.bincount(selection_line, minlength=line_count)
+    pairs = selections * len(batch.book_names) + book_ids
+    repeated = np.bincount(pairs)[pairs] > 1
+    has_repeat = np.bincount(groups, weights=repeated, minlength=group_count) > 0
+    complete = ((np.bincount(groups, minlength=group_count)[groups] == line_outcomes[lines])
+                & (line_outcomes[lines] >= 2) & ~has_repeat[groups])
+
+    no_vig = implied / np.bincount(groups, weights=implied, minlength=group_count)[groups]
+    weight = complete.astype(float)
+    books = np.bincount(selections, weights=weight, minlength=selection_count)
+    fair = np.divide(np.bincount(selections, weights=no_vig * weight, minlength=selection_count), books,
+                     out=np.zeros(selection_count), where=books > 0)
+
+    ev = fair[selections] * decimal - 1
+
+    # Best price of each selection; the first row wins a tie
+    best = np.full(selection_count, -np.inf)
+    np.maximum.at(best, selections, ev)
+    candidates = np.flatnonzero((ev == best[selections]) & (books[selections] >= min_books) & (ev >= min_ev))
+    _, first = np.unique(selections[candidates], return_index=True)
+    keep = candidates[first]
+
+    return [(int(row), float(fair[selections[row]]), int(books[selections[row]]), float(ev[row])) for row in keep]
+
+
+def _evaluate_python(batch: EVBatch, min_ev: float, min_books: int) -> List[Tuple[int, float, int, float]]:
+    """Same as _evaluate_numpy, one row at a time."""
+    implied = [american_to_probability(odds) for odds in batch.prices]
+    groups = [(batch.selection_line[selection_id], book_id)
+              for selection_id, book_id in zip(batch.selections, batch.books)]
+
+    line_outcomes = [0] * len(batch.line_info)
+    for line_id in batch.selection_line:
+        line_outcomes[line_id] += 1
+    group_size: Dict[Tuple[int, int], int] = {}
+    group_sum: Dict[Tuple[int, int], float] = {}
+    priced = set()
+    repeated = set()
+    for row, group in enumerate(groups):
+        group_size[group] = group_size.get(group, 0) + 1
+        group_sum[group] = group_sum.get(group, 0.0) + implied[row]
+        pair = (batch.selections[row], group[1])
+        if pair in priced:
+            repeated.add(group)
+        priced.add(pair)
+
+    books = [0] * len(batch.selection_names)
+    fair_sum = [0.0] * len(batch.selection_names)
+    for row, group in enumerate(groups):
+        outcomes = line_outcomes[group[0]]
+        if outcomes >= 2 and group_size[group] == outcomes and group not in repeated:
+            selection_id = batch.selections[row]
+            books[selection_id] += 1
+            fair_sum[selection_id] += implied[row] / group_sum[group]
+
+    best: Dict[int, Tuple[float, int]] = {}
+    for row, selection_id in enumerate(batch.selections):
+        if books[selection_id] < min_books:
+            continue
+        odds = batch.prices[row]
+        decimal = 1 + odds / 100 if odds > 0 else 1 + 100 / -odds
+        ev = fair_sum[selection_id] / books[selection_id] * decimal - 1
+        if selection_id not in best or ev > best[selection_id][0]:
+            best[selection_id] = (ev, row)
+
+    return [
+        (row, fair_sum[selection_id] / books[selection_id], books[selection_id], ev)
+        for selection_id, (ev, row) in best.items()
+        if ev >= min_ev
+    ]
@@ -0,0 +1,360 @@
+"""
+Live change feeds of each sport's opportunities, published through the shared store.
+
+One publisher (`python api/feed.py`, on any long-running host) rescans the
+sports in FEED_SPORTS on an interval for the bookmakers in FEED_BOOKMAKERS,
+and diffs each result set against the previous one. Every diff is stored
+under its version next to the sport's current state, and the version and
+scan error alone under a small head key. /api/feed only reads them: each
+client polls the head and reads the diffs it has not seen, falling back to
+the full state only for its first snapshot or when it falls too far behind, so upstream cost is one scan per sport per interval however many
+clients connect and whichever instances serve them, and clients cannot
+start scans (or player prop scans, gated by FEED_INCLUDE_PROPS) of their own.
+A client that reconnects with the last version it saw gets the missed diffs
+instead of a new snapshot, as long as they are still stored.
+
+Main market prices are kept between scans in a PriceIndex, so each scan
+re-analyzes only the lines whose prices moved.
+"""
+
+import hashlib
+import json
+import os
+import time
+from typing import Callable, Dict, Iterator, List, Optional, Set, Tuple
+
+from .api_client import APIClient
+from .arbitrage import parse_and_filter_event_time
+from .markets import API_KEY_TO_BOOKMAKER, get_main_markets_for_sport, is_outright_sport
+from .planner import SUPERSET_BOOKMAKERS, RequestPlanner
+from .price_index import PriceIndex
+from .responses import dumps
+from .scanner import MAIN_MARKETS, event_info_for, format_opportunity, scan_main_markets, scan_props
+from .storage import StorageError, shared_store
+
+
+# Diffs kept for clients resuming after a reconnect
+HISTORY_SIZE = 64
+# Seconds between reads of the shared store while a client is connected
+POLL_SECONDS = float(os.environ.get('FEED_POLL_SECONDS', 1))
+
+
+def feed_sports() -> List[str]:
+    """Sports the publisher scans (FEED_SPORTS, comma-separated)."""
+    return [s.strip() for s in os.environ.get('FEED_SPORTS', '').split(',') if s.strip()]
+
+
+def feed_bookmakers() -> str:
+    """Bookmakers the publisher scans (FEED_BOOKMAKERS, default every supported one)."""
+    return os.environ.get('FEED_BOOKMAKERS') or SUPERSET_BOOKMAKERS
+
+
+def feed_include_props() -> bool:
+    """Player props are scanned only when FEED_INCLUDE_PROPS is set; they cost far more credits."""
+    return os.environ.get('FEED_INCLUDE_PROPS', '').lower() in ('1', 'true', 'yes')
+
+
+def state_key(sport_key: str) -> str:
+    return f"feed:{sport_key}"
+
+
+def delta_key(sport_key: str, version: int) -> str:
+    return f"feed:{sport_key}:{version}"
+
+
+def head_key(sport_key: str) -> str:
+    """Latest version and scan error of a feed, polled by every client."""
+    return f"feed:{sport_key}:head"
+
+
+def opportunity_id(opportunity: Dict) -> str:
+    """Stable id of an opportunity across scans: same event, market and outcomes."""
+    outcomes = sorted(bet['outcome'] for bet in opportunity['bets'])
+    identity = json.dumps([opportunity['sport'], opportunity['event'], opportunity['market'], outcomes])
+    return hashlib.sha1(identity.encode('utf-8')).hexdigest()[:16]
+
+
+def _prices(opportunity: Dict) -> List[Tuple[str, str, float]]:
+    return [(bet['outcome'], bet['bookmaker'], bet['odds']) for bet in opportunity['bets']]
+
+
+def diff_opportunities(previous: Dict[str, Dict], current: List[Dict]) -> Tuple[Dict[str, Dict], Dict]:
+    """
+    Compare two result sets.
+
+    Args:
+        previous: Opportunities of the last scan by id
+        current: Opportunities of this scan
+
+    Returns:
+        (current by id, delta) where delta has 'added' and 'changed'
+        opportunities (with their id) and 'removed' ids. An opportunity has
+        changed when its ROI or any bet's bookmaker or odds moved.
+    """
+    by_id = {}
+    for opportunity in current:
+        by_id[opportunity_id(opportunity)] = dict(opportunity, id=opportunity_id(opportunity))
+
+    added, changed = [], []
+    for opp_id, opportunity in by_id.items():
+        before = previous.get(opp_id)
+        if before is None:
+            added.append(opportunity)
+        elif before['roi'] != opportunity['roi'] or _prices(before) != _prices(opportunity):
+            changed.append(opportunity)
+    removed = [opp_id for opp_id in previous if opp_id not in by_id]
+
+    return by_id, {'added': added, 'changed': changed, 'removed': removed}
+
+
+def sse_event(event: str, payload: Dict, event_id: Optional[int] = None) -> bytes:
+    """Encode one server-sent event."""
+    head = f"id: {event_id}\n" if event_id is not None else ''
+    return head.encode() + f"event: {event}\ndata: ".encode() + dumps(payload) + b"\n\n"
+
+
+class LiveScanner:
+    """Rescans one sport and publishes the differences to the shared store."""
+
+    def __init__(
+        self,
+        sport_key: str,
+        bookmakers: str,
+        include_props: bool = False,
+        interval: Optional[float] = None,
+        client_factory: Callable[[], APIClient] = APIClient,
+        store=None
+    ):
+        """
+        Initialize the scanner, continuing from the state already published.
+
+        Args:
+            sport_key: Sport to scan
+            bookmakers: Comma-separated bookmaker keys
+            include_props: Also scan player props (costs far more credits)
+            interval: Seconds between scans (FEED_SCAN_SECONDS, default 60)
+            client_factory: Builds the API client for each scan
+            store: Where the feed is published. Defaults to storage.shared_store().
+        """
+        self.sport_key = sport_key
+        self.bookmakers = bookmakers
+        self.include_props = include_props
+        self.interval = interval if interval is not None else float(os.environ.get('FEED_SCAN_SECONDS', 60))
+        self.client_factory = client_factory
+        self.store = store or shared_store()
+
+        state = self.store.get(state_key(sport_key)) or {}
+        # Keep versions increasing across restarts so reconnecting clients resume
+        self.version = state.get('version', 0)
+        self.current: Dict[str, Dict] = {opp['id']: opp for opp in state.get('opportunities', [])}
+        self.remaining_credits: Optional[str] = None
+        self.error: Optional[str] = None
+        self.index = PriceIndex()
+        self.events: Dict[str, Dict] = {}
+
+    def scan_main_markets(self, planner: RequestPlanner) -> List[Dict]:
+        """Main market opportunities, re-analyzing only the lines whose prices moved."""
+        if is_outright_sport(self.sport_key):
+            # A field is priced as a whole, not line by line
+            return scan_main_markets(planner, self.sport_key, self.bookmakers)
+
+        result = planner.get_sports_odds(sport_key=self.sport_key, bookmakers=self.bookmakers,
+                                         markets=get_main_markets_for_sport(self.sport_key))
+        events = {}
+        for event in result['data']:
+            is_valid_time, formatted_time = parse_and_filter_event_time(event.get('commence_time'))
+            if not is_valid_time:
+                continue
+            events[event['id']] = event_info_for(event, self.sport_key, formatted_time)
+            self.index.ingest_event(event, MAIN_MARKETS)
+        # Started or delisted events
+        for event_id in self.index.events() - set(events):
+            self.index.drop_event(event_id)
+        self.events = events
+
+        return [
+            format_opportunity(events[event_id], market, arb)
+            for (event_id, market, _), arb in self.index.opportunities()
+        ]
+
+    def scan_once(self) -> Dict:
+        """Run one scan and publish its delta if anything changed."""
+        try:
+            planner = RequestPlanner(self.client_factory())
+            opportunities = self.scan_main_markets(planner)
+            if self.include_props:
+                opportunities.extend(scan_props(planner, self.sport_key, self.bookmakers))
+            opportunities.sort(key=lambda x: x['roi'], reverse=True)
+        except Exception as e:
+            # Keep scanning; subscribers see the error until a scan succeeds
+            self.error = str(e)
+            self._publish_state()
+            return {'added': [], 'changed': [], 'removed': []}
+
+        self.current, delta = diff_opportunities(self.current, opportunities)
+        self.remaining_credits = planner.remaining_credits
+        self.error = None
+        if delta['added'] or delta['changed'] or delta['removed'] or self.version == 0:
+            self.version += 1
+            payload = dict(delta, version=self.version, total=len(self.current),
+                           remaining_credits=self.remaining_credits)
+            try:
+                self.store.set(delta_key(self.sport_key, self.version), payload,
+                               ttl=HISTORY_SIZE * max(self.interval, 1.0))
+            except StorageError:
+                pass
+        self._publish_state()
+        return delta
+
+    def _publish_state(self) -> None:
+        state = {
+            'version': self.version,
+            'opportunities': sorted(self.current.values(), key=lambda x: x['roi'], reverse=True),
+            'remaining_credits': self.remaining_credits,
+            'error': self.error,
+            'bookmakers': self.bookmakers,
+            'include_props': self.include_props,
+            'updated_at': time.time()
+        }
+        head = {'version': self.version, 'error': self.error, 'updated_at': state['updated_at']}
+        try:
+            # State first, so a client that sees the new head finds it
+            self.store.set(state_key(self.sport_key), state)
+            self.store.set(head_key(self.sport_key), head)
+        except StorageError:
+            pass
+
+
+def run_publisher(
+    sports: Optional[List[str]] = None,
+    bookmakers: Optional[str] = None,
+    include_props: Optional[bool] = None,
+    interval: Optional[float] = None,
+    rounds: Optional[int] = None,
+    store=None
+) -> List[LiveScanner]:
+    """
+    Scan every feed sport once per interval, publishing each one's changes.
+
+    Arguments default to FEED_SPORTS, FEED_BOOKMAKERS, FEED_INCLUDE_PROPS and
+    FEED_SCAN_SECONDS. Runs forever unless rounds is given.
+    """
+    sports = sports if sports is not None else feed_sports()
+    scanners = [
+        LiveScanner(sport_key, bookmakers or feed_bookmakers(),
+                    feed_include_props() if include_props is None else include_props, interval, store=store)
+        for sport_key in sports
+    ]
+    done = 0
+    while scanners and (rounds is None or done < rounds):
+        started = time.monotonic()
+        for scanner in scanners:
+            scanner.scan_once()
+        done += 1
+        if rounds is None or done < rounds:
+            time.sleep(max(0.0, scanners[0].interval - (time.monotonic() - started)))
+    return scanners
+
+
+def _visible(opportunity: Dict, titles: Optional[Set[str]]) -> bool:
+    return titles is None or all(bet['bookmaker'] in titles for bet in opportunity['bets'])
+
+
+def _filter_delta(delta: Dict, titles: Optional[Set[str]], sent: Set[str], resumed: bool) -> Dict:
+    """
+    A delta restricted to opportunities placeable with the client's bookmakers.
+
+    sent holds the ids this client has been sent and is updated in place. An
+    opportunity the client never received is sent as added, even when the
+    publisher saw it change, and one it did receive that is now hidden is
+    sent as removed. A resumed client may hold ids from before its
+    reconnect, so hidden changes are always removed for it. Without a
+    filter the client holds exactly what the publisher diffed against.
+    """
+    if titles is None:
+        return delta
+    added, changed, removed = [], [], []
+    for opp in delta['added'] + delta['changed']:
+        opp_id = opp['id']
+        if _visible(opp, titles):
+            (changed if opp_id in sent else added).append(opp)
+            sent.add(opp_id)
+        elif opp_id in sent or resumed:
+            removed.append(opp_id)
+            sent.discard(opp_id)
+    for opp_id in delta['removed']:
+        if opp_id in sent or resumed:
+            removed.append(opp_id)
+            sent.discard(opp_id)
+    return dict(delta, added=added, changed=changed, removed=removed)
+
+
+def _snapshot_event(state: Dict, titles: Optional[Set[str]], sent: Set[str]) -> bytes:
+    opportunities = [opp for opp in state['opportunities'] if _visible(opp, titles)]
+    sent.clear()
+    sent.update(opp['id'] for opp in opportunities)
+    payload = {
+        'version': state['version'],
+        'opportunities': opportunities,
+        'remaining_credits': state['remaining_credits']
+    }
+    return sse_event('snapshot', payload, state['version'])
+
+
+def subscribe(
+    sport_key: str,
+    last_version: Optional[int] = None,
+    bookmakers: Optional[List[str]] = None,
+    max_seconds: float = 55.0,
+    keepalive: float = 15.0,
+    store=None
+) -> Iterator[bytes]:
+    """
+    Stream encoded events of a published feed for one client.
+
+    Starts with the diffs since last_version when they are all still stored,
+    otherwise with a full snapshot. Only the small head key is polled; the
+    full state is read for a snapshot alone. Only opportunities whose every bet is at
+    one of the given bookmaker keys are sent. Ends after max_seconds so
+    serverless invocations finish; the client reconnects with its last
+    version and resumes from there.
+    """
+    store = store or shared_store()
+    titles = {API_KEY_TO_BOOKMAKER.get(key, key) for key in bookmakers} if bookmakers else None
+    deadline = time.monotonic() + max_seconds
+    sent = last_version
+    # Ids this connection has sent; before its first snapshot a resumed
+    # client may also hold ids from an earlier connection
+    sent_ids: Set[str] = set()
+    resumed = last_version is not None
+    last_yield = time.monotonic()
+
+    while time.monotonic() < deadline:
+        head = store.get(head_key(sport_key))
+        pending = []
+        if head is not None and head['version'] and head['version'] != sent:
+            version = head['version']
+            deltas = None
+            if sent is not None and 0 < version - sent <= HISTORY_SIZE:
+                deltas = [store.get(delta_key(sport_key, v)) for v in range(sent + 1, version + 1)]
+                if any(delta is None for delta in deltas):
+                    # Expired; start over from a snapshot
+                    deltas = None
+            if deltas is not None:
+                pending = [sse_event('delta', _filter_delta(delta, titles, sent_ids, resumed), delta['version'])
+                           for delta in deltas]
+                sent = version
+            else:
+                state = store.get(state_key(sport_key))
+                if state is not None:
+                    pending = [_snapshot_event(state, titles, sent_ids)]
+                    resumed = False
+                    sent = state['version']
+
+        if pending:
+            yield from pending
+            last_yield = time.monotonic()
+        elif time.monotonic() - last_yield >= keepalive:
+            yield sse_event('error', {'error': head['error']}) if head and head.get('error') else b": keepalive\n\n"
+            last_yield = time.monotonic()
+        time.sleep(min(POLL_SECONDS, max(0.0, deadline - time.monotonic())))
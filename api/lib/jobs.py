@@ -0,0 +1,446 @@
+"""
+Background scan jobs backed by a local SQLite queue.
+
+A job is split into tasks: one 'main' task per sport, and, once a sport's
+main markets are scanned, one 'props' task per upcoming event. Workers lease
+tasks, and each finished task's opportunities are committed with it, so
+progress is checkpointed task by task. A worker that dies loses only its
+leased tasks, which go back to the queue when the lease expires. Clients page
+through results as they arrive with a cursor.
+
+SQLite stands in for a real broker: it is shared by every process on one
+machine (or one warm serverless instance) through the state dir.
+"""
+
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional
+
+from .api_client import APIClient
+from .arbitrage import parse_and_filter_event_time
+from .markets import get_markets_for_sport
+from .planner import RequestPlanner
+from .result_store import ResultStore
+from .scanner import scan_event_props, scan_main_markets
+from .storage import state_dir
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    params TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    scan_id TEXT,
+    remaining_credits TEXT
+);
+CREATE TABLE IF NOT EXISTS tasks (
+    job_id TEXT NOT NULL,
+    task_id INTEGER NOT NULL,
+    kind TEXT NOT NULL,
+    sport_key TEXT NOT NULL,
+    payload TEXT,
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    lease_owner TEXT,
+    lease_until REAL,
+    error TEXT,
+    PRIMARY KEY (job_id, task_id)
+);
+CREATE INDEX IF NOT EXISTS tasks_by_status ON tasks (status, lease_until);
+CREATE TABLE IF NOT EXISTS results (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    job_id TEXT NOT NULL,
+    opportunity TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS results_by_job ON results (job_id, seq);
+"""
+
+# Job and task states
+QUEUED, RUNNING, DONE = 'queued', 'running', 'done'
+PENDING, LEASED, FAILED = 'pending', 'leased', 'failed'
+
+
+class JobError(Exception):
+    """Raised for unknown jobs."""
+    pass
+
+
+class JobQueue:
+    """SQLite-backed queue of scan jobs and their tasks."""
+
+    def __init__(self, path: Optional[str] = None, ttl: Optional[int] = None):
+        """
+        Initialize the queue.
+
+        Args:
+            path: Database file. Defaults to jobs.db in the shared state dir.
+            ttl: Seconds a job is kept after creation (JOB_TTL_SECONDS, default 3600)
+        """
+        self.path = path or os.path.join(state_dir('jobs'), 'jobs.db')
+        self.ttl = ttl if ttl is not None else int(os.environ.get('JOB_TTL_SECONDS', 3600))
+        with self._connect() as db:
+            db.execute('PRAGMA journal_mode=WAL')
+            db.executescript(SCHEMA)
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        # One connection per call keeps the queue safe to use from any thread
+        db = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        db.row_factory = sqlite3.Row
+        try:
+            yield db
+        except BaseException:
+            if db.in_transaction:
+                db.execute('ROLLBACK')
+            raise
+        finally:
+            db.close()
+
+    def enqueue(self, sport_keys: List[str], bookmakers: str, include_props: bool = True,
+                max_prop_events: Optional[int] = None) -> str:
+        """
+        Create a job with one main-markets task per sport.
+
+        Args:
+            sport_keys: Sports to scan
+            bookmakers: Comma-separated bookmaker keys
+            include_props: Also scan player props of each upcoming event
+            max_prop_events: Cap on prop events per sport (default: all)
+
+        Returns:
+            The job id
+        """
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        params = {
+            'sport_keys': sport_keys,
+            'bookmakers': bookmakers,
+            'include_props': include_props,
+            'max_prop_events': max_prop_events
+        }
+        with self._connect() as db:
+            db.execute('BEGIN IMMEDIATE')
+            db.execute('INSERT INTO jobs (id, status, params, created_at, updated_at) VALUES (?, ?, ?, ?, ?)',
+                       (job_id, QUEUED, json.dumps(params), now, now))
+            db.executemany(
+                'INSERT INTO tasks (job_id, task_id, kind, sport_key, status) VALUES (?, ?, ?, ?, ?)',
+                [(job_id, i, 'main', sport_key, PENDING) for i, sport_key in enumerate(sport_keys)]
+            )
+            db.execute('COMMIT')
+        self.purge()
+        return job_id
+
+    def claim(self, owner: str, lease_seconds: float) -> Optional[Dict]:
+        """
+        Lease the next runnable task: pending, or leased by a worker whose lease expired.
+
+        Older jobs go first, and within a job main tasks precede the props
+        tasks they create.
+        """
+        now = time.time()
+        with self._connect() as db:
+            db.execute('BEGIN IMMEDIATE')
+            row = db.execute(
+                """SELECT t.job_id, t.task_id, t.kind, t.sport_key, t.payload, t.attempts, j.params
+                   FROM tasks t JOIN jobs j ON j.id = t.job_id
+                   WHERE j.status IN (?, ?)
+                     AND (t.status = ? OR (t.status = ? AND t.lease_until < ?))
+                   ORDER BY j.created_at, t.task_id LIMIT 1""",
+                (QUEUED, RUNNING, PENDING, LEASED, now)
+            ).fetchone()
+            if row is None:
+                db.execute('COMMIT')
+                return None
+
+            db.execute(
+                """UPDATE tasks SET status = ?, lease_owner = ?, lease_until = ?, attempts = attempts + 1
+                   WHERE job_id = ? AND task_id = ?""",
+                (LEASED, owner, now + lease_seconds, row['job_id'], row['task_id'])
+            )
+            db.execute('UPDATE jobs SET status = ?, updated_at = ? WHERE id = ? AND status = ?',
+                       (RUNNING, now, row['job_id'], QUEUED))
+            db.execute('COMMIT')
+
+        return {
+            'job_id': row['job_id'],
+            'task_id': row['task_id'],
+            'kind': row['kind'],
+            'sport_key': row['sport_key'],
+            'payload': json.loads(row['payload']) if row['payload'] else None,
+            'attempts': row['attempts'] + 1,
+            'params': json.loads(row['params']),
+            'owner': owner
+        }
+
+    def _owns(self, db: sqlite3.Connection, task: Dict) -> bool:
+        row = db.execute('SELECT status, lease_owner FROM tasks WHERE job_id = ? AND task_id = ?',
+                         (task['job_id'], task['task_id'])).fetchone()
+        return row is not None and row['status'] == LEASED and row['lease_owner'] == task['owner']
+
+    def complete(self, task: Dict, opportunities: List[Dict], new_tasks: Optional[List[Dict]] = None,
+                 remaining_credits: Optional[str] = None) -> bool:
+        """
+        Checkpoint a finished task: its results, follow-up tasks and status in one transaction.
+
+        Results from a worker whose lease was taken over are dropped, so a
+        slow worker can't duplicate the results of the one that replaced it.
+
+        Returns:
+            True if this completion finished the job
+        """
+        job_id = task['job_id']
+        with self._connect() as db:
+            db.execute('BEGIN IMMEDIATE')
+            if not self._owns(db, task):
+                db.execute('COMMIT')
+                return False
+
+            db.executemany('INSERT INTO results (job_id, opportunity) VALUES (?, ?)',
+                           [(job_id, json.dumps(opp)) for opp in opportunities])
+            if new_tasks:
+                next_id = db.execute('SELECT MAX(task_id) + 1 FROM tasks WHERE job_id = ?', (job_id,)).fetchone()[0]
+                db.executemany(
+                    'INSERT INTO tasks (job_id, task_id, kind, sport_key, payload, status) VALUES (?, ?, ?, ?, ?, ?)',
+                    [(job_id, next_id + i, t['kind'], t['sport_key'], json.dumps(t.get('payload')), PENDING)
+                     for i, t in enumerate(new_tasks)]
+                )
+            db.execute('UPDATE tasks SET status = ?, lease_owner = NULL, lease_until = NULL WHERE job_id = ? AND task_id = ?',
+                       (DONE, job_id, task['task_id']))
+            if remaining_credits is not None:
+                db.execute('UPDATE jobs SET remaining_credits = ? WHERE id = ?', (remaining_credits, job_id))
+            finished = self._finish_if_drained(db, job_id)
+            db.execute('COMMIT')
+        return finished
+
+    def fail(self, task: Dict, error: str, max_attempts: int = 3) -> bool:
+        """
+        Return a failed task to the queue, or mark it failed after max_attempts.
+
+        Returns:
+            True if this failure finished the job
+        """
+        job_id = task['job_id']
+        status = FAILED if task['attempts'] >= max_attempts else PENDING
+        with self._connect() as db:
+            db.execute('BEGIN IMMEDIATE')
+            if not self._owns(db, task):
+                db.execute('COMMIT')
+                return False
+            db.execute(
+                """UPDATE tasks SET status = ?, error = ?, lease_owner = NULL, lease_until = NULL
+                   WHERE job_id = ? AND task_id = ?""",
+                (status, error, job_id, task['task_id'])
+            )
+            finished = self._finish_if_drained(db, job_id)
+            db.execute('COMMIT')
+        return finished
+
+    def _finish_if_drained(self, db: sqlite3.Connection, job_id: str) -> bool:
+        open_tasks = db.execute('SELECT COUNT(*) FROM tasks WHERE job_id = ? AND status IN (?, ?)',
+                                (job_id, PENDING, LEASED)).fetchone()[0]
+        if open_tasks:
+            return False
+        db.execute('UPDATE jobs SET status = ?, updated_at = ? WHERE id = ?', (DONE, time.time(), job_id))
+        return True
+
+    def finalize(self, job_id: str, store: Optional[ResultStore] = None) -> str:
+        """Save a finished job's ranked results to the result store for /api/results."""
+        opportunities = [opp for _, opp in self._results(job_id, 0, None)]
+        opportunities.sort(key=lambda x: x['roi'], reverse=True)
+        status = self.status(job_id)
+        scan_id = (store or ResultStore()).save(opportunities, {
+            'sport_keys': status['params']['sport_keys'],
+            'bookmakers': status['params']['bookmakers'].split(','),
+            'job_id': job_id
+        })
+        with self._connect() as db:
+            db.execute('UPDATE jobs SET scan_id = ? WHERE id = ?', (scan_id, job_id))
+        return scan_id
+
+    def status(self, job_id: str) -> Dict:
+        """Job state with task counts by kind and status."""
+        with self._connect() as db:
+            job = db.execute('SELECT * FROM jobs WHERE id = ?', (job_id,)).fetchone()
+            if job is None:
+                raise JobError("Job not found or expired.")
+            counts = db.execute('SELECT kind, status, COUNT(*) AS n FROM tasks WHERE job_id = ? GROUP BY kind, status',
+                                (job_id,)).fetchall()
+            found = db.execute('SELECT COUNT(*) FROM results WHERE job_id = ?', (job_id,)).fetchone()[0]
+            errors = [row['error'] for row in db.execute(
+                'SELECT error FROM tasks WHERE job_id = ? AND status = ? LIMIT 20', (job_id, FAILED))]
+
+        tasks: Dict[str, Dict[str, int]] = {}
+        for row in counts:
+            tasks.setdefault(row['kind'], {})[row['status']] = row['n']
+        total = sum(n for by_status in tasks.values() for n in by_status.values())
+        finished = sum(by_status.get(DONE, 0) + by_status.get(FAILED, 0) for by_status in tasks.values())
+
+        return {
+            'job_id': job_id,
+            'status': job['status'],
+            'params': json.loads(job['params']),
+            'created_at': job['created_at'],
+            'updated_at': job['updated_at'],
+            'tasks': tasks,
+            # Props tasks are only known once their sport is scanned, so this can move backwards
+            'progress': round(finished / total * 100, 1) if total else 100.0,
+            'total_found': found,
+            'errors': errors,
+            'scan_id': job['scan_id'],
+            'remaining_credits': job['remaining_credits']
+        }
+
+    def _results(self, job_id: str, cursor: int, limit: Optional[int]):
+        query = 'SELECT seq, opportunity FROM results WHERE job_id = ? AND seq > ? ORDER BY seq'
+        args = [job_id, cursor]
+        if limit is not None:
+            query += ' LIMIT ?'
+            args.append(limit)
+        with self._connect() as db:
+            return [(row['seq'], json.loads(row['opportunity'])) for row in db.execute(query, args)]
+
+    def results(self, job_id: str, cursor: int = 0, limit: int = 500) -> Dict:
+        """
+        Opportunities found since a cursor, in the order tasks completed.
+
+        Returns:
+            Dict with opportunities (best ROI first within the page) and the
+            cursor to pass next time
+        """
+        rows = self._results(job_id, cursor, limit)
+        opportunities = [opp for _, opp in rows]
+        opportunities.sort(key=lambda x: x['roi'], reverse=True)
+        return {
+            'opportunities': opportunities,
+            'next_cursor': rows[-1][0] if rows else cursor
+        }
+
+    def purge(self) -> None:
+        """Drop jobs older than the TTL along with their tasks and results."""
+        cutoff = time.time() - self.ttl
+        with self._connect() as db:
+            db.execute('BEGIN IMMEDIATE')
+            expired = [row[0] for row in db.execute('SELECT id FROM jobs WHERE created_at < ?', (cutoff,))]
+            for table, column in (('results', 'job_id'), ('tasks', 'job_id'), ('jobs', 'id')):
+                db.executemany(f'DELETE FROM {table} WHERE {column} = ?', [(job_id,) for job_id in expired])
+            db.execute('COMMIT')
+
+
+class JobWorker:
+    """
+    Runs queued tasks on a pool of threads.
+
+    Each thread has its own APIClient and leases one task at a time, so
+    sports and events of a job are scanned in parallel, by this worker and
+    by any other worker process sharing the queue.
+    """
+
+    def __init__(
+        self,
+        queue: JobQueue,
+        client_factory: Callable[[], APIClient] = APIClient,
+        threads: int = 4,
+        lease_seconds: float = 120,
+        max_attempts: int = 3,
+        worker_id: Optional[str] = None
+    ):
+        """
+        Initialize the worker.
+
+        Args:
+            queue: Queue to take tasks from
+            client_factory: Builds the API client of each thread
+            threads: Tasks processed concurrently
+            lease_seconds: How long a task may run before another worker takes it over
+            max_attempts: Attempts per task before it is marked failed
+            worker_id: Lease owner name. Defaults to host and pid.
+        """
+        self.queue = queue
+        self.client_factory = client_factory
+        self.threads = threads
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+        self.processed = 0
+        self._lock = threading.Lock()
+
+    def run(self, deadline: Optional[float] = None, until_idle: bool = True, poll_interval: float = 1.0) -> int:
+        """
+        Process tasks until the queue is empty or the deadline passes.
+
+        Args:
+            deadline: Seconds after which no new task is claimed
+            until_idle: Return once no task is runnable; otherwise keep polling
+            poll_interval: Seconds to wait between polls of an empty queue
+
+        Returns:
+            Number of tasks processed
+        """
+        stop_at = time.monotonic() + deadline if deadline is not None else None
+        pool = [
+            threading.Thread(target=self._loop, args=(f"{self.worker_id}/{i}", stop_at, until_idle, poll_interval),
+                             name=f'scan-job-{i}', daemon=True)
+            for i in range(self.threads)
+        ]
+        for thread in pool:
+            thread.start()
+        for thread in pool:
+            thread.join()
+        return self.processed
+
+    def _loop(self, owner: str, stop_at: Optional[float], until_idle: bool, poll_interval: float) -> None:
+        client = self.client_factory()
+        while stop_at is None or time.monotonic() < stop_at:
+            task = self.queue.claim(owner, self.lease_seconds)
+            if task is None:
+                if until_idle:
+                    return
+                time.sleep(poll_interval)
+                continue
+            self.process(client, task)
+
+    def process(self, client: APIClient, task: Dict) -> None:
+        """Run one task and checkpoint its outcome."""
+        params = task['params']
+        planner = RequestPlanner(client)
+        try:
+            if task['kind'] == 'main':
+                opportunities = scan_main_markets(planner, task['sport_key'], params['bookmakers'])
+                new_tasks = self._prop_tasks(planner, task['sport_key'], params)
+            else:
+                market_list = get_markets_for_sport(task['sport_key']).split(',')
+                opportunities = scan_event_props(planner, task['sport_key'], task['payload'],
+                                                 params['bookmakers'], market_list)
+                new_tasks = []
+        except Exception as e:
+            # Retried by this or another worker until max_attempts
+            finished = self.queue.fail(task, str(e), self.max_attempts)
+        else:
+            finished = self.queue.complete(task, opportunities, new_tasks, planner.remaining_credits)
+
+        with self._lock:
+            self.processed += 1
+        if finished:
+            self.queue.finalize(task['job_id'])
+
+    @staticmethod
+    def _prop_tasks(planner: RequestPlanner, sport_key: str, params: Dict) -> List[Dict]:
+        """One props task per upcoming event, from the event list the main scan already fetched."""
+        if not params.get('include_props') or not get_markets_for_sport(sport_key):
+            return []
+
+        events = [
+            event for event in planner.get_events(sport_key)['data']
+            if parse_and_filter_event_time(event.get('commence_time'))[0]
+        ]
+        if params.get('max_prop_events'):
+            events = events[:params['max_prop_events']]
+        return [{'kind': 'props', 'sport_key': sport_key, 'payload': event} for event in events]
@@ -1,5 +1,7 @@
 """Market definitions and bookmaker mappings for sports betting API."""
 
+from typing import List, Optional
+
 # Player prop markets by sport
 AMERICAN_FOOTBALL_MARKETS = 'player_assists,player_defensive_interceptions,player_field_goals,player_kicking_points,player_pass_attempts,player_pass_completions,player_pass_interceptions,player_pass_longest_completion,player_pass_rush_yds,player_pass_rush_reception_tds,player_pass_rush_reception_yds,player_pass_tds,player_pass_yds,player_pass_yds_q1,player_pats,player_receptions,player_reception_longest,player_reception_tds,player_reception_yds,player_rush_attempts,player_rush_longest,player_rush_reception_tds,player_rush_reception_yds,player_rush_tds,player_rush_yds,player_sacks,player_solo_tackles,player_tackles_assists'
 
@@ -26,8 +28,67 @@ BOOKMAKER_API_KEYS = {
     'MyBookie.ag': 'mybookieag'
 }
 
+# Regions the API groups bookmakers into; BOOKMAKER_API_KEYS is 'us'
+REGIONS = ('us', 'us2', 'uk', 'eu', 'au')
+
+REGION_BOOKMAKERS = {
+    'us': BOOKMAKER_API_KEYS,
+    'us2': {
+        'Bally Bet': 'ballybet',
+        'BetAnything': 'betanysports',
+        'betPARX': 'betparx',
+        'ESPN BET': 'espnbet',
+        'Fliff': 'fliff',
+        'Hard Rock Bet': 'hardrockbet'
+    },
+    'uk': {
+        '888sport': 'sport888',
+        'Betfair Exchange (UK)': 'betfair_ex_uk',
+        'Betfair Sportsbook': 'betfair_sb_uk',
+        'BetVictor': 'betvictor',
+        'Betway': 'betway',
+        'Coral': 'coral',
+        'Ladbrokes (UK)': 'ladbrokes_uk',
+        'LeoVegas': 'leovegas',
+        'Paddy Power': 'paddypower',
+        'Sky Bet': 'skybet',
+        'Smarkets': 'smarkets',
+        'Unibet (UK)': 'unibet_uk',
+        'Virgin Bet': 'virginbet',
+        'William Hill': 'williamhill'
+    },
+    'eu': {
+        '1xBet': 'onexbet',
+        'Betclic': 'betclic',
+        'Betsson': 'betsson',
+        'Coolbet': 'coolbet',
+        'Everygame': 'everygame',
+        'GTbets': 'gtbets',
+        'Marathon Bet': 'marathonbet',
+        'Matchbook': 'matchbook',
+        'Nordic Bet': 'nordicbet',
+        'Pinnacle': 'pinnacle',
+        'Unibet (EU)': 'unibet_eu'
+    },
+    'au': {
+        'Betr': 'betr_au',
+        'BetRight': 'betright',
+        'Ladbrokes (AU)': 'ladbrokes_au',
+        'Neds': 'neds',
+        'PlayUp': 'playup',
+        'PointsBet (AU)': 'pointsbetau',
+        'SportsBet': 'sportsbet',
+        'TAB': 'tab',
+        'TABtouch': 'tabtouch'
+    }
+}
+
+# Every bookmaker in every region, and the region of each API key
+ALL_BOOKMAKER_API_KEYS = {name: key for books in REGION_BOOKMAKERS.values() for name, key in books.items()}
+BOOKMAKER_REGION = {key: region for region, books in REGION_BOOKMAKERS.items() for key in books.values()}
+
 # Reverse mapping: API key to display name
-API_KEY_TO_BOOKMAKER = {v: k for k, v in BOOKMAKER_API_KEYS.items()}
+API_KEY_TO_BOOKMAKER = {v: k for k, v in ALL_BOOKMAKER_API_KEYS.items()}
 
 # Sports that use specific market types
 AMERICAN_FOOTBALL_SPORTS = ['americanfootball_nfl', 'americanfootball_ncaaf', 'americanfootball_cfl']
@@ -39,6 +100,21 @@ SOCCER_SPORTS = ['soccer_epl', 'soccer_france_ligue_one', 'soccer_germany_bundes
                  'soccer_italy_serie_a', 'soccer_spain_la_liga', 'soccer_usa_mls']
 
 
+# Futures sports (e.g. golf_masters_tournament_winner) only offer this market
+OUTRIGHT_MARKET = 'outrights'
+MAIN_MARKETS_PARAM = 'h2h,spreads,totals'
+
+
+def is_outright_sport(sport_key: str) -> bool:
+    """Check whether a sport key is an outright/futures market."""
+    return sport_key.lower().endswith('_winner')
+
+
+def get_main_markets_for_sport(sport_key: str) -> str:
+    """Get the bulk odds markets string for a given sport key."""
+    return OUTRIGHT_MARKET if is_outright_sport(sport_key) else MAIN_MARKETS_PARAM
+
+
 def get_markets_for_sport(sport_key: str) -> str:
     """Get the player prop markets string for a given sport key."""
     if sport_key in AMERICAN_FOOTBALL_SPORTS:
@@ -56,9 +132,10 @@ def get_markets_for_sport(sport_key: str) -> str:
     return ''
 
 
-def get_bookmakers_list():
-    """Get list of all bookmakers with their API keys."""
+def get_bookmakers_list(regions: Optional[List[str]] = None):
+    """Get list of the bookmakers in the given regions (default 'us') with their API keys."""
     return [
-        {'key': api_key, 'name': display_name}
-        for display_name, api_key in BOOKMAKER_API_KEYS.items()
+        {'key': api_key, 'name': display_name, 'region': region}
+        for region in (regions or ['us'])
+        for display_name, api_key in REGION_BOOKMAKERS[region].items()
     ]
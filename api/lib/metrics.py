@@ -0,0 +1,288 @@
+"""Process metrics shared across serverless functions through the shared store."""
+
+import hashlib
+import os
+import socket
+import threading
+import time
+import uuid
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .storage import StorageError, shared_store
+
+
+LATENCY_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+SCAN_BUCKETS = (1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 45.0, 60.0)
+# Credit samples kept per process for the burn rate
+CREDIT_SAMPLES = 500
+BURN_RATE_WINDOW = 3600.0
+# Processes that have not flushed for this long are dropped from collect()
+RETENTION_SECONDS = float(os.environ.get('METRICS_RETENTION_SECONDS', 86400))
+# Hash in the shared store holding one field per process
+STORE_KEY = 'metrics'
+
+HELP = {
+    'upstream_requests_total': ('counter', 'Upstream Odds API requests by endpoint kind and status'),
+    'upstream_latency_seconds': ('histogram', 'Upstream Odds API latency by endpoint kind'),
+    'credits_used_total': ('counter', 'Credits charged by upstream (x-requests-last)'),
+    'cache_lookups_total': ('counter', 'Response cache lookups by cache and result'),
+    'scan_duration_seconds': ('histogram', 'Duration of /api/scan by sport'),
+    'opportunities_found_total': ('counter', 'Arbitrage opportunities found by market type'),
+    'prewarm_entries_total': ('counter', 'Odds cache entries considered by the pre-warmer by result'),
+}
+
+
+def _labels(**labels: str) -> str:
+    return ','.join(f"{k}={v}" for k, v in sorted(labels.items()))
+
+
+def _parse_labels(key: str) -> Dict[str, str]:
+    return dict(part.split('=', 1) for part in key.split(',') if part)
+
+
+class Metrics:
+    """
+    Counters, histograms and credit samples for this process.
+
+    Each process keeps its own cumulative totals and writes them to its own
+    field of a hash in the shared store on flush(); collect() sums every
+    field, so /api/metrics sees traffic from every function and instance
+    that writes to the same store.
+    """
+
+    def __init__(self, store=None):
+        """
+        Initialize the registry.
+
+        Args:
+            store: Where totals are flushed. Defaults to storage.shared_store().
+        """
+        self._store = store
+        # pids repeat across serverless instances
+        self.process_id = f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self._lock = threading.Lock()
+        self.counters: Dict[str, Dict[str, float]] = {}
+        self.histograms: Dict[str, Dict[str, Dict]] = {}
+        # (time, remaining, key fingerprint)
+        self.credit_samples: List[Tuple[float, float, str]] = []
+
+    def inc(self, name: str, amount: float = 1, **labels: str) -> None:
+        key = _labels(**labels)
+        with self._lock:
+            series = self.counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + amount
+
+    def observe(self, name: str, value: float, buckets: Iterable[float], **labels: str) -> None:
+        key = _labels(**labels)
+        buckets = tuple(buckets)
+        with self._lock:
+            series = self.histograms.setdefault(name, {})
+            hist = series.get(key)
+            if hist is None:
+                hist = series[key] = {'le': list(buckets), 'counts': [0] * len(buckets), 'sum': 0.0, 'count': 0}
+            for i, bound in enumerate(hist['le']):
+                if value <= bound:
+                    hist['counts'][i] += 1
+            hist['sum'] += value
+            hist['count'] += 1
+
+    def record_upstream(self, kind: str, status: str, latency: Optional[float] = None,
+                        headers: Optional[Dict] = None, api_key: Optional[str] = None) -> None:
+        """
+        Record one upstream attempt, its latency and the credit headers.
+
+        api_key identifies the account the remaining credits belong to; only a
+        fingerprint of it is kept.
+        """
+        self.inc('upstream_requests_total', endpoint=kind, status=status)
+        if latency is not None:
+            self.observe('upstream_latency_seconds', latency, LATENCY_BUCKETS, endpoint=kind)
+        if not headers:
+            return
+
+        try:
+            self.inc('credits_used_total', float(headers.get('x-requests-last')))
+        except (TypeError, ValueError):
+            pass
+        try:
+            remaining = float(headers.get('x-requests-remaining'))
+        except (TypeError, ValueError):
+            return
+        with self._lock:
+            self.credit_samples.append((time.time(), remaining, key_fingerprint(api_key)))
+            del self.credit_samples[:-CREDIT_SAMPLES]
+
+    def record_cache(self, cache: str, hit: bool) -> None:
+        self.inc('cache_lookups_total', cache=cache, result='hit' if hit else 'miss')
+
+    def record_scan(self, sport: str, seconds: float, market_types: Iterable[str]) -> None:
+        self.observe('scan_duration_seconds', seconds, SCAN_BUCKETS, sport=sport)
+        for market_type in market_types:
+            self.inc('opportunities_found_total', market_type=market_type)
+
+    def flush(self) -> None:
+        """Write this process's totals for collect() to pick up."""
+        with self._lock:
+            payload = {
+                'updated_at': time.time(),
+                'counters': self.counters,
+                'histograms': self.histograms,
+                'credit_samples': self.credit_samples
+            }
+            try:
+                (self._store or shared_store()).hset(STORE_KEY, self.process_id, payload, ttl=RETENTION_SECONDS)
+            except StorageError:
+                pass
+
+
+def key_fingerprint(api_key: Optional[str]) -> str:
+    return hashlib.sha256(api_key.encode()).hexdigest()[:12] if api_key else ''
+
+
+def collect(store=None) -> Dict:
+    """
+    Sum the flushed metrics of every process writing to the shared store.
+
+    Processes that have not flushed within RETENTION_SECONDS are pruned.
+
+    Returns:
+        Dict with counters, histograms, credits (remaining, burn per hour)
+        and cache hit ratios
+    """
+    store = store or shared_store()
+    counters: Dict[str, Dict[str, float]] = {}
+    histograms: Dict[str, Dict[str, Dict]] = {}
+    samples: List[Tuple[float, float, str]] = []
+
+    processes = store.hgetall(STORE_KEY)
+    cutoff = time.time() - RETENTION_SECONDS
+    stale = [process for process, data in processes.items() if data.get('updated_at', 0) < cutoff]
+    if stale:
+        store.hdel(STORE_KEY, *stale)
+
+    for process, data in processes.items():
+        if process in stale:
+            continue
+        for name, series in data.get('counters', {}).items():
+            merged = counters.setdefault(name, {})
+            for key, value in series.items():
+                merged[key] = merged.get(key, 0) + value
+        for name, series in data.get('histograms', {}).items():
+            merged = histograms.setdefault(name, {})
+            for key, hist in series.items():
+                target = merged.get(key)
+                if target is None:
+                    merged[key] = {'le': hist['le'], 'counts': list(hist['counts']),
+                                   'sum': hist['sum'], 'count': hist['count']}
+                    continue
+                target['counts'] = [a + b for a, b in zip(target['counts'], hist['counts'])]
+                target['sum'] += hist['sum']
+                target['count'] += hist['count']
+        # Samples flushed before fingerprints were recorded have no key
+        samples.extend((s[0], s[1], s[2] if len(s) > 2 else '') for s in data.get('credit_samples', []))
+
+    return {
+        'counters': counters,
+        'histograms': histograms,
+        'credits': credit_summary(samples),
+        'cache_hit_ratio': cache_hit_ratios(counters.get('cache_lookups_total', {}))
+    }
+
+
+def credit_summary(samples: List[Tuple[float, float, str]], window: float = BURN_RATE_WINDOW) -> Dict:
+    """
+    Remaining credits and the burn rate over the last window.
+
+    Samples are (time, remaining, key fingerprint). Each key's remaining is
+    its own counter, so drops are tracked per key: interleaving two keys, or
+    two processes on one key, must not read as spending. remaining sums the
+    latest sample of every key.
+    """
+    if not samples:
+        return {'remaining': None, 'burn_per_hour': None}
+
+    samples = sorted(samples)
+    cutoff = samples[-1][0] - window
+    recent = [s for s in samples if s[0] >= cutoff]
+
+    latest: Dict[str, float] = {}
+    lowest: Dict[str, float] = {}
+    spent = 0.0
+    for _, remaining, key in samples:
+        latest[key] = remaining
+    for _, remaining, key in recent:
+        # Count only new lows: concurrent responses arrive out of order and a
+        # monthly reset makes remaining jump up, neither of which is spending
+        if key in lowest and remaining < lowest[key]:
+            spent += lowest[key] - remaining
+        lowest[key] = min(remaining, lowest.get(key, remaining))
+    span = recent[-1][0] - recent[0][0]
+
+    return {
+        'remaining': sum(latest.values()),
+        'burn_per_hour': round(spent / span * 3600, 2) if span > 0 else None
+    }
+
+
+def cache_hit_ratios(lookups: Dict[str, float]) -> Dict[str, Optional[float]]:
+    totals: Dict[str, List[float]] = {}
+    for key, value in lookups.items():
+        labels = _parse_labels(key)
+        hits_total = totals.setdefault(labels.get('cache', ''), [0, 0])
+        hits_total[1] += value
+        if labels.get('result') == 'hit':
+            hits_total[0] += value
+    return {cache: round(h / t, 4) if t else None for cache, (h, t) in totals.items()}
+
+
+def _prom_labels(key: str, extra: Optional[Dict[str, str]] = None) -> str:
+    labels = _parse_labels(key)
+    labels.update(extra or {})
+    if not labels:
+        return ''
+    body = ','.join(f'{k}="{v}"' for k, v in sorted(labels.items()))
+    return '{' + body + '}'
+
+
+def render_prometheus(snapshot: Dict, prefix: str = 'arb_') -> str:
+    """Render a collect() snapshot in the Prometheus text exposition format."""
+    lines = []
+
+    def header(name: str) -> None:
+        kind, text = HELP.get(name, ('untyped', name))
+        lines.append(f"# HELP {prefix}{name} {text}")
+        lines.append(f"# TYPE {prefix}{name} {kind}")
+
+    for name, series in sorted(snapshot['counters'].items()):
+        header(name)
+        for key, value in sorted(series.items()):
+            lines.append(f"{prefix}{name}{_prom_labels(key)} {value:g}")
+
+    for name, series in sorted(snapshot['histograms'].items()):
+        header(name)
+        for key, hist in sorted(series.items()):
+            for bound, count in zip(hist['le'], hist['counts']):
+                lines.append(f"{prefix}{name}_bucket{_prom_labels(key, {'le': f'{bound:g}'})} {count}")
+            lines.append(f"{prefix}{name}_bucket{_prom_labels(key, {'le': '+Inf'})} {hist['count']}")
+            lines.append(f"{prefix}{name}_sum{_prom_labels(key)} {hist['sum']:.6f}")
+            lines.append(f"{prefix}{name}_count{_prom_labels(key)} {hist['count']}")
+
+    credits = snapshot['credits']
+    if credits['remaining'] is not None:
+        lines.append(f"# TYPE {prefix}credits_remaining gauge")
+        lines.append(f"{prefix}credits_remaining {credits['remaining']:g}")
+    if credits['burn_per_hour'] is not None:
+        lines.append(f"# TYPE {prefix}credits_burn_per_hour gauge")
+        lines.append(f"{prefix}credits_burn_per_hour {credits['burn_per_hour']:g}")
+
+    ratios = {cache: ratio for cache, ratio in snapshot['cache_hit_ratio'].items() if ratio is not None}
+    if ratios:
+        lines.append(f"# TYPE {prefix}cache_hit_ratio gauge")
+    for cache, ratio in sorted(ratios.items()):
+        lines.append(f"{prefix}cache_hit_ratio{{cache=\"{cache}\"}} {ratio:g}")
+
+    return '\n'.join(lines) + '\n'
+
+
+# Module-level registry used by the client, caches and handlers in this process
+metrics = Metrics()
@@ -0,0 +1,175 @@
+"""Per-scan request planner that avoids redundant upstream calls."""
+
+import os
+from typing import Dict, List, Optional
+
+from .api_client import APIClient
+from .cache import TTLCache
+from .markets import BOOKMAKER_API_KEYS
+
+
+# Fields the events endpoint returns, all of which the bulk odds response carries too.
+EVENT_FIELDS = ('id', 'sport_key', 'sport_title', 'commence_time', 'home_team', 'away_team')
+
+# Every supported bookmaker. Up to 10 bookmakers cost the same as one region,
+# so fetching all of them costs no more than fetching any subset.
+SUPERSET_BOOKMAKERS = ','.join(BOOKMAKER_API_KEYS.values())
+
+# Superset responses, shared by every scan on the instance for ODDS_CACHE_SECONDS.
+odds_cache = TTLCache('odds', ttl=float(os.environ.get('ODDS_CACHE_SECONDS', 60)))
+
+
+def odds_cache_key(sport_key: str, markets: str) -> tuple:
+    """odds_cache key of a sport's superset bulk odds."""
+    return ('odds', sport_key, SUPERSET_BOOKMAKERS, markets)
+
+
+def event_odds_cache_key(sport_key: str, event_id: str) -> tuple:
+    """odds_cache key of one event's superset player prop odds."""
+    return ('event_odds', sport_key, event_id, SUPERSET_BOOKMAKERS)
+
+
+def superset_enabled() -> bool:
+    """Superset fetching is on unless SUPERSET_FETCH is set to 0/false."""
+    return os.environ.get('SUPERSET_FETCH', '1').lower() not in ('0', 'false', 'no')
+
+
+def filter_bookmakers(event: Dict, bookmaker_keys: set) -> Dict:
+    """Copy of an event payload keeping only the given bookmaker keys."""
+    filtered = dict(event)
+    filtered['bookmakers'] = [b for b in event.get('bookmakers', []) if b.get('key') in bookmaker_keys]
+    return filtered
+
+
+class RequestPlanner:
+    """
+    Wraps an APIClient for the duration of one scan.
+
+    - Identical calls within the scan are made once and served from memory.
+    - Event lists are derived from a bulk odds response already fetched for
+      the sport instead of calling the events endpoint.
+    - In superset mode odds are fetched for every supported bookmaker and
+      cached for the instance, and each scan filters its own bookmaker subset
+      locally, so scans with different subsets share one upstream fetch.
+
+    Every avoided call is counted by reason so scans can report the savings.
+    Calls shared with a concurrent scan by the client's single-flight layer
+    (on this instance or, with a shared store, another one) are reported as
+    coalesced rather than upstream.
+    """
+
+    def __init__(self, client: APIClient, superset: Optional[bool] = None, cache: Optional[TTLCache] = None):
+        """
+        Initialize the planner.
+
+        Args:
+            client: Client used for calls that cannot be avoided
+            superset: Fetch all supported bookmakers and filter locally.
+                Defaults to the SUPERSET_FETCH env var (on).
+            cache: Cache for superset responses. Defaults to the shared odds_cache.
+        """
+        self.client = client
+        self.superset = superset_enabled() if superset is None else superset
+        self.cache = cache if cache is not None else odds_cache
+        self.upstream_calls = 0
+        self.saved_calls: Dict[str, int] = {}
+        self._responses: Dict[tuple, Dict] = {}
+        self._events: Dict[str, List[Dict]] = {}
+        self._cached_remaining: Optional[str] = None
+
+    @property
+    def remaining_credits(self) -> Optional[str]:
+        # Fall back to the count stored with a cached response if nothing went upstream
+        return self.client.remaining_credits or self._cached_remaining
+
+    def _save(self, reason: str) -> None:
+        self.saved_calls[reason] = self.saved_calls.get(reason, 0) + 1
+
+    def _call(self, key: tuple, fetch) -> Dict:
+        """Run an upstream call once per scan, keyed by its arguments."""
+        if key in self._responses:
+            self._save('duplicate')
+            return self._responses[key]
+
+        coalesced = self.client.coalesced_calls
+        result = fetch()
+        if self.client.coalesced_calls == coalesced:
+            self.upstream_calls += 1
+        self._responses[key] = result
+        return result
+
+    def _covered(self, bookmakers: Optional[str]) -> Optional[set]:
+        """Bookmaker keys to filter to if the superset can serve this request."""
+        if not self.superset or not bookmakers:
+            return None
+        keys = set(bookmakers.split(','))
+        return keys if keys <= set(BOOKMAKER_API_KEYS.values()) else None
+
+    def _superset_call(self, key: tuple, fetch) -> Dict:
+        """Fetch a superset response through the shared cache."""
+        cached = self.cache.get(key)
+        if cached is not None:
+            self._save('cache')
+            self._cached_remaining = cached['remaining']
+            return cached
+        return self._call(key, lambda: self._store(key, fetch()))
+
+    def _store(self, key: tuple, result: Dict) -> Dict:
+        self.cache.set(key, result)
+        return result
+
+    def get_sports_odds(self, sport_key: str, bookmakers: str = None, markets: str = 'h2h,spreads,totals') -> Dict:
+        """Get bulk odds for a sport and remember its events for later stages."""
+        subset = self._covered(bookmakers)
+        if subset is not None:
+            full = self._superset_call(
+                odds_cache_key(sport_key, markets),
+                lambda: self.client.get_sports_odds(sport_key=sport_key, bookmakers=SUPERSET_BOOKMAKERS, markets=markets)
+            )
+            result = {
+                'data': [filter_bookmakers(event, subset) for event in full['data']],
+                'remaining': full['remaining']
+            }
+        else:
+            result = self._call(
+                ('odds', sport_key, bookmakers, markets),
+                lambda: self.client.get_sports_odds(sport_key=sport_key, bookmakers=bookmakers, markets=markets)
+            )
+        if sport_key not in self._events:
+            self._events[sport_key] = [
+                {field: event[field] for field in EVENT_FIELDS if field in event}
+                for event in result['data']
+            ]
+        return result
+
+    def get_events(self, sport_key: str) -> Dict:
+        """Get events for a sport, derived from bulk odds when already fetched."""
+        if sport_key in self._events:
+            self._save('derived_events')
+            return {'data': self._events[sport_key], 'remaining': self.remaining_credits}
+
+        return self._call(('events', sport_key), lambda: self.client.get_events(sport_key))
+
+    def get_event_odds(self, sport_key: str, event_id: str, bookmakers: str = None) -> Dict:
+        """Get player prop odds for one event."""
+        subset = self._covered(bookmakers)
+        if subset is not None:
+            full = self._superset_call(
+                event_odds_cache_key(sport_key, event_id),
+                lambda: self.client.get_event_odds(sport_key, event_id, SUPERSET_BOOKMAKERS)
+            )
+            return {'data': filter_bookmakers(full['data'], subset), 'remaining': full['remaining']}
+
+        return self._call(
+            ('event_odds', sport_key, event_id, bookmakers),
+            lambda: self.client.get_event_odds(sport_key, event_id, bookmakers)
+        )
+
+    def stats(self) -> Dict:
+        """Summarize upstream calls made and avoided during the scan."""
+        return {
+            'upstream': self.upstream_calls,
+            'saved': sum(self.saved_calls.values()),
+            'saved_by_reason': dict(self.saved_calls),
+            'coalesced': self.client.coalesced_calls
+        }
@@ -0,0 +1,274 @@
+"""Pre-warm the shared odds cache for sports with events starting soon."""
+
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+
+from .api_client import APIClient, APIError
+from .arbitrage import parse_and_filter_event_time, parse_commence_time
+from .cache import TTLCache
+from .markets import get_main_markets_for_sport, get_markets_for_sport
+from .metrics import metrics
+from .planner import (
+    SUPERSET_BOOKMAKERS,
+    event_odds_cache_key,
+    odds_cache,
+    odds_cache_key,
+    superset_enabled
+)
+from .retry import estimate_request_cost
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.environ.get(name, default))
+    except ValueError:
+        return default
+
+
+class PrewarmJob:
+    """
+    Fetches superset odds ahead of demand and stores them in odds_cache.
+
+    Only sports with an event starting within the window are warmed. Main
+    markets are warmed first, soonest sport first, because they are cheap and
+    every scan needs them; player props follow, soonest event first, for the
+    same events a scan would request. Every fetch is priced up front and the
+    run stops adding work once the credit budget is spent or the account's
+    remaining credits fall to the floor.
+
+    Entries are stored with max_age as their TTL, which defaults to the odds
+    cache's own TTL (ODDS_CACHE_SECONDS) so a scan never gets warmed odds
+    older than it would fetch itself. Entries younger than refresh_after
+    (warmed by a recent run or scan) are left alone.
+    """
+
+    def __init__(
+        self,
+        client: APIClient,
+        budget: Optional[float] = None,
+        window_hours: Optional[float] = None,
+        max_age: Optional[float] = None,
+        refresh_after: Optional[float] = None,
+        min_remaining: Optional[float] = None,
+        max_prop_events: int = 10,
+        workers: int = 4,
+        deadline: Optional[float] = None,
+        cache: Optional[TTLCache] = None
+    ):
+        """
+        Initialize the job.
+
+        Args:
+            client: Client used for the upstream calls
+            budget: Credits one run may spend, capped at PREWARM_CREDIT_BUDGET
+                (default 60), which is also the default
+            window_hours: Warm sports with an event starting within this many
+                hours (PREWARM_WINDOW_HOURS, default 6)
+            max_age: Seconds warmed entries are served (PREWARM_MAX_AGE, default
+                the cache's TTL)
+            refresh_after: Entries younger than this are not refetched
+                (default half of max_age)
+            min_remaining: Stop when the account has this few credits left
+                (PREWARM_MIN_REMAINING, default 1000)
+            max_prop_events: Events per sport to warm props for; matches the scan
+            workers: Concurrent upstream calls
+            deadline: Seconds after which no new fetch is started
+                (PREWARM_DEADLINE_SECONDS, default 50)
+            cache: Cache to warm. Defaults to the shared odds_cache.
+        """
+        self.client = client
+        limit = _env_float('PREWARM_CREDIT_BUDGET', 60)
+        self.budget = min(budget, limit) if budget is not None else limit
+        self.window = timedelta(hours=window_hours if window_hours is not None
+                                else _env_float('PREWARM_WINDOW_HOURS', 6))
+        self.cache = cache if cache is not None else odds_cache
+        self.max_age = max_age if max_age is not None else _env_float('PREWARM_MAX_AGE', self.cache.ttl)
+        self.refresh_after = refresh_after if refresh_after is not None else self.max_age / 2
+        self.min_remaining = (min_remaining if min_remaining is not None
+                              else _env_float('PREWARM_MIN_REMAINING', 1000))
+        self.max_prop_events = max_prop_events
+        self.workers = workers
+        self.deadline = deadline if deadline is not None else _env_float('PREWARM_DEADLINE_SECONDS', 50)
+
+        self.spent = 0
+        self.counts: Dict[str, int] = {'warmed': 0, 'fresh': 0, 'budget': 0, 'error': 0}
+        self.errors: List[str] = []
+        self.stopped: Optional[str] = None
+        self._started = 0.0
+
+    def _count(self, result: str, kind: str) -> None:
+        self.counts[result] = self.counts.get(result, 0) + 1
+        metrics.inc('prewarm_entries_total', kind=kind, result=result)
+
+    def _credits_low(self) -> bool:
+        try:
+            return float(self.client.remaining_credits) <= self.min_remaining
+        except (TypeError, ValueError):
+            return False
+
+    def _past_deadline(self) -> bool:
+        return time.monotonic() - self._started > self.deadline
+
+    def _reserve(self, key: tuple, kind: str, cost: int) -> bool:
+        """Decide whether to fetch an entry, charging its cost to the budget."""
+        age = self.cache.age(key)
+        if age is not None and age < self.refresh_after:
+            self._count('fresh', kind)
+            return False
+
+        if not self.stopped:
+            if self._past_deadline():
+                self.stopped = 'deadline'
+            elif self._credits_low():
+                self.stopped = 'credit_floor'
+        if self.stopped or self.spent + cost > self.budget:
+            self._count('budget', kind)
+            return False
+
+        self.spent += cost
+        return True
+
+    def _fetch(self, key: tuple, kind: str, cost: int, fetch) -> Optional[Dict]:
+        """Fetch a reserved entry into the cache, unless the run is out of time."""
+        if self._past_deadline():
+            self.stopped = 'deadline'
+            self.spent -= cost
+            self._count('budget', kind)
+            return None
+        try:
+            result = fetch()
+        except APIError as e:
+            self.errors.append(f"{key[1]}: {e}")
+            self._count('error', kind)
+            return None
+        self.cache.set(key, result, ttl=self.max_age)
+        self._count('warmed', kind)
+        return result
+
+    def upcoming_sports(self, sports: List[str], now: datetime) -> List[Tuple[datetime, str, List[Dict]]]:
+        """
+        Sports with a bettable event starting within the window, soonest first.
+
+        Uses the events endpoint, which costs no credits.
+        """
+        horizon = now + self.window
+
+        def events_for(sport_key: str) -> Tuple[str, List[Dict]]:
+            try:
+                return sport_key, self.client.get_events(sport_key)['data']
+            except APIError as e:
+                self.errors.append(f"{sport_key}: {e}")
+                return sport_key, []
+
+        upcoming = []
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            for sport_key, events in pool.map(events_for, sports):
+                starts = [
+                    parse_commence_time(event['commence_time'])[0]
+                    for event in events
+                    if parse_and_filter_event_time(event.get('commence_time'), now=now)[0]
+                ]
+                starts = [start for start in starts if start <= horizon]
+                if starts:
+                    upcoming.append((min(starts), sport_key, events))
+
+        upcoming.sort(key=lambda item: item[0])
+        return upcoming
+
+    def run(self, sports: Optional[List[str]] = None, now: Optional[datetime] = None) -> Dict:
+        """
+        Warm main markets, then props, for sports with events starting soon.
+
+        Args:
+            sports: Sport keys to consider. Defaults to every active sport.
+            now: Clock for the window (default: current time)
+
+        Returns:
+            Report of entries warmed, already fresh, skipped for budget or
+            failed, credits spent and why the run stopped early, if it did
+        """
+        self._started = time.monotonic()
+        now = now or datetime.now(timezone.utc)
+
+        if not superset_enabled():
+            # Scans only read the shared cache in superset mode
+            self.stopped = 'superset_disabled'
+            return self.report([])
+        if not self.cache.shared:
+            # Entries would stay on this instance, where no scan reads them
+            self.stopped = 'cache_not_shared'
+            return self.report([])
+
+        if sports is None:
+            sports = [s['key'] for s in self.client.get_sports()['data'] if s.get('active', True)]
+        upcoming = self.upcoming_sports(sports, now)
+        horizon = now + self.window
+
+        # Main markets, soonest sport first
+        main_jobs = []
+        for _, sport_key, _ in upcoming:
+            markets = get_main_markets_for_sport(sport_key)
+            key = odds_cache_key(sport_key, markets)
+            cost = estimate_request_cost(f'sports/{sport_key}/odds',
+                                         {'markets': markets, 'bookmakers': SUPERSET_BOOKMAKERS})
+            if self._reserve(key, 'odds', cost):
+                main_jobs.append((key, sport_key, markets, cost))
+
+        def fetch_main(job):
+            key, sport_key, markets, cost = job
+            return sport_key, self._fetch(key, 'odds', cost, lambda: self.client.get_sports_odds(
+                sport_key=sport_key, bookmakers=SUPERSET_BOOKMAKERS, markets=markets))
+
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            bulk = {sport_key: result for sport_key, result in pool.map(fetch_main, main_jobs) if result}
+
+        # Props for the events a scan would request (first max_prop_events of
+        # the bulk odds), soonest event first
+        prop_events = []
+        for _, sport_key, events in upcoming:
+            prop_markets = get_markets_for_sport(sport_key)
+            if not prop_markets:
+                continue
+            main = bulk.get(sport_key) or self.cache.get(
+                odds_cache_key(sport_key, get_main_markets_for_sport(sport_key)))
+            scan_events = main['data'] if main else events
+            for event in scan_events[:self.max_prop_events]:
+                if not parse_and_filter_event_time(event.get('commence_time'), now=now)[0]:
+                    continue
+                start = parse_commence_time(event['commence_time'])[0]
+                if start <= horizon:
+                    prop_events.append((start, sport_key, event['id'], prop_markets))
+        prop_events.sort(key=lambda item: item[0])
+
+        prop_jobs = []
+        for _, sport_key, event_id, prop_markets in prop_events:
+            key = event_odds_cache_key(sport_key, event_id)
+            cost = estimate_request_cost(f'sports/{sport_key}/events/{event_id}/odds',
+                                         {'markets': prop_markets, 'bookmakers': SUPERSET_BOOKMAKERS})
+            if self._reserve(key, 'event_odds', cost):
+                prop_jobs.append((key, sport_key, event_id, cost))
+
+        def fetch_props(job):
+            key, sport_key, event_id, cost = job
+            return self._fetch(key, 'event_odds', cost, lambda: self.client.get_event_odds(
+                sport_key, event_id, SUPERSET_BOOKMAKERS))
+
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            list(pool.map(fetch_props, prop_jobs))
+
+        return self.report([sport_key for _, sport_key, _ in upcoming])
+
+    def report(self, sports: List[str]) -> Dict:
+        return {
+            'sports': sports,
+            'entries': dict(self.counts),
+            'credits_spent': self.spent,
+            'budget': self.budget,
+            'stopped': self.stopped,
+            'errors': self.errors,
+            'remaining_credits': self.client.remaining_credits,
+            'seconds': round(time.monotonic() - self._started, 3)
+        }
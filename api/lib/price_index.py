@@ -0,0 +1,248 @@
+"""Incrementally maintained best-price index for live odds."""
+
+import heapq
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from .arbitrage import ArbitrageAgent
+
+
+# (event_id, market_key, point) identifies one market line; point is None for h2h
+MarketKey = Tuple[str, str, Optional[float]]
+
+
+class OutcomeBook:
+    """
+    Prices offered by each bookmaker for one outcome, best price first.
+
+    Backed by a max-heap with lazy deletion: an update pushes a new entry and
+    marks the bookmaker's previous one stale, and stale entries are discarded
+    when they reach the top. Updates and best/second-best lookups are
+    O(log B) amortized in the number of bookmakers, whether a price rises,
+    falls or is withdrawn. The heap is rebuilt when stale entries dominate.
+    """
+
+    def __init__(self):
+        self.prices: Dict[str, float] = {}
+        self._versions: Dict[str, int] = {}
+        self._heap: List[Tuple[float, int, str]] = []
+        self._seq = 0
+
+    def __len__(self) -> int:
+        return len(self.prices)
+
+    def set(self, bookmaker: str, price: float) -> bool:
+        """Set a bookmaker's price. Returns False if it did not change."""
+        if self.prices.get(bookmaker) == price:
+            return False
+        self._seq += 1
+        self.prices[bookmaker] = price
+        self._versions[bookmaker] = self._seq
+        heapq.heappush(self._heap, (-price, self._seq, bookmaker))
+        self._maybe_compact()
+        return True
+
+    def remove(self, bookmaker: str) -> bool:
+        """Withdraw a bookmaker's price. Returns False if it had none."""
+        if bookmaker not in self.prices:
+            return False
+        del self.prices[bookmaker]
+        del self._versions[bookmaker]
+        self._maybe_compact()
+        return True
+
+    def best(self) -> Optional[Tuple[str, float]]:
+        """Get (bookmaker, price) of the best price, or None if empty."""
+        self._discard_stale()
+        if not self._heap:
+            return None
+        neg_price, _, bookmaker = self._heap[0]
+        return bookmaker, -neg_price
+
+    def second_best(self) -> Optional[Tuple[str, float]]:
+        """Get (bookmaker, price) of the runner-up price, or None."""
+        self._discard_stale()
+        if not self._heap:
+            return None
+        top = heapq.heappop(self._heap)
+        self._discard_stale()
+        runner_up = None
+        if self._heap:
+            neg_price, _, bookmaker = self._heap[0]
+            runner_up = (bookmaker, -neg_price)
+        heapq.heappush(self._heap, top)
+        return runner_up
+
+    def _is_stale(self, entry: Tuple[float, int, str]) -> bool:
+        return self._versions.get(entry[2]) != entry[1]
+
+    def _discard_stale(self) -> None:
+        while self._heap and self._is_stale(self._heap[0]):
+            heapq.heappop(self._heap)
+
+    def _maybe_compact(self) -> None:
+        if len(self._heap) > 2 * len(self.prices) + 8:
+            self._heap = [(-price, self._versions[bk], bk) for bk, price in self.prices.items()]
+            heapq.heapify(self._heap)
+
+
+class PriceIndex:
+    """
+    Best and second-best price per (event, market, point, outcome).
+
+    Keeps live odds between polls so a single bookmaker price move only
+    touches its own outcome heap, and the arbitrage result of the affected
+    market line is refreshed from the per-outcome bests without regrouping
+    every bookmaker's prices.
+    """
+
+    def __init__(self):
+        self._books: Dict[Tuple[MarketKey, str], OutcomeBook] = {}
+        self._outcomes: Dict[MarketKey, Dict[str, None]] = {}
+        self._quotes: Dict[Tuple[str, str], Set[Tuple[MarketKey, str]]] = {}
+        self._event_books: Dict[str, Set[str]] = {}
+        self.results: Dict[MarketKey, Dict] = {}
+
+    def update(self, event_id: str, market: str, point: Optional[float], outcome: str,
+               bookmaker: str, price: float) -> Optional[MarketKey]:
+        """
+        Record one bookmaker price.
+
+        Returns:
+            The market line key if anything changed, else None
+        """
+        market_key = (event_id, market, point)
+        book = self._books.get((market_key, outcome))
+        if book is None:
+            book = self._books[(market_key, outcome)] = OutcomeBook()
+            self._outcomes.setdefault(market_key, {})[outcome] = None
+
+        self._quotes.setdefault((event_id, bookmaker), set()).add((market_key, outcome))
+        self._event_books.setdefault(event_id, set()).add(bookmaker)
+        return market_key if book.set(bookmaker, price) else None
+
+    def remove(self, event_id: str, market: str, point: Optional[float], outcome: str,
+               bookmaker: str) -> Optional[MarketKey]:
+        """Withdraw one bookmaker price, e.g. when the book pulls its line."""
+        market_key = (event_id, market, point)
+        book = self._books.get((market_key, outcome))
+        if book is None or not book.remove(bookmaker):
+            return None
+
+        quotes = self._quotes.get((event_id, bookmaker))
+        if quotes is not None:
+            quotes.discard((market_key, outcome))
+            if not quotes:
+                del self._quotes[(event_id, bookmaker)]
+                books = self._event_books[event_id]
+                books.discard(bookmaker)
+                if not books:
+                    del self._event_books[event_id]
+        if not book:
+            del self._books[(market_key, outcome)]
+            outcomes = self._outcomes[market_key]
+            del outcomes[outcome]
+            if not outcomes:
+                del self._outcomes[market_key]
+        return market_key
+
+    def best(self, event_id: str, market: str, point: Optional[float], outcome: str) -> Optional[Tuple[str, float]]:
+        book = self._books.get(((event_id, market, point), outcome))
+        return book.best() if book else None
+
+    def second_best(self, event_id: str, market: str, point: Optional[float], outcome: str) -> Optional[Tuple[str, float]]:
+        book = self._books.get(((event_id, market, point), outcome))
+        return book.second_best() if book else None
+
+    def refresh(self, market_key: MarketKey) -> Optional[Dict]:
+        """
+        Recompute the arbitrage result for one market line from the outcome bests.
+
+        Returns:
+            Result in the same shape as analyze_market_arbitrage, or None
+        """
+        outcomes = self._outcomes.get(market_key)
+        self.results.pop(market_key, None)
+        if not outcomes or len(outcomes) < 2:
+            return None
+
+        event_id, market, point = market_key
+        best_odds = []
+        bookmakers_used = []
+        outcome_names = []
+        for outcome in outcomes:
+            bookmaker, price = self._books[(market_key, outcome)].best()
+            best_odds.append(price)
+            bookmakers_used.append(bookmaker)
+            outcome_names.append(outcome if point is None else f"{outcome} {point}")
+
+        arb_result = ArbitrageAgent.find_arbitrage(*best_odds)
+        result = {
+            'roi': arb_result['roi'],
+            'bookmakers': bookmakers_used,
+            'odds': best_odds,
+            'outcomes': outcome_names,
+            'bet_percentages': arb_result['bet_percentages'],
+            'bet_amounts_1000': arb_result['bet_amounts_1000']
+        }
+        self.results[market_key] = result
+        return result
+
+    def ingest_event(self, event: Dict, markets: Iterable[str] = ('h2h', 'spreads', 'totals')) -> Set[MarketKey]:
+        """
+        Apply a fresh bulk-odds payload for one event.
+
+        Prices that changed are updated, and lines a bookmaker no longer
+        quotes are withdrawn, including every line of a bookmaker missing
+        from the payload. Affected market lines are refreshed.
+
+        Returns:
+            Market line keys whose arbitrage result was refreshed
+        """
+        event_id = event['id']
+        wanted = set(markets)
+        touched: Set[MarketKey] = set()
+        present = set()
+
+        for bookmaker in event.get('bookmakers', []):
+            name = bookmaker.get('title', bookmaker.get('key', 'Unknown'))
+            present.add(name)
+            seen = set()
+            for market in bookmaker.get('markets', []):
+                if market['key'] not in wanted:
+                    continue
+                for outcome in market.get('outcomes', []):
+                    point = outcome.get('point')
+                    seen.add(((event_id, market['key'], point), outcome['name']))
+                    changed = self.update(event_id, market['key'], point, outcome['name'], name, outcome['price'])
+                    if changed:
+                        touched.add(changed)
+
+            for market_key, outcome in self._quotes.get((event_id, name), set()) - seen:
+                changed = self.remove(*market_key, outcome, name)
+                if changed:
+                    touched.add(changed)
+
+        # A bookmaker missing from the payload has pulled all of its lines
+        for name in self._event_books.get(event_id, set()) - present:
+            for market_key, outcome in list(self._quotes.get((event_id, name), ())):
+                changed = self.remove(*market_key, outcome, name)
+                if changed:
+                    touched.add(changed)
+
+        for market_key in touched:
+            self.refresh(market_key)
+        return touched
+
+    def drop_event(self, event_id: str) -> Set[MarketKey]:
+        """Withdraw every price of an event, e.g. once it has started."""
+        return self.ingest_event({'id': event_id, 'bookmakers': []})
+
+    def events(self) -> Set[str]:
+        """Ids of the events that have prices in the index."""
+        return set(self._event_books)
+
+    def opportunities(self, min_roi: float = 0.0) -> List[Tuple[MarketKey, Dict]]:
+        """Current arbitrage results above min_roi, best first."""
+        found = [(key, result) for key, result in self.results.items() if result['roi'] > min_roi]
+        found.sort(key=lambda item: item[1]['roi'], reverse=True)
+        return found
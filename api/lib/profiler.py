@@ -0,0 +1,159 @@
+"""
+Low-overhead sampling profiler for a single scan.
+
+A background thread snapshots the stack of every busy thread every few
+milliseconds with sys._current_frames(), so HTTP done on pool threads (split
+region requests, hedged requests) is seen where it runs rather than as the
+caller waiting on a future. Threads parked in a lock, queue or selector wait
+are skipped. Each sample is attributed to a scan stage (HTTP, decode, odds_dict build, analyzers, formatting) by the
+innermost frame that matches a stage rule, and stacks are aggregated in the
+folded format used by flamegraph.pl and speedscope, with the stage as the
+root frame.
+
+Stdlib only, so the CLI can use it without the web dependencies.
+"""
+
+import os
+import sys
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+
+# Checked innermost frame first; the first rule that matches names the stage.
+# Rules are (stage, path fragments, function names).
+STAGE_RULES: List[Tuple[str, Tuple[str, ...], Tuple[str, ...]]] = [
+    ('decode', (os.path.join('json', 'decoder.py'),), ('json', 'loads', '_loads', 'read_json')),
+    ('http', (os.sep + 'requests' + os.sep, os.sep + 'urllib3' + os.sep, 'socket.py', 'ssl.py',
+              os.sep + 'http' + os.sep),
+     ('_send', '_send_hedged', '_request_upstream', '_make_request')),
+    ('odds_dict build', (), ('build_market_odds', 'build_props_odds', 'buildMarketOdds', 'buildPropsOdds',
+                             'filter_bookmakers')),
+    ('analyzers', (), ('analyze_market_arbitrage', 'analyze_player_prop_arbitrage', 'find_arbitrage',
+                       'analyzeMarketArbitrage', 'analyzePlayerPropArbitrage', 'findArbitrage',
+                       'analyzeMainOdds', 'analyzePropOdds', '_evaluate_numpy', '_evaluate_python')),
+    ('formatting', (), ('format_opportunity', 'format_prop_opportunity', 'format_bets', 'formatOpportunity',
+                        'compact_opportunities', 'dumps', 'json_response')),
+]
+STAGES = [rule[0] for rule in STAGE_RULES] + ['other']
+
+# Innermost frames of a thread that is waiting on another one, not working
+IDLE_PATHS = ('threading.py', 'queue.py', 'selectors.py', os.path.join('concurrent', 'futures') + os.sep)
+
+
+def classify(frames: List[Tuple[str, str]]) -> str:
+    """Stage of a stack given as (filename, function) pairs, innermost first."""
+    for filename, function in frames:
+        for stage, paths, functions in STAGE_RULES:
+            if function in functions or any(fragment in filename for fragment in paths):
+                return stage
+    return 'other'
+
+
+def is_idle(frames: List[Tuple[str, str]]) -> bool:
+    """Whether a stack, innermost first, is parked in a wait rather than working."""
+    return bool(frames) and any(path in frames[0][0] for path in IDLE_PATHS)
+
+
+class SamplingProfiler:
+    """
+    Samples busy threads' stacks at a fixed interval while active.
+
+    Counts are thread samples: two threads fetching at once add two samples
+    per tick, so stage seconds are thread-seconds and may exceed the wall time.
+
+    Usage:
+        with SamplingProfiler() as profiler:
+            run_scan()
+        profiler.write_folded('scan.folded')
+    """
+
+    def __init__(self, interval: float = 0.005, thread_id: Optional[int] = None, max_depth: int = 64):
+        """
+        Initialize the profiler.
+
+        Args:
+            interval: Seconds between samples (default 5 ms)
+            thread_id: Only sample this thread. Defaults to every thread but
+                the profiler's own.
+            max_depth: Frames kept per sample
+        """
+        self.interval = interval
+        self.thread_id = thread_id
+        self.max_depth = max_depth
+        self.stacks: Dict[str, int] = {}
+        self.stage_samples: Dict[str, int] = {stage: 0 for stage in STAGES}
+        self.samples = 0
+        self.wall_seconds = 0.0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._started = 0.0
+
+    def start(self) -> 'SamplingProfiler':
+        self._stop.clear()
+        self._started = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name='scan-profiler', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> 'SamplingProfiler':
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.wall_seconds = time.perf_counter() - self._started
+        return self
+
+    def __enter__(self) -> 'SamplingProfiler':
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    def _run(self) -> None:
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id != own and (self.thread_id is None or thread_id == self.thread_id):
+                    self._record(frame)
+
+    def _record(self, frame) -> None:
+        frames = []
+        while frame is not None and len(frames) < self.max_depth:
+            code = frame.f_code
+            frames.append((code.co_filename, code.co_name))
+            frame = frame.f_back
+        if is_idle(frames):
+            return
+
+        stage = classify(frames)
+        names = [f"{function} ({os.path.basename(filename)})" for filename, function in reversed(frames)]
+        folded = ';'.join([stage] + names)
+        self.stacks[folded] = self.stacks.get(folded, 0) + 1
+        self.stage_samples[stage] += 1
+        self.samples += 1
+
+    def folded(self) -> str:
+        """Aggregated stacks in folded format: 'stage;outer;...;inner count' per line."""
+        return ''.join(f"{stack} {count}\n" for stack, count in sorted(self.stacks.items()))
+
+    def write_folded(self, path: str) -> None:
+        with open(path, 'w') as f:
+            f.write(self.folded())
+
+    def summary(self) -> Dict:
+        """Share of samples and estimated seconds spent in each stage."""
+        total = self.samples or 1
+        return {
+            'samples': self.samples,
+            'interval_ms': self.interval * 1000,
+            'wall_seconds': round(self.wall_seconds, 3),
+            'stages': {
+                stage: {
+                    'samples': count,
+                    'percent': round(count / total * 100, 1),
+                    'seconds': round(count * self.interval, 3)
+                }
+                for stage, count in self.stage_samples.items()
+            }
+        }
@@ -0,0 +1,102 @@
+"""
+Multi-region odds fetching.
+
+A request for several regions (or for more than ten bookmakers) is split into
+one upstream call per region (or per ten bookmakers). Each part is billed the
+same as it would be in a single combined call. The parts run concurrently and
+their responses are merged into one event-aligned payload: every event
+appears once, with each bookmaker from every part. Bookmaker entries are
+shared rather than copied, and the analyzers see each (event, market, outcome)
+once, however many regions priced it.
+"""
+
+import os
+from typing import Dict, Iterable, List, Optional
+
+from .markets import BOOKMAKER_REGION, REGIONS
+
+
+# Up to this many bookmakers in one call are billed as one region
+BOOKMAKERS_PER_CALL = 10
+
+
+def parse_regions(value: Optional[str] = None) -> List[str]:
+    """
+    Known regions from a comma-separated list, in order and without repeats.
+
+    Args:
+        value: e.g. "us,uk". Defaults to the ODDS_REGIONS env var (us).
+
+    Returns:
+        The regions, or ['us'] if none are recognized
+    """
+    value = value if value is not None else os.environ.get('ODDS_REGIONS', 'us')
+    regions = [r.strip().lower() for r in value.split(',')]
+    return list(dict.fromkeys(r for r in regions if r in REGIONS)) or ['us']
+
+
+def split_bookmakers(bookmakers: str) -> List[str]:
+    """
+    Split a comma-separated bookmaker list into calls of at most ten.
+
+    Bookmakers are grouped by region first, so each call spans as few
+    regions as possible. The split costs the same as one call with them all.
+    """
+    keys = list(dict.fromkeys(k for k in bookmakers.split(',') if k))
+    if len(keys) <= BOOKMAKERS_PER_CALL:
+        return [bookmakers]
+    order = {region: i for i, region in enumerate(REGIONS)}
+    keys.sort(key=lambda k: order.get(BOOKMAKER_REGION.get(k), len(REGIONS)))
+    return [','.join(keys[i:i + BOOKMAKERS_PER_CALL]) for i in range(0, len(keys), BOOKMAKERS_PER_CALL)]
+
+
+def merge_events(payloads: Iterable[List[Dict]]) -> List[Dict]:
+    """
+    Merge bulk odds responses into one list with each event once.
+
+    Args:
+        payloads: Event lists returned by the parts of a split request
+
+    Returns:
+        Events ordered by start time. Each carries the bookmakers of every
+        part; a bookmaker returned by more than one part is kept once.
+    """
+    merged: Dict[str, Dict] = {}
+    seen: Dict[str, set] = {}
+
+    for events in payloads:
+        for event in events:
+            event_id = event['id']
+            target = merged.get(event_id)
+            if target is None:
+                merged[event_id] = dict(event, bookmakers=list(event.get('bookmakers', [])))
+                seen[event_id] = {b.get('key') for b in merged[event_id]['bookmakers']}
+                continue
+
+            keys = seen[event_id]
+            for bookmaker in event.get('bookmakers', []):
+                if bookmaker.get('key') not in keys:
+                    keys.add(bookmaker.get('key'))
+                    target['bookmakers'].append(bookmaker)
+
+    return sorted(merged.values(), key=lambda e: e.get('commence_time') or '')
+
+
+def merge_event(payloads: Iterable[Dict]) -> Dict:
+    """Merge event odds responses for one event the same way as merge_events."""
+    merged = merge_events([payload] for payload in payloads if payload)
+    return merged[0] if merged else {}
+
+
+def lowest_remaining(values: Iterable[Optional[str]]) -> Optional[str]:
+    """Smallest remaining-credit count reported by concurrent calls: the latest state."""
+    values = list(values)
+    numeric = []
+    for value in values:
+        try:
+            numeric.append((float(value), value))
+        except (TypeError, ValueError):
+            continue
+    if numeric:
+        return min(numeric)[1]
+    return values[0] if values else None
@@ -0,0 +1,185 @@
+"""Fast JSON encoding, compression negotiation and compact result shapes."""
+
+import gzip
+import json
+from typing import Any, Dict, List, Optional
+
+from flask import Response, request
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+# Bodies smaller than this are sent uncompressed; the framing costs more than it saves.
+MIN_COMPRESS_BYTES = 1024
+COMPACT_FORMAT = 'compact-v1'
+# Fields of every formatted opportunity; any others go in the optional 'extra' column
+CORE_FIELDS = ('event', 'sport', 'market', 'roi', 'commence_time', 'bets')
+
+
+def dumps(payload: Any) -> bytes:
+    """Serialize to JSON bytes, using orjson when it is installed."""
+    if orjson is not None:
+        return orjson.dumps(payload)
+    return json.dumps(payload, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+
+def negotiate_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    """
+    Pick a content encoding from an Accept-Encoding header.
+
+    Picks the encoding with the highest q-value among brotli (when the
+    module is available) and gzip, preferring brotli on a tie. Encodings not
+    listed get the q-value of '*', if any. q=0 means never.
+    """
+    if not accept_encoding:
+        return None
+
+    weights: Dict[str, float] = {}
+    for part in accept_encoding.split(','):
+        name, _, params = part.strip().partition(';')
+        q = 1.0
+        for param in params.split(';'):
+            key, _, value = param.strip().partition('=')
+            if key.strip().lower() == 'q':
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        if name.strip():
+            weights[name.strip().lower()] = q
+
+    wildcard = weights.get('*', 0.0)
+    options = [('br', weights.get('br', wildcard))] if brotli is not None else []
+    options.append(('gzip', weights.get('gzip', weights.get('x-gzip', wildcard))))
+    # max keeps the first of equal weights, so brotli wins a tie
+    encoding, q = max(options, key=lambda option: option[1])
+    return encoding if q > 0 else None
+
+
+def compress(body: bytes, encoding: Optional[str]) -> bytes:
+    """Compress a body with the negotiated encoding."""
+    if encoding == 'br':
+        return brotli.compress(body, quality=5)
+    if encoding == 'gzip':
+        return gzip.compress(body, compresslevel=5)
+    return body
+
+
+def json_response(payload: Any, status: int = 200) -> Response:
+    """
+    Build a JSON response, compressed if the current request allows it.
+
+    Drop-in replacement for jsonify on the hot endpoints.
+    """
+    body = dumps(payload)
+    encoding = None
+    if len(body) >= MIN_COMPRESS_BYTES:
+        encoding = negotiate_encoding(request.headers.get('Accept-Encoding'))
+
+    response = Response(compress(body, encoding), status=status, mimetype='application/json')
+    if encoding:
+        response.headers['Content-Encoding'] = encoding
+    response.headers['Vary'] = 'Accept-Encoding'
+    return response
+
+
+def wants_compact(body: Optional[Dict] = None) -> bool:
+    """Check whether the caller asked for the compact result shape."""
+    if body and body.get('compact'):
+        return True
+    return request.args.get('compact', '').lower() in ('1', 'true', 'yes')
+
+
+class _LookupTable:
+    """Assigns small integer ids to repeated strings."""
+
+    def __init__(self):
+        self.values: List[str] = []
+        self._ids: Dict[str, int] = {}
+
+    def id_for(self, value: str) -> int:
+        index = self._ids.get(value)
+        if index is None:
+            index = self._ids[value] = len(self.values)
+            self.values.append(value)
+        return index
+
+
+def compact_opportunities(opportunities: List[Dict]) -> Dict:
+    """
+    Convert formatted opportunities to a columnar shape with lookup tables.
+
+    Repeated strings (events, sports, markets, bookmakers) are replaced by
+    indexes into shared tables, every field becomes one column, and each
+    opportunity's bets are columnar too. bet_amount_100 is dropped because
+    it always equals bet_percentage. Fields outside CORE_FIELDS (e.g. a feed
+    id) are kept per opportunity in an 'extra' column, null where there are
+    none; the column is left out when no opportunity has any.
+    """
+    events, sports, markets, bookmakers = _LookupTable(), _LookupTable(), _LookupTable(), _LookupTable()
+    columns = {'event': [], 'sport': [], 'market': [], 'roi': [], 'commence_time': [], 'bets': [], 'extra': []}
+
+    for opp in opportunities:
+        columns['event'].append(events.id_for(opp['event']))
+        columns['sport'].append(sports.id_for(opp['sport']))
+        columns['market'].append(markets.id_for(opp['market']))
+        columns['roi'].append(opp['roi'])
+        columns['commence_time'].append(opp['commence_time'])
+        bets = opp['bets']
+        columns['bets'].append([
+            [bet['outcome'] for bet in bets],
+            [bookmakers.id_for(bet['bookmaker']) for bet in bets],
+            [bet['odds'] for bet in bets],
+            [bet['bet_percentage'] for bet in bets]
+        ])
+        columns['extra'].append({key: value for key, value in opp.items() if key not in CORE_FIELDS} or None)
+
+    if not any(columns['extra']):
+        del columns['extra']
+
+    return {
+        'format': COMPACT_FORMAT,
+        'count': len(opportunities),
+        'events': events.values,
+        'sports': sports.values,
+        'markets': markets.values,
+        'bookmakers': bookmakers.values,
+        'columns': columns
+    }
+
+
+def expand_opportunities(compact: Dict) -> List[Dict]:
+    """Inverse of compact_opportunities."""
+    columns = compact['columns']
+    extra = columns.get('extra') or [None] * compact['count']
+    opportunities = []
+    for i in range(compact['count']):
+        outcomes, bookmaker_ids, odds, percentages = columns['bets'][i]
+        opportunity = {
+            'event': compact['events'][columns['event'][i]],
+            'sport': compact['sports'][columns['sport'][i]],
+            'market': compact['markets'][columns['market'][i]],
+            'roi': columns['roi'][i],
+            'commence_time': columns['commence_time'][i],
+            'bets': [
+                {
+                    'outcome': outcomes[j],
+                    'bookmaker': compact['bookmakers'][bookmaker_ids[j]],
+                    'odds': odds[j],
+                    'bet_percentage': percentages[j],
+                    'bet_amount_100': percentages[j]
+                }
+                for j in range(len(outcomes))
+            ]
+        }
+        opportunity.update(extra[i] or {})
+        opportunities.append(opportunity)
+    return opportunities
@@ -0,0 +1,196 @@
+"""Server-side store of full scan results with cursor pagination."""
+
+import base64
+import os
+import time
+import uuid
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+from .markets import API_KEY_TO_BOOKMAKER
+from .storage import StorageError, shared_store
+
+
+MAIN_MARKET_TYPES = ('h2h', 'spreads', 'totals', 'outrights')
+
+
+class ResultStoreError(Exception):
+    """Raised for unknown or expired scans."""
+    pass
+
+
+class InvalidCursorError(ResultStoreError):
+    """Raised for a cursor this store did not issue."""
+    pass
+
+
+def market_type_of(opportunity: Dict) -> str:
+    """Get the market key of an opportunity ('player_points - Name' -> 'player_points')."""
+    return opportunity['market'].split(' - ', 1)[0]
+
+
+def encode_cursor(offset: int) -> str:
+    return base64.urlsafe_b64encode(f"o:{offset}".encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor: str) -> int:
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        prefix, offset = base64.urlsafe_b64decode(padded.encode()).decode().split(':', 1)
+        if prefix != 'o' or int(offset) < 0:
+            raise ValueError(cursor)
+        return int(offset)
+    except (ValueError, UnicodeDecodeError):
+        raise InvalidCursorError("Invalid cursor.")
+
+
+class ResultStore:
+    """
+    Keeps the full ranked result set of each scan for a limited time.
+
+    Results are written to the shared store, where /api/results (a separate
+    function) can page through them, and the most recent scans are also kept
+    in memory. Check .shared first: without a shared backend on a serverless
+    host, other functions can't see what this one saved.
+    """
+
+    def __init__(self, store=None, ttl: Optional[int] = None, memory_slots: int = 8):
+        """
+        Initialize the store.
+
+        Args:
+            store: Backing key-value store. Defaults to storage.shared_store().
+            ttl: Seconds a scan stays available. Defaults to RESULT_TTL_SECONDS or 900.
+            memory_slots: Number of recent scans kept in memory
+        """
+        self.store = store or shared_store()
+        self.ttl = ttl if ttl is not None else int(os.environ.get('RESULT_TTL_SECONDS', 900))
+        self.memory_slots = memory_slots
+        self._memory: OrderedDict = OrderedDict()
+
+    @property
+    def shared(self) -> bool:
+        """True when saved scans can be paged from any function."""
+        return self.store.shared
+
+    @staticmethod
+    def _key(scan_id: str) -> str:
+        return f"results:{scan_id}"
+
+    def save(self, opportunities: List[Dict], meta: Optional[Dict] = None) -> str:
+        """
+        Store a ranked result set.
+
+        Returns:
+            The scan id used to page through the results
+        """
+        scan_id = uuid.uuid4().hex
+        now = time.time()
+        record = {
+            'scan_id': scan_id,
+            'created_at': now,
+            'expires_at': now + self.ttl,
+            'meta': meta or {},
+            'opportunities': opportunities
+        }
+        self.store.set(self._key(scan_id), record, ttl=self.ttl)
+        self._remember(scan_id, record)
+        return scan_id
+
+    def load(self, scan_id: str) -> Optional[Dict]:
+        """Get a stored scan, or None if unknown or expired."""
+        if not scan_id or not scan_id.isalnum():
+            return None
+
+        record = self._memory.get(scan_id)
+        if record is None:
+            try:
+                record = self.store.get(self._key(scan_id))
+            except StorageError:
+                return None
+            if record is None:
+                return None
+            self._remember(scan_id, record)
+
+        if record['expires_at'] < time.time():
+            self._forget(scan_id)
+            return None
+        return record
+
+    def page(
+        self,
+        scan_id: str,
+        cursor: Optional[str] = None,
+        limit: int = 50,
+        market_type: Optional[str] = None,
+        bookmaker: Optional[str] = None,
+        min_roi: Optional[float] = None
+    ) -> Dict:
+        """
+        Get one page of a stored scan.
+
+        Args:
+            scan_id: Scan to read
+            cursor: Cursor from the previous page, or None for the first page
+            limit: Page size
+            market_type: 'h2h', 'spreads', 'totals', 'props' or a prop market key
+            bookmaker: Bookmaker key or display name that must appear in the bets
+            min_roi: Minimum ROI in percent
+
+        Returns:
+            Dict with opportunities, next_cursor (None on the last page) and totals
+        """
+        # A malformed cursor is the caller's error whether or not the scan exists
+        offset = decode_cursor(cursor) if cursor else 0
+        record = self.load(scan_id)
+        if record is None:
+            raise ResultStoreError("Scan results not found or expired.")
+
+        matches = [
+            opp for opp in record['opportunities']
+            if _matches(opp, market_type, bookmaker, min_roi)
+        ]
+        page = matches[offset:offset + limit]
+        next_offset = offset + len(page)
+
+        return {
+            'scan_id': scan_id,
+            'opportunities': page,
+            'next_cursor': encode_cursor(next_offset) if next_offset < len(matches) else None,
+            'total_found': len(record['opportunities']),
+            'total_matching': len(matches),
+            'expires_at': record['expires_at']
+        }
+
+    def _remember(self, scan_id: str, record: Dict) -> None:
+        self._memory[scan_id] = record
+        self._memory.move_to_end(scan_id)
+        while len(self._memory) > self.memory_slots:
+            self._memory.popitem(last=False)
+
+    def _forget(self, scan_id: str) -> None:
+        self._memory.pop(scan_id, None)
+        try:
+            self.store.delete(self._key(scan_id))
+        except StorageError:
+            pass
+
+
+def _matches(opp: Dict, market_type: Optional[str], bookmaker: Optional[str], min_roi: Optional[float]) -> bool:
+    if min_roi is not None and opp['roi'] < min_roi:
+        return False
+
+    if market_type:
+        opp_market = market_type_of(opp)
+        if market_type == 'props':
+            if opp_market in MAIN_MARKET_TYPES:
+                return False
+        elif opp_market != market_type:
+            return False
+
+    if bookmaker:
+        names = {bookmaker, API_KEY_TO_BOOKMAKER.get(bookmaker, bookmaker)}
+        if not any(bet['bookmaker'] in names for bet in opp['bets']):
+            return False
+
+    return True
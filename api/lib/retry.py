@@ -0,0 +1,185 @@
+"""Retry, latency tracking and hedging policy for upstream requests."""
+
+import os
+import random
+import threading
+from collections import deque
+from typing import Dict, Optional
+
+
+# Status codes worth retrying: the upstream is overloaded or briefly unavailable.
+RETRYABLE_STATUS_CODES = frozenset({500, 502, 503, 504})
+
+# Hedge credits allowed before any have been spent. A serverless invocation
+# starts with a fresh policy, so without it the ratio budget below is zero
+# until the scan has already paid for most of its calls.
+HEDGE_INITIAL_BUDGET = int(os.environ.get('HEDGE_INITIAL_BUDGET', 3))
+
+
+class RetryPolicy:
+    """Exponential backoff with full jitter for idempotent GET requests."""
+
+    def __init__(
+        self,
+        max_attempts: int = 3,
+        base_delay: float = 0.25,
+        max_delay: float = 2.0,
+        total_timeout: float = 45.0
+    ):
+        """
+        Initialize the retry policy.
+
+        Args:
+            max_attempts: Total attempts per request, including the first
+            base_delay: Backoff base in seconds
+            max_delay: Cap on a single backoff sleep in seconds
+            total_timeout: Overall budget in seconds; no retry starts after it
+        """
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.total_timeout = total_timeout
+
+    def backoff(self, attempt: int) -> float:
+        """
+        Get the sleep before the given retry attempt (1-based).
+
+        Uses "full jitter": a uniform draw between zero and the exponential cap,
+        so concurrent clients that failed together do not retry together.
+        """
+        cap = min(self.max_delay, self.base_delay * (2 ** (attempt - 1)))
+        return random.uniform(0, cap)
+
+
+class LatencyTracker:
+    """Rolling per-endpoint latency samples used to derive hedge thresholds."""
+
+    def __init__(self, window: int = 200, min_samples: int = 20):
+        """
+        Initialize the tracker.
+
+        Args:
+            window: Number of recent samples kept per endpoint
+            min_samples: Samples required before a percentile is reported
+        """
+        self.window = window
+        self.min_samples = min_samples
+        self._samples: Dict[str, deque] = {}
+        self._lock = threading.Lock()
+
+    def record(self, endpoint: str, seconds: float) -> None:
+        """Record one successful request latency for an endpoint."""
+        with self._lock:
+            samples = self._samples.get(endpoint)
+            if samples is None:
+                samples = self._samples[endpoint] = deque(maxlen=self.window)
+            samples.append(seconds)
+
+    def percentile(self, endpoint: str, pct: float = 95.0) -> Optional[float]:
+        """
+        Get a latency percentile for an endpoint.
+
+        Returns:
+            Latency in seconds, or None if there are not enough samples yet
+        """
+        with self._lock:
+            samples = self._samples.get(endpoint)
+            if not samples or len(samples) < self.min_samples:
+                return None
+            ordered = sorted(samples)
+        index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+        return ordered[index]
+
+
+class HedgePolicy:
+    """Decides when a duplicate (hedged) request is worth its credit cost."""
+
+    def __init__(
+        self,
+        percentile: float = 95.0,
+        min_delay: float = 0.5,
+        max_request_cost: int = 3,
+        budget_ratio: float = 0.1,
+        initial_budget: Optional[int] = None
+    ):
+        """
+        Initialize the hedge policy.
+
+        Args:
+            percentile: Latency percentile after which a hedge is sent
+            min_delay: Never hedge before this many seconds
+            max_request_cost: Requests estimated to cost more credits are never hedged
+            budget_ratio: Hedged credits may not exceed this share of credits spent
+            initial_budget: Hedged credits allowed on top of that share, so
+                paid hedges can fire before anything has been spent
+                (HEDGE_INITIAL_BUDGET, default 3)
+        """
+        self.percentile = percentile
+        self.min_delay = min_delay
+        self.max_request_cost = max_request_cost
+        self.budget_ratio = budget_ratio
+        self.initial_budget = HEDGE_INITIAL_BUDGET if initial_budget is None else initial_budget
+        self.credits_spent = 0
+        self.hedge_credits_spent = 0
+        self.hedges_sent = 0
+        self._lock = threading.Lock()
+
+    def delay_for(self, tracker: LatencyTracker, endpoint: str) -> Optional[float]:
+        """Get the hedge delay for an endpoint, or None until latency is known."""
+        threshold = tracker.percentile(endpoint, self.percentile)
+        if threshold is None:
+            return None
+        return max(self.min_delay, threshold)
+
+    def allows(self, cost: int) -> bool:
+        """Check whether a hedge of the given credit cost fits the guards."""
+        if cost > self.max_request_cost:
+            return False
+        with self._lock:
+            if cost == 0:
+                return True
+            budget = self.initial_budget + self.credits_spent * self.budget_ratio
+            return self.hedge_credits_spent + cost <= budget
+
+    def record_spend(self, cost: int, hedged: bool = False) -> None:
+        """Account for credits used by a primary or hedged request."""
+        with self._lock:
+            self.credits_spent += cost
+            if hedged:
+                self.hedge_credits_spent += cost
+                self.hedges_sent += 1
+
+
+def endpoint_kind(endpoint: str) -> str:
+    """
+    Collapse an endpoint path into a stable kind for per-endpoint statistics.
+
+    'sports/basketball_nba/events/abc/odds' -> 'event_odds'
+    """
+    parts = [p for p in endpoint.split('/') if p]
+    if len(parts) <= 1:
+        return 'sports'
+    if len(parts) >= 5 and parts[2] == 'events':
+        return 'event_odds'
+    return parts[2] if len(parts) >= 3 else parts[0]
+
+
+def estimate_request_cost(endpoint: str, params: Optional[Dict] = None) -> int:
+    """
+    Estimate the credit cost of a request.
+
+    The Odds API charges odds requests once per market per region, where every
+    10 bookmakers count as one region. The sports and events endpoints are free.
+    """
+    if not endpoint.rstrip('/').endswith('odds'):
+        return 0
+
+    params = params or {}
+    markets = [m for m in str(params.get('markets', '')).split(',') if m]
+    if params.get('bookmakers'):
+        books = [b for b in str(params['bookmakers']).split(',') if b]
+        regions = (len(books) + 9) // 10
+    else:
+        regions = len([r for r in str(params.get('regions', 'us')).split(',') if r])
+
+    return max(1, len(markets)) * max(1, regions)
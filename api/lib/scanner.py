@@ -0,0 +1,286 @@
+"""Sport scanning: turn upstream odds into formatted arbitrage opportunities."""
+
+from typing import Dict, List, Optional
+
+from .arbitrage import (
+    parse_and_filter_event_time,
+    analyze_player_prop_arbitrage,
+    analyze_market_arbitrage
+)
+from .ev import EVBatch
+from .markets import OUTRIGHT_MARKET, get_main_markets_for_sport, get_markets_for_sport
+from .planner import RequestPlanner
+
+
+MAIN_MARKETS = ('h2h', 'spreads', 'totals')
+# Markets build_market_odds groups; outrights come only from *_winner sports
+BULK_MARKETS = MAIN_MARKETS + (OUTRIGHT_MARKET,)
+
+
+def build_market_odds(event: Dict) -> Dict:
+    """
+    Group an event's main market prices by market and outcome.
+
+    Args:
+        event: Event from the bulk odds endpoint
+
+    Returns:
+        Dict of market key -> outcome name -> list of (bookmaker, odds[, point]).
+        Only markets the event actually offers are included.
+    """
+    odds_dict = {}
+
+    for bookmaker in event.get('bookmakers', []):
+        for market in bookmaker.get('markets', []):
+            market_key = market['key']
+            if market_key not in BULK_MARKETS:
+                continue
+            market_odds = odds_dict.setdefault(market_key, {})
+
+            for outcome in market.get('outcomes', []):
+                outcome_name = outcome['name']
+                odds = outcome['price']
+                point = outcome.get('point')
+
+                if outcome_name not in market_odds:
+                    market_odds[outcome_name] = []
+
+                if point is not None:
+                    market_odds[outcome_name].append(
+                        (bookmaker['title'], odds, point)
+                    )
+                else:
+                    market_odds[outcome_name].append(
+                        (bookmaker['title'], odds)
+                    )
+
+    return odds_dict
+
+
+def build_props_odds(event_odds: Dict, market_list: List[str]) -> Dict:
+    """
+    Group an event's player prop prices by market and player line.
+
+    Args:
+        event_odds: Response data from the event odds endpoint
+        market_list: Prop market keys to keep
+
+    Returns:
+        Dict of market key -> "player|||point" -> bookmaker -> price details
+    """
+    props_dict = {m: {} for m in market_list}
+
+    for bookmaker in event_odds.get('bookmakers', []):
+        for market in bookmaker.get('markets', []):
+            market_key = market['key']
+            if market_key not in props_dict:
+                continue
+
+            for outcome in market.get('outcomes', []):
+                if 'description' not in outcome:
+                    continue
+
+                outcome_name = outcome['name']
+                outcome_odds = outcome['price']
+                outcome_description = outcome['description']
+                outcome_point = outcome.get('point')
+                bookmaker_name = bookmaker.get('title', bookmaker.get('key', 'Unknown'))
+
+                player_key = f"{outcome_description}|||{outcome_point}"
+
+                if player_key not in props_dict[market_key]:
+                    props_dict[market_key][player_key] = {}
+
+                props_dict[market_key][player_key][bookmaker_name] = {
+                    'over/under': outcome_name,
+                    'odds': outcome_odds,
+                    'player_name': outcome_description,
+                    'point': outcome_point
+                }
+
+    return props_dict
+
+
+def event_info_for(event: Dict, sport_key: str, formatted_time: str) -> Dict:
+    """Build the event summary attached to every opportunity."""
+    return {
+        'home_team': event.get('home_team'),
+        'away_team': event.get('away_team'),
+        'title': event.get('sport_title') or sport_key,
+        'sport': sport_key,
+        'commence_time': formatted_time
+    }
+
+
+def event_name(event_info: Dict) -> str:
+    """Display name of an event; outrights have no teams, so use the tournament."""
+    if event_info.get('home_team') and event_info.get('away_team'):
+        return f"{event_info['home_team']} vs {event_info['away_team']}"
+    return event_info.get('title') or event_info['sport']
+
+
+def scan_main_markets(
+    planner: RequestPlanner,
+    sport_key: str,
+    bookmakers: str,
+    ev_batch: Optional[EVBatch] = None
+) -> List[Dict]:
+    """
+    Find h2h, spreads and totals (or outright) opportunities for a sport.
+
+    The odds are also added to ev_batch when one is given.
+    """
+    opportunities = []
+    main_odds_result = planner.get_sports_odds(
+        sport_key=sport_key,
+        bookmakers=bookmakers,
+        markets=get_main_markets_for_sport(sport_key)
+    )
+
+    for event in main_odds_result['data']:
+        is_valid_time, formatted_time = parse_and_filter_event_time(event.get('commence_time'))
+        if not is_valid_time:
+            continue
+
+        event_info = event_info_for(event, sport_key, formatted_time)
+        odds_dict = build_market_odds(event)
+        if ev_batch is not None:
+            ev_batch.add_markets(event_info, odds_dict)
+
+        for market_key, market_data in odds_dict.items():
+            result = analyze_market_arbitrage(market_data, market_key)
+
+            if result and result['roi'] > 0:
+                opportunities.append(format_opportunity(event_info, market_key, result))
+
+    return opportunities
+
+
+def scan_event_props(
+    planner: RequestPlanner,
+    sport_key: str,
+    event_data: Dict,
+    bookmakers: str,
+    market_list: List[str],
+    ev_batch: Optional[EVBatch] = None
+) -> List[Dict]:
+    """
+    Find player prop opportunities for one event.
+
+    Events that have started or start within the betting buffer are skipped.
+    Upstream errors propagate to the caller. The prop prices are also added
+    to ev_batch when one is given.
+    """
+    is_valid_time, formatted_time = parse_and_filter_event_time(event_data.get('commence_time'))
+    if not is_valid_time:
+        return []
+
+    event_info = event_info_for(event_data, sport_key, formatted_time)
+    props_result = planner.get_event_odds(sport_key, event_data['id'], bookmakers)
+    props_dict = build_props_odds(props_result['data'], market_list)
+    if ev_batch is not None:
+        ev_batch.add_props(event_info, props_result['data'], market_list)
+
+    opportunities = []
+    for market_key, market_data in props_dict.items():
+        for player_key, player_props in market_data.items():
+            result = analyze_player_prop_arbitrage(player_props)
+
+            if result and result['roi'] > 0:
+                opportunities.append(format_prop_opportunity(event_info, market_key, result))
+
+    return opportunities
+
+
+def scan_props(
+    planner: RequestPlanner,
+    sport_key: str,
+    bookmakers: str,
+    max_events: int = 10,
+    ev_batch: Optional[EVBatch] = None
+) -> List[Dict]:
+    """Find player prop opportunities for the first max_events upcoming events."""
+    prop_markets = get_markets_for_sport(sport_key)
+    if not prop_markets:
+        return []
+
+    opportunities = []
+    market_list = prop_markets.split(',')
+    events_result = planner.get_events(sport_key)
+
+    for event_data in events_result['data'][:max_events]:
+        try:
+            opportunities.extend(scan_event_props(planner, sport_key, event_data, bookmakers, market_list,
+                                                  ev_batch))
+        except Exception:
+            continue
+
+    return opportunities
+
+
+def scan_sport(
+    planner: RequestPlanner,
+    sport_key: str,
+    bookmakers: str,
+    include_props: bool = True,
+    max_prop_events: int = 10,
+    ev_batch: Optional[EVBatch] = None
+) -> List[Dict]:
+    """
+    Scan one sport for arbitrage opportunities, sorted by ROI descending.
+
+    Main markets are fetched first so the props stage can reuse their event
+    list instead of calling the events endpoint. Pass an EVBatch to collect
+    every price scanned for ev_batch.evaluate() afterwards.
+    """
+    opportunities = scan_main_markets(planner, sport_key, bookmakers, ev_batch)
+
+    if include_props:
+        try:
+            opportunities.extend(scan_props(planner, sport_key, bookmakers, max_prop_events, ev_batch))
+        except Exception:
+            pass
+
+    opportunities.sort(key=lambda x: x['roi'], reverse=True)
+    return opportunities
+
+
+def format_bets(result: Dict) -> List[Dict]:
+    """Format the per-outcome bets of an analyzer result."""
+    bets = []
+    for i, outcome in enumerate(result['outcomes']):
+        bets.append({
+            'outcome': outcome,
+            'bookmaker': result['bookmakers'][i],
+            'odds': result['odds'][i],
+            'bet_percentage': round(result['bet_percentages'][i], 2),
+            'bet_amount_100': round(result['bet_percentages'][i], 2)
+        })
+    return bets
+
+
+def format_opportunity(event_info, market_key, result):
+    """Format a main market opportunity."""
+    return {
+        'event': event_name(event_info),
+        'sport': event_info['sport'],
+        'market': market_key,
+        'roi': round(result['roi'], 2),
+        'commence_time': event_info['commence_time'],
+        'bets': format_bets(result)
+    }
+
+
+def format_prop_opportunity(event_info, market_key, result):
+    """Format a player prop opportunity."""
+    player_name = result.get('player_name', 'Unknown')
+    market_display = f"{market_key} - {player_name}"
+
+    return {
+        'event': event_name(event_info),
+        'sport': event_info['sport'],
+        'market': market_display,
+        'roi': round(result['roi'], 2),
+        'commence_time': event_info['commence_time'],
+        'bets': format_bets(result)
+    }
@@ -0,0 +1,154 @@
+"""Single-flight coalescing of identical concurrent calls."""
+
+import hashlib
+import os
+import threading
+import time
+import uuid
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+from .storage import StorageError, shared_store
+
+
+# How long a leader may hold the cross-instance lease before others give up waiting
+LEASE_SECONDS = float(os.environ.get('SINGLEFLIGHT_LEASE_SECONDS', 30))
+# How long a leader's result stays readable by the instances waiting on it
+RESULT_SECONDS = 5.0
+POLL_SECONDS = 0.1
+
+
+class _Call:
+    """One in-flight call and the callers waiting on it."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    Lets concurrent callers with the same key share one execution.
+
+    The first caller for a key runs the function; callers arriving while it
+    is still running wait for it and receive the same result (or exception).
+    Nothing is cached once the call finishes, so later callers run it again.
+
+    When the store is shared (Redis on Vercel, files on one machine) the
+    leader also takes a lease in it, so leaders on other instances wait for
+    its result instead of making the same call. Results must then be JSON.
+    """
+
+    def __init__(self, store=None):
+        """
+        Initialize the group.
+
+        Args:
+            store: Store used to coalesce across instances. Defaults to
+                storage.shared_store(); ignored unless it is shared.
+        """
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+        self._store = store
+        self._owner = uuid.uuid4().hex
+        self.executed = 0
+        self.coalesced = 0
+        self.remote = 0
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Tuple[Any, bool]:
+        """
+        Run fn once for all concurrent callers with the same key.
+
+        Args:
+            key: Identity of the call
+            fn: Zero-argument function to run
+
+        Returns:
+            Tuple of (result, shared) where shared is True if this caller
+            received another caller's result
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                call.waiters += 1
+                self.coalesced += 1
+                leader = False
+            else:
+                call = self._calls[key] = _Call()
+                self.executed += 1
+                leader = True
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result, shared = self._run(key, fn)
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+        return call.result, shared
+
+    def _run(self, key: Hashable, fn: Callable[[], Any]) -> Tuple[Any, bool]:
+        """Run fn, or wait for the instance that holds the lease for key."""
+        store = self._store or shared_store()
+        if not store.shared:
+            return fn(), False
+
+        name = 'flight:' + hashlib.sha1(repr(key).encode('utf-8')).hexdigest()
+        result_name = name + ':result'
+        try:
+            leader = store.set(name, self._owner, ttl=LEASE_SECONDS, nx=True)
+        except StorageError:
+            return fn(), False
+
+        if leader:
+            try:
+                result = fn()
+                try:
+                    store.set(result_name, result, ttl=RESULT_SECONDS)
+                except StorageError:
+                    pass
+                return result, False
+            finally:
+                try:
+                    store.delete(name)
+                except StorageError:
+                    pass
+
+        deadline = time.monotonic() + LEASE_SECONDS
+        try:
+            while time.monotonic() < deadline:
+                time.sleep(POLL_SECONDS)
+                released = store.get(name) is None
+                result = store.get(result_name)
+                if result is not None:
+                    with self._lock:
+                        self.remote += 1
+                    return result, True
+                if released:
+                    # The leader failed; make the call here
+                    break
+        except StorageError:
+            pass
+        return fn(), False
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._calls)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            'executed': self.executed,
+            'coalesced': self.coalesced,
+            'remote': self.remote,
+            'in_flight': self.in_flight()
+        }
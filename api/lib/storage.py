@@ -0,0 +1,280 @@
+"""
+State shared between processes and serverless functions.
+
+state_dir() is a local directory: it is shared by the processes of one
+machine (or one warm serverless instance) only. On Vercel every api/*.py is
+its own function with its own /tmp, so anything another function must read
+(result pages, breaker state, metrics, warmed odds) goes through
+shared_store() instead: Redis over its REST API (Vercel KV / Upstash) when
+KV_REST_API_URL and KV_REST_API_TOKEN are set, local files otherwise.
+"""
+
+import base64
+import gzip
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from typing import Any, Dict, Optional
+
+
+def state_dir(*parts: str) -> str:
+    """
+    Get (and create) a directory under the shared state root.
+
+    The root is ARB_STATE_DIR, or a folder in the system temp dir. On Vercel
+    that is /tmp, which survives between invocations of a warm instance.
+    """
+    root = os.environ.get('ARB_STATE_DIR') or os.path.join(tempfile.gettempdir(), 'arbitrage')
+    path = os.path.join(root, *parts)
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def write_json(path: str, payload: Any, compress: bool = False) -> None:
+    """Atomically write JSON, optionally gzip-compressed."""
+    data = json.dumps(payload, separators=(',', ':')).encode('utf-8')
+    if compress:
+        data = gzip.compress(data, compresslevel=5)
+
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def read_json(path: str, compressed: bool = False) -> Optional[Any]:
+    """Read JSON written by write_json, or None if missing or unreadable."""
+    try:
+        with open(path, 'rb') as f:
+            data = f.read()
+        if compressed:
+            data = gzip.decompress(data)
+        return json.loads(data)
+    except (OSError, ValueError, EOFError):
+        return None
+
+
+class StorageError(Exception):
+    """The shared store could not be reached or refused a command."""
+    pass
+
+
+# Values larger than this are gzip-compressed before they are stored
+COMPRESS_OVER = 4096
+_COMPRESSED = 'gz:'
+
+
+def _encode(value: Any) -> str:
+    data = json.dumps(value, separators=(',', ':'))
+    if len(data) > COMPRESS_OVER:
+        data = _COMPRESSED + base64.b64encode(gzip.compress(data.encode('utf-8'), compresslevel=5)).decode()
+    return data
+
+
+def _decode(data: Optional[str]) -> Optional[Any]:
+    if data is None:
+        return None
+    if data.startswith(_COMPRESSED):
+        data = gzip.decompress(base64.b64decode(data[len(_COMPRESSED):])).decode('utf-8')
+    return json.loads(data)
+
+
+class RedisRESTStore:
+    """JSON values in Redis, through the REST API of Vercel KV or Upstash."""
+
+    shared = True
+
+    def __init__(self, url: str, token: str, prefix: str = 'arb:', timeout: float = 5.0):
+        import requests
+
+        self.url = url.rstrip('/')
+        self.prefix = prefix
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.session.headers['Authorization'] = f"Bearer {token}"
+
+    def _pipeline(self, *commands: list) -> list:
+        import requests
+
+        try:
+            response = self.session.post(f"{self.url}/pipeline", json=[[str(a) for a in c] for c in commands],
+                                         timeout=self.timeout)
+            response.raise_for_status()
+            replies = response.json()
+        except (requests.exceptions.RequestException, ValueError) as e:
+            raise StorageError(f"Shared store unavailable: {e}")
+        for reply in replies:
+            if 'error' in reply:
+                raise StorageError(reply['error'])
+        return [reply.get('result') for reply in replies]
+
+    def get(self, key: str) -> Optional[Any]:
+        return _decode(self._pipeline(['GET', self.prefix + key])[0])
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None, nx: bool = False) -> bool:
+        command = ['SET', self.prefix + key, _encode(value)]
+        if ttl is not None:
+            command += ['PX', max(1, int(ttl * 1000))]
+        if nx:
+            command.append('NX')
+        return self._pipeline(command)[0] == 'OK'
+
+    def delete(self, key: str) -> None:
+        self._pipeline(['DEL', self.prefix + key])
+
+    def hset(self, name: str, field: str, value: Any, ttl: Optional[float] = None) -> None:
+        commands = [['HSET', self.prefix + name, field, _encode(value)]]
+        if ttl is not None:
+            commands.append(['PEXPIRE', self.prefix + name, max(1, int(ttl * 1000))])
+        self._pipeline(*commands)
+
+    def hgetall(self, name: str) -> Dict[str, Any]:
+        flat = self._pipeline(['HGETALL', self.prefix + name])[0] or []
+        return {flat[i]: _decode(flat[i + 1]) for i in range(0, len(flat), 2)}
+
+    def hdel(self, name: str, *fields: str) -> None:
+        if fields:
+            self._pipeline(['HDEL', self.prefix + name, *fields])
+
+
+class FileStore:
+    """
+    The same interface on local files under the state dir.
+
+    Shared by the processes of one machine, so it serves the CLI, Docker and
+    `python api/x.py`. On a serverless host it is private to one instance.
+    """
+
+    # Seconds between sweeps of expired entries
+    SWEEP_INTERVAL = 60.0
+
+    def __init__(self, directory: Optional[str] = None):
+        self.directory = directory or state_dir('shared')
+        self.shared = not os.environ.get('VERCEL')
+        self._swept_at = 0.0
+        self._lock = threading.Lock()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, hashlib.sha1(key.encode('utf-8')).hexdigest() + '.json')
+
+    def _read(self, path: str) -> Optional[Dict]:
+        entry = read_json(path)
+        if entry is None:
+            return None
+        if entry['expires_at'] is not None and entry['expires_at'] < time.time():
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            return None
+        return entry
+
+    def _write(self, path: str, value: Any, ttl: Optional[float]) -> None:
+        expires_at = time.time() + ttl if ttl is not None else None
+        try:
+            write_json(path, {'expires_at': expires_at, 'value': value})
+        except OSError as e:
+            raise StorageError(f"Shared store unavailable: {e}")
+        self._sweep()
+
+    def get(self, key: str) -> Optional[Any]:
+        entry = self._read(self._path(key))
+        return entry['value'] if entry else None
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None, nx: bool = False) -> bool:
+        path = self._path(key)
+        if not nx:
+            self._write(path, value, ttl)
+            return True
+
+        # A claim file makes check-and-set atomic across processes
+        claim = f"{path}.claim"
+        try:
+            fd = os.open(claim, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
+            try:
+                # Left behind by a process that died mid-claim
+                if os.path.getmtime(claim) < time.time() - 10:
+                    os.remove(claim)
+            except OSError:
+                pass
+            return False
+        try:
+            if self._read(path) is not None:
+                return False
+            self._write(path, value, ttl)
+            return True
+        finally:
+            os.close(fd)
+            os.remove(claim)
+
+    def delete(self, key: str) -> None:
+        try:
+            os.remove(self._path(key))
+        except OSError:
+            pass
+
+    def _hash_dir(self, name: str) -> str:
+        return os.path.join(self.directory, 'hash-' + hashlib.sha1(name.encode('utf-8')).hexdigest())
+
+    def hset(self, name: str, field: str, value: Any, ttl: Optional[float] = None) -> None:
+        directory = self._hash_dir(name)
+        os.makedirs(directory, exist_ok=True)
+        self._write(os.path.join(directory, hashlib.sha1(field.encode('utf-8')).hexdigest() + '.json'),
+                    {'field': field, 'value': value}, ttl)
+
+    def hgetall(self, name: str) -> Dict[str, Any]:
+        directory = self._hash_dir(name)
+        try:
+            names = os.listdir(directory)
+        except OSError:
+            return {}
+        fields = {}
+        for file_name in names:
+            if file_name.endswith('.json'):
+                entry = self._read(os.path.join(directory, file_name))
+                if entry:
+                    fields[entry['value']['field']] = entry['value']['value']
+        return fields
+
+    def hdel(self, name: str, *fields: str) -> None:
+        for field in fields:
+            try:
+                os.remove(os.path.join(self._hash_dir(name), hashlib.sha1(field.encode('utf-8')).hexdigest() + '.json'))
+            except OSError:
+                pass
+
+    def _sweep(self) -> None:
+        now = time.time()
+        with self._lock:
+            if now - self._swept_at < self.SWEEP_INTERVAL:
+                return
+            self._swept_at = now
+        for root, _, names in os.walk(self.directory):
+            for file_name in names:
+                if file_name.endswith('.json'):
+                    self._read(os.path.join(root, file_name))
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def shared_store():
+    """
+    Get the store every function of the deployment can read.
+
+    Redis over REST when KV_REST_API_URL and KV_REST_API_TOKEN (or the
+    UPSTASH_REDIS_REST_* equivalents) are set, otherwise a FileStore. Check
+    .shared before relying on another function seeing a value.
+    """
+    global _store
+    with _store_lock:
+        if _store is None:
+            url = os.environ.get('KV_REST_API_URL') or os.environ.get('UPSTASH_REDIS_REST_URL')
+            token = os.environ.get('KV_REST_API_TOKEN') or os.environ.get('UPSTASH_REDIS_REST_TOKEN')
+            _store = RedisRESTStore(url, token) if url and token else FileStore()
+        return _store
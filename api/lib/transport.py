@@ -0,0 +1,206 @@
+"""
+Pluggable HTTP transports for the Odds API clients.
+
+Both clients send every request through `session.get(url, params=..., timeout=...)`.
+A transport is a drop-in replacement for that session:
+
+- live: a plain requests.Session
+- record: forwards to a live session and writes each request and response
+  (status, headers such as x-requests-remaining, body and latency) to a corpus
+- replay: serves responses from a corpus offline, sleeping for the recorded
+  latency, so scans can be benchmarked and regression-checked without network
+  access or credits
+
+Corpus layout, all gzip-compressed and content-addressed:
+
+    requests/<sha256 of method, url and params>.json.gz   request and responses
+    bodies/<sha256 of body>.gz                            raw response bodies
+
+API keys are never written. Identical bodies are stored once. A request seen
+several times keeps every response, and replay serves them in recorded order
+(repeating the last), so a corpus captured over a session replays the same
+sequence of odds movements.
+
+Stdlib and requests only, so the CLI can use it without the web dependencies.
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Dict, Optional
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+from .storage import read_json, state_dir, write_json
+
+
+TRANSPORT_MODES = ('live', 'record', 'replay')
+# Query parameters that identify the caller, not the request
+IGNORED_PARAMS = ('apiKey',)
+
+
+class CorpusMissError(requests.exceptions.RequestException):
+    """Replay was asked for a request the corpus does not contain."""
+    pass
+
+
+def request_digest(method: str, url: str, params: Optional[Dict] = None) -> str:
+    """Content address of a request, independent of the API key used."""
+    query = sorted((k, str(v)) for k, v in (params or {}).items() if k not in IGNORED_PARAMS)
+    identity = json.dumps([method.upper(), url, query], separators=(',', ':'))
+    return hashlib.sha256(identity.encode('utf-8')).hexdigest()
+
+
+class Corpus:
+    """Request index and body store on disk."""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.requests_dir = os.path.join(directory, 'requests')
+        self.bodies_dir = os.path.join(directory, 'bodies')
+        os.makedirs(self.requests_dir, exist_ok=True)
+        os.makedirs(self.bodies_dir, exist_ok=True)
+
+    def _request_path(self, digest: str) -> str:
+        return os.path.join(self.requests_dir, f"{digest}.json.gz")
+
+    def load(self, digest: str) -> Optional[Dict]:
+        return read_json(self._request_path(digest), compressed=True)
+
+    def save(self, digest: str, entry: Dict) -> None:
+        write_json(self._request_path(digest), entry, compress=True)
+
+    def put_body(self, body: bytes) -> str:
+        """Store a body once and return its content address."""
+        digest = hashlib.sha256(body).hexdigest()
+        path = os.path.join(self.bodies_dir, f"{digest}.gz")
+        if not os.path.exists(path):
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(gzip.compress(body, compresslevel=6))
+            os.replace(tmp_path, path)
+        return digest
+
+    def get_body(self, digest: str) -> bytes:
+        with open(os.path.join(self.bodies_dir, f"{digest}.gz"), 'rb') as f:
+            return gzip.decompress(f.read())
+
+
+class RecordingTransport:
+    """Live session that writes every exchange to a corpus."""
+
+    def __init__(self, corpus_dir: str, session: Optional[requests.Session] = None):
+        self.corpus = Corpus(corpus_dir)
+        self.session = session or requests.Session()
+        self.recorded = 0
+        self._lock = threading.Lock()
+
+    def get(self, url: str, params: Optional[Dict] = None, **kwargs) -> requests.Response:
+        started = time.monotonic()
+        response = self.session.get(url, params=params, **kwargs)
+        elapsed = time.monotonic() - started
+
+        digest = request_digest('GET', url, params)
+        exchange = {
+            'status': response.status_code,
+            'headers': dict(response.headers),
+            'body': self.corpus.put_body(response.content),
+            'elapsed': round(elapsed, 4),
+            'recorded_at': time.time()
+        }
+        with self._lock:
+            entry = self.corpus.load(digest) or {
+                'method': 'GET',
+                'url': url,
+                'params': {k: v for k, v in (params or {}).items() if k not in IGNORED_PARAMS},
+                'responses': []
+            }
+            entry['responses'].append(exchange)
+            try:
+                self.corpus.save(digest, entry)
+                self.recorded += 1
+            except OSError:
+                pass
+        return response
+
+    def close(self) -> None:
+        self.session.close()
+
+
+class ReplayTransport:
+    """Serves a recorded corpus offline with the recorded latency."""
+
+    def __init__(self, corpus_dir: str, timing: float = 1.0):
+        """
+        Initialize the transport.
+
+        Args:
+            corpus_dir: Directory written by RecordingTransport
+            timing: Multiplier on recorded latency; 0 replays instantly
+        """
+        self.corpus = Corpus(corpus_dir)
+        self.timing = timing
+        self.replayed = 0
+        self.misses = 0
+        self._served: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def get(self, url: str, params: Optional[Dict] = None, **kwargs) -> requests.Response:
+        digest = request_digest('GET', url, params)
+        entry = self.corpus.load(digest)
+        if not entry or not entry['responses']:
+            self.misses += 1
+            raise CorpusMissError(f"No recorded response for {url}")
+
+        with self._lock:
+            index = self._served.get(digest, 0)
+            self._served[digest] = index + 1
+            self.replayed += 1
+        exchange = entry['responses'][min(index, len(entry['responses']) - 1)]
+
+        if self.timing:
+            time.sleep(exchange['elapsed'] * self.timing)
+
+        response = requests.Response()
+        response.status_code = exchange['status']
+        response.headers = CaseInsensitiveDict(exchange['headers'])
+        # Bodies are stored decoded; don't let callers try to gunzip them again
+        response.headers.pop('Content-Encoding', None)
+        response._content = self.corpus.get_body(exchange['body'])
+        response.encoding = 'utf-8'
+        response.url = url
+        response.reason = 'Replayed'
+        return response
+
+    def close(self) -> None:
+        pass
+
+
+def open_transport(mode: Optional[str] = None, corpus_dir: Optional[str] = None, timing: Optional[float] = None):
+    """
+    Build the transport selected by arguments or environment.
+
+    Args:
+        mode: live, record or replay (ODDS_TRANSPORT, default live)
+        corpus_dir: Corpus location (ODDS_CORPUS, default the state dir)
+        timing: Replay latency multiplier (ODDS_REPLAY_TIMING, default 1)
+
+    Returns:
+        A requests.Session or a transport with the same get() interface
+    """
+    mode = (mode or os.environ.get('ODDS_TRANSPORT') or 'live').lower()
+    if mode not in TRANSPORT_MODES:
+        raise ValueError(f"Unknown ODDS_TRANSPORT {mode!r}; expected one of {', '.join(TRANSPORT_MODES)}")
+    if mode == 'live':
+        return requests.Session()
+
+    corpus_dir = corpus_dir or os.environ.get('ODDS_CORPUS') or state_dir('corpus')
+    if mode == 'record':
+        return RecordingTransport(corpus_dir)
+    if timing is None:
+        timing = float(os.environ.get('ODDS_REPLAY_TIMING', 1.0))
+    return ReplayTransport(corpus_dir, timing=timing)
@@ -0,0 +1,39 @@
+"""GET /api/metrics - Upstream, credit, cache and scan metrics (JSON or Prometheus)."""
+
+import os
+import sys
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from flask import Flask, Response, jsonify, request
+from lib.metrics import collect, render_prometheus
+
+app = Flask(__name__)
+
+
+def wants_prometheus() -> bool:
+    fmt = request.args.get('format', '').lower()
+    if fmt:
+        return fmt in ('prometheus', 'prom', 'text')
+    accept = request.headers.get('Accept', '')
+    return 'text/plain' in accept or 'openmetrics' in accept
+
+
+@app.route('/api/metrics', methods=['GET'])
+def get_metrics():
+    try:
+        snapshot = collect()
+
+        if wants_prometheus():
+            response = Response(render_prometheus(snapshot), mimetype='text/plain; version=0.0.4')
+        else:
+            response = jsonify(snapshot)
+        response.headers.add('Access-Control-Allow-Origin', '*')
+        return response
+
+    except Exception as e:
+        response = jsonify({'error': f'Internal error: {str(e)}'})
+        response.status_code = 500
+        response.headers.add('Access-Control-Allow-Origin', '*')
+        return response
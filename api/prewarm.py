@@ -0,0 +1,61 @@
+"""GET /api/prewarm - Pre-warm the odds cache for events starting soon (cron)."""
+
+import hmac
+import os
+import sys
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from flask import Flask, jsonify, request
+from lib.api_client import APIClient, APIError
+from lib.metrics import metrics
+from lib.prewarm import PrewarmJob
+from lib.responses import json_response
+
+app = Flask(__name__)
+
+
+@app.teardown_request
+def flush_metrics(exc):
+    metrics.flush()
+
+
+@app.route('/api/prewarm', methods=['GET', 'POST'])
+def prewarm():
+    # Vercel cron sends the project's CRON_SECRET as a bearer token. Every
+    # run spends credits, so without a secret the endpoint stays closed.
+    secret = os.environ.get('CRON_SECRET')
+    if not secret:
+        response = jsonify({'error': 'CRON_SECRET not configured'})
+        response.status_code = 403
+        response.headers.add('Access-Control-Allow-Origin', '*')
+        return response
+    if not hmac.compare_digest(request.headers.get('Authorization', ''), f'Bearer {secret}'):
+        response = jsonify({'error': 'Unauthorized'})
+        response.status_code = 401
+        response.headers.add('Access-Control-Allow-Origin', '*')
+        return response
+
+    try:
+        budget = request.args.get('budget', type=float)
+        sports = request.args.get('sports')
+
+        job = PrewarmJob(APIClient(), budget=budget)
+        report = job.run(sports.split(',') if sports else None)
+
+        response = json_response(report)
+        response.headers.add('Access-Control-Allow-Origin', '*')
+        return response
+
+    except APIError as e:
+        response = jsonify({'error': str(e)})
+        response.status_code = 400
+        response.headers.add('Access-Control-Allow-Origin', '*')
+        return response
+
+    except Exception as e:
+        response = jsonify({'error': f'Internal error: {str(e)}'})
+        response.status_code = 500
+        response.headers.add('Access-Control-Allow-Origin', '*')
+        return response
@@ -0,0 +1,63 @@
+"""GET /api/results - Page through the stored results of a previous scan."""
+
+import os
+import sys
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from flask import Flask, jsonify, request
+from lib.responses import compact_opportunities, json_response, wants_compact
+from lib.result_store import InvalidCursorError, ResultStore, ResultStoreError
+
+app = Flask(__name__)
+store = ResultStore()
+
+MAX_PAGE_SIZE = 500
+
+
+@app.route('/api/results', methods=['GET'])
+def get_results():
+    try:
+        scan_id = request.args.get('scan_id')
+        if not scan_id:
+            response = jsonify({'error': 'scan_id is required'})
+            response.status_code = 400
+            response.headers.add('Access-Control-Allow-Origin', '*')
+            return response
+
+        limit = min(max(request.args.get('limit', 50, type=int), 1), MAX_PAGE_SIZE)
+
+        page = store.page(
+            scan_id,
+            cursor=request.args.get('cursor') or None,
+            limit=limit,
+            market_type=request.args.get('market_type') or None,
+            bookmaker=request.args.get('bookmaker') or None,
+            min_roi=request.args.get('min_roi', type=float)
+        )
+
+        if wants_compact():
+            page['opportunities'] = compact_opportunities(page['opportunities'])
+
+        response = json_response(page)
+        response.headers.add('Access-Control-Allow-Origin', '*')
+        return response
+
+    except InvalidCursorError as e:
+        response = jsonify({'error': str(e)})
+        response.status_code = 400
+        response.headers.add('Access-Control-Allow-Origin', '*')
+        return response
+
+    except ResultStoreError as e:
+        response = jsonify({'error': str(e)})
+        response.status_code = 404
+        response.headers.add('Access-Control-Allow-Origin', '*')
+        return response
+
+    except Exception as e:
+        response = jsonify({'error': f'Internal error: {str(e)}'})
+        response.status_code = 500
+        response.headers.add('Access-Control-Allow-Origin', '*')
+        return response
@@ -8,32 +8,41 @@ sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 from flask import Flask, jsonify
 from lib.api_client import APIClient, APIError
+from lib.markets import is_outright_sport
+from lib.metrics import metrics
+from lib.responses import json_response
 
 app = Flask(__name__)
 
 
+@app.teardown_request
+def flush_metrics(exc):
+    metrics.flush()
+
+
 @app.route('/api/sports', methods=['GET'])
 def get_sports():
     try:
         client = APIClient()
         result = client.get_sports()
 
-        # Filter out winner markets and inactive sports
+        # Filter out inactive sports; *_winner sports are scanned as outrights
         sports = [
             {
                 'key': sport['key'],
                 'title': sport.get('title', sport['key']),
                 'group': sport.get('group', 'Other'),
-                'active': sport.get('active', True)
+                'active': sport.get('active', True),
+                'outrights': is_outright_sport(sport['key'])
             }
             for sport in result['data']
-            if '_winner' not in sport['key'].lower() and sport.get('active', True)
+            if sport.get('active', True)
         ]
 
         # Sort by group then title
         sports.sort(key=lambda x: (x['group'], x['title']))
 
-        response = jsonify({
+        response = json_response({
             'sports': sports,
             'remaining_credits': result['remaining']
         })
@@ -1,30 +1,94 @@
 import os
 import sys
+import json
+import gzip
+import hashlib
+import hmac
+import ipaddress
+import queue
+import threading
+import time
+import argparse
+import multiprocessing
 import requests
-import smtplib
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from functools import lru_cache
 from typing import Dict, List, Optional
 from dotenv import load_dotenv
 from datetime import datetime, timedelta, timezone
-import questionary
-from rich.live import Live
-from rich.text import Text
-from rich.console import Console
+# questionary, rich, smtplib and email.mime are imported where they are used so
+# headless --batch runs don't pay for them at startup
 
 class APIKeysExhaustedException(Exception):
     """Raised when all API keys have been exhausted"""
     pass
 
 
+class ScanMetrics:
+    """Request, latency, credit and yield counters for one CLI scan (same series as /api/metrics)"""
+    def __init__(self):
+        self.started = time.time()
+        self.requests = {}
+        self.latencies = []
+        self.credits_used = 0.0
+        self.opportunities = {}
+
+    def recordRequest(self, endpoint_kind, status, latency=None, headers=None):
+        key = f"{endpoint_kind}:{status}"
+        self.requests[key] = self.requests.get(key, 0) + 1
+        if latency is not None:
+            self.latencies.append(latency)
+            del self.latencies[:-500]
+        try:
+            self.credits_used += float((headers or {}).get('x-requests-last'))
+        except (TypeError, ValueError):
+            pass
+
+    def recordOpportunity(self, opportunity):
+        market_type = opportunity['market'].split(' - ', 1)[0]
+        self.opportunities[market_type] = self.opportunities.get(market_type, 0) + 1
+
+    def merge(self, snapshot):
+        """Add counters reported by a worker process"""
+        for key, count in snapshot['requests'].items():
+            self.requests[key] = self.requests.get(key, 0) + count
+        self.latencies.extend(snapshot['latencies'])
+        del self.latencies[:-500]
+        self.credits_used += snapshot['credits_used']
+
+    def snapshot(self):
+        return {'requests': dict(self.requests), 'latencies': list(self.latencies), 'credits_used': self.credits_used}
+
+    def p95(self):
+        if not self.latencies:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[int(0.95 * (len(ordered) - 1))]
+
+    def burnPerMinute(self):
+        elapsed = time.time() - self.started
+        return self.credits_used / elapsed * 60 if elapsed > 0 else 0.0
+
+    def summary(self):
+        total = sum(self.requests.values())
+        failed = sum(c for k, c in self.requests.items() if not k.endswith(':200'))
+        p95 = self.p95()
+        latency = f"p95 {p95:.2f}s" if p95 is not None else "p95 -"
+        opps = ', '.join(f"{m} {c}" for m, c in sorted(self.opportunities.items(), key=lambda x: -x[1])[:4]) or 'none'
+        return (f"Req {total} ({failed} failed) | {latency} | Used {self.credits_used:g} "
+                f"({self.burnPerMinute():.1f}/min) | Opps: {opps}")
+
+
 class StatusDisplay:
     """Live status bar for API credits display"""
-    def __init__(self, total_keys):
+    def __init__(self, total_keys, metrics=None):
         self.total_keys = total_keys
         self.current_key = 1
         self.credits = "..."
         self.sport = ""
         self.live = None
+        self.metrics = metrics
 
     def update(self, key_index=None, credits=None, sport=None):
         if key_index is not None:
@@ -37,7 +101,11 @@ class StatusDisplay:
             self.live.update(self.render())
 
     def render(self):
-        return Text(f"API Key {self.current_key}/{self.total_keys} | Credits: {self.credits} | Scanning: {self.sport}")
+        from rich.text import Text
+        line = f"API Key {self.current_key}/{self.total_keys} | Credits: {self.credits} | Scanning: {self.sport}"
+        if self.metrics is not None:
+            line += f"\n{self.metrics.summary()}"
+        return Text(line)
 
 
 americanFootballMarkets='player_assists,player_defensive_interceptions,player_field_goals,player_kicking_points,player_pass_attempts,player_pass_completions,player_pass_interceptions,player_pass_longest_completion,player_pass_rush_yds,player_pass_rush_reception_tds,player_pass_rush_reception_yds,player_pass_tds,player_pass_yds,player_pass_yds_q1,player_pats,player_receptions,player_reception_longest,player_reception_tds,player_reception_yds,player_rush_attempts,player_rush_longest,player_rush_reception_tds,player_rush_reception_yds,player_rush_tds,player_rush_yds,player_sacks,player_solo_tackles,player_tackles_assists'
@@ -47,6 +115,28 @@ iceHockeyMarkets='player_points,player_power_play_points,player_assists,player_b
 aussieRulesMarkets='player_disposals,player_afl_fantasy_points'
 soccerMarkets='player_shots_on_target,player_shots,player_assists'
 
+def getPropMarkets(sportKey):
+    """Player prop markets for a sport, or '' if it has none"""
+    if sportKey == 'americanfootball_nfl' or sportKey == 'americanfootball_ncaaf' or sportKey == 'americanfootball_cfl':
+        return americanFootballMarkets
+    elif sportKey == 'basketball_nba' or sportKey == 'basketball_ncaab' or sportKey == 'basketball_wbna':
+        return basketballMarkets
+    elif sportKey == 'baseball_mlb':
+        return baseballMarkets
+    elif sportKey == 'icehockey_nhl':
+        return iceHockeyMarkets
+    elif sportKey == 'aussierules_afl':
+        return aussieRulesMarkets
+    elif sportKey == 'soccer_epl' or sportKey == 'soccer_france_ligue_one' or sportKey == 'soccer_germany_bundesliga' or sportKey == 'soccer_italy_serie_a' or sportKey == 'soccer_spain_la_liga' or sportKey == 'soccer_usa_mls':
+        return soccerMarkets
+    return ''
+
+def getMainMarkets(sportKey):
+    """Bulk odds markets for a sport; *_winner futures only offer outrights"""
+    if sportKey.lower().endswith('_winner'):
+        return 'outrights'
+    return 'h2h,spreads,totals'
+
 BOOKMAKER_API_KEYS = {
     'BetOnline.ag': 'betonlineag',
     'BetMGM': 'betmgm',
@@ -59,93 +149,170 @@ BOOKMAKER_API_KEYS = {
     'MyBookie.ag': 'mybookieag'
 }
 
+def regionBookmakers(regions=None):
+    """Display name -> API key of every bookmaker in the regions scanned (ODDS_REGIONS, default us)"""
+    regions = regions or os.getenv('ODDS_REGIONS', 'us')
+    if regions == 'us':
+        return dict(BOOKMAKER_API_KEYS)
+    apiLibPath()
+    from lib.markets import REGION_BOOKMAKERS
+    from lib.regions import parse_regions
+    books = {}
+    for region in parse_regions(regions):
+        books.update(REGION_BOOKMAKERS[region])
+    return books
+
+def loadAPIKeys():
+    """Load multiple API keys (comma-separated) or fall back to single key"""
+    load_dotenv()
+    api_keys_str = os.getenv('API_KEYS', '')
+    if api_keys_str:
+        return [k.strip() for k in api_keys_str.split(',') if k.strip()]
+    single_key = os.getenv('API_KEY', '')
+    if not single_key and os.getenv('ODDS_TRANSPORT', '').lower() == 'replay':
+        # Replayed requests are matched without the key
+        return ['replay']
+    return [single_key] if single_key else []
+
+
+def apiLibPath():
+    """Make the web API's shared modules (api/lib) importable"""
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'api')
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+
+def openSession():
+    """requests.Session, or the record/replay transport selected by ODDS_TRANSPORT"""
+    if os.getenv('ODDS_TRANSPORT', 'live').lower() == 'live':
+        return requests.Session()
+    apiLibPath()
+    from lib.transport import open_transport
+    return open_transport()
+
+
 class APIClient:
-    def __init__(self, status_display=None):
-        load_dotenv()
-        # Load multiple API keys (comma-separated) or fall back to single key
-        api_keys_str = os.getenv('API_KEYS', '')
-        if api_keys_str:
-            self.api_keys = [k.strip() for k in api_keys_str.split(',') if k.strip()]
-        else:
-            single_key = os.getenv('API_KEY', '')
-            self.api_keys = [single_key] if single_key else []
+    def __init__(self, status_display=None, api_keys=None, verbose=True, metrics=None):
+        self.api_keys = api_keys if api_keys is not None else loadAPIKeys()
 
         if not self.api_keys:
             print("No API keys found. Set API_KEYS or API_KEY in .env file.")
             sys.exit(1)
 
         self.current_key_index = 0
-        self.session = requests.Session()
+        self._keyLock = threading.Lock()
+        self.session = openSession()
         self.baseURL = 'https://api.the-odds-api.com/v4/'
         self.status_display = status_display
-        print(f"Loaded {len(self.api_keys)} API key(s)")
-
-    def _rotate_key(self):
-        """Switch to next available API key"""
-        self.current_key_index += 1
+        self.verbose = verbose
+        self.remaining_credits = None
+        self.metrics = metrics if metrics is not None else ScanMetrics()
+        if self.verbose:
+            print(f"Loaded {len(self.api_keys)} API key(s)")
+
+    def _rotate_key(self, failed_index=None):
+        """Switch to next available API key
+
+        Concurrent region requests can fail on the same key; only the first
+        of them rotates.
+        """
+        with self._keyLock:
+            if failed_index is not None and failed_index != self.current_key_index:
+                return
+            self.current_key_index += 1
         if self.current_key_index >= len(self.api_keys):
             raise APIKeysExhaustedException("All API keys exhausted. No more requests available.")
-        print(f"Rotating to API key {self.current_key_index + 1}/{len(self.api_keys)}")
+        if self.verbose:
+            print(f"Rotating to API key {self.current_key_index + 1}/{len(self.api_keys)}")
 
     def _make_request(self, endpoint, params):
         """Make request with automatic key rotation on rate limit (429)"""
         while self.current_key_index < len(self.api_keys):
-            params['apiKey'] = self.api_keys[self.current_key_index]
+            key_index = self.current_key_index
+            params['apiKey'] = self.api_keys[key_index]
+            kind = self._endpointKind(endpoint)
             try:
+                sent = time.monotonic()
                 response = self.session.get(endpoint, params=params)
+                self.metrics.recordRequest(kind, response.status_code, time.monotonic() - sent, response.headers)
 
                 if response.status_code == 429:
-                    self._rotate_key()
+                    self._rotate_key(key_index)
                     continue
 
                 if response.status_code == 401:
-                    self._rotate_key()
+                    self._rotate_key(key_index)
                     continue
 
                 response.raise_for_status()
 
                 remaining = response.headers.get('x-requests-remaining', 'unknown')
+                self.remaining_credits = remaining
                 if self.status_display:
                     self.status_display.update(key_index=self.current_key_index, credits=remaining)
 
                 return response
 
             except requests.exceptions.RequestException as e:
+                self.metrics.recordRequest(kind, 'error')
                 raise Exception(f"Network error: {e}") from e
 
         raise Exception("All API keys exhausted. No more requests available.")
 
+    @staticmethod
+    def _endpointKind(endpoint):
+        if '/events/' in endpoint:
+            return 'event_odds'
+        if endpoint.endswith('/events'):
+            return 'events'
+        if endpoint.rstrip('/').endswith('/odds'):
+            return 'odds'
+        return 'sports'
+
     def getEvents(self, sportKey):
         endpoint = f'{self.baseURL}sports/{sportKey}/events'
         params = {}
         response = self._make_request(endpoint, params)
         return response.json()
 
-    def getEventOdds(self, sportKey, eventId, bookmakers=None):
+    def _getSplit(self, endpoint, params, bookmakers, regions, mergeName):
+        """One request per region (or per 10 bookmakers), run concurrently and merged by event id"""
+        if bookmakers and len(bookmakers.split(',')) <= 10:
+            return self._make_request(endpoint, dict(params, bookmakers=bookmakers)).json()
+        if not bookmakers and (regions or os.getenv('ODDS_REGIONS', 'us')) == 'us':
+            return self._make_request(endpoint, dict(params, regions='us')).json()
+
+        apiLibPath()
+        from lib import regions as regionLib
+        if bookmakers:
+            parts = [{'bookmakers': chunk} for chunk in regionLib.split_bookmakers(bookmakers)]
+        else:
+            parts = [{'regions': region} for region in regionLib.parse_regions(regions)]
+        with ThreadPoolExecutor(max_workers=len(parts)) as pool:
+            futures = [pool.submit(lambda part: self._make_request(endpoint, dict(params, **part)).json(), part)
+                       for part in parts]
+        # A failed region is left out of the merge unless every region failed
+        payloads, error = [], None
+        for part, future in zip(parts, futures):
+            try:
+                payloads.append(future.result())
+            except APIKeysExhaustedException:
+                raise
+            except Exception as e:
+                error = error or e
+                if self.verbose:
+                    print(f"[Regions] Skipped {next(iter(part.values()))}: {e}")
+        if not payloads:
+            raise error
+        return getattr(regionLib, mergeName)(payloads)
+
+    def getEventOdds(self, sportKey, eventId, bookmakers=None, markets=None, regions=None):
         endpoint = f'{self.baseURL}sports/{sportKey}/events/{eventId}/odds'
         params = {
-            'markets': '',
+            'markets': markets or getPropMarkets(sportKey),
             'oddsFormat': 'american'
         }
-        if bookmakers:
-            params['bookmakers'] = bookmakers
-        else:
-            params['regions'] = 'us'
-        if sportKey == 'americanfootball_nfl' or sportKey == 'americanfootball_ncaaf' or sportKey == 'americanfootball_cfl':
-            params['markets'] = americanFootballMarkets
-        elif sportKey == 'basketball_nba' or sportKey == 'basketball_ncaab' or sportKey == 'basketball_wbna':
-            params['markets'] = basketballMarkets
-        elif sportKey == 'baseball_mlb':
-            params['markets'] = baseballMarkets
-        elif sportKey == 'icehockey_nhl':
-            params['markets'] = iceHockeyMarkets
-        elif sportKey == 'aussierules_afl':
-            params['markets'] = aussieRulesMarkets
-        elif sportKey == 'soccer_epl' or sportKey == 'soccer_france_ligue_one' or sportKey == 'soccer_germany_bundesliga' or sportKey == 'soccer_italy_serie_a' or sportKey == 'soccer_spain_la_liga' or sportKey == 'soccer_usa_mls':
-            params['markets'] = soccerMarkets
-
-        response = self._make_request(endpoint, params)
-        return response.json()
+        return self._getSplit(endpoint, params, bookmakers, regions, 'merge_event')
 
     def getSports(self):
         endpoint = f'{self.baseURL}sports/'
@@ -156,7 +323,7 @@ class APIClient:
     def getSportsOdds(
         self,
         sport_key: str,
-        regions: str = 'us',
+        regions: str = None,
         markets: str = 'h2h,spreads,totals',
         odds_format: str = 'american',
         bookmakers: str = None
@@ -166,15 +333,192 @@ class APIClient:
             'markets': markets,
             'oddsFormat': odds_format
         }
-        if bookmakers:
-            params['bookmakers'] = bookmakers
-        else:
-            params['regions'] = regions
-        response = self._make_request(endpoint, params)
-        return response.json()
+        return self._getSplit(endpoint, params, bookmakers, regions, 'merge_events')
+
+
+class PlannerClient:
+    """The CLI client behind the web API client's interface, for api/lib/planner.py
+
+    Payloads come back as {'data', 'remaining'}. With a checkpoint, saved
+    payloads are served from it and new ones are recorded to it.
+    """
+    # The CLI has no single-flight layer; the planner reads this counter
+    coalesced_calls = 0
+
+    def __init__(self, client, checkpoint=None):
+        self.client = client
+        self.checkpoint = checkpoint
+        self.restored = 0
+
+    @property
+    def remaining_credits(self):
+        return self.client.remaining_credits
+
+    def _fetch(self, key, fetch):
+        # Every key is (kind, sport_key, ...)
+        if self.checkpoint is not None:
+            saved = self.checkpoint.payload(key[1], key)
+            if saved is not None:
+                self.restored += 1
+                return {'data': saved, 'remaining': self.client.remaining_credits}
+        data = fetch()
+        if self.checkpoint is not None:
+            self.checkpoint.recordPayload(key[1], key, data)
+        return {'data': data, 'remaining': self.client.remaining_credits}
+
+    def get_sports_odds(self, sport_key, bookmakers=None, markets='h2h,spreads,totals'):
+        return self._fetch(('odds', sport_key, bookmakers, markets),
+                           lambda: self.client.getSportsOdds(sport_key=sport_key, bookmakers=bookmakers, markets=markets))
+
+    def get_events(self, sport_key):
+        return self._fetch(('events', sport_key), lambda: self.client.getEvents(sportKey=sport_key))
+
+    def get_event_odds(self, sport_key, event_id, bookmakers=None):
+        return self._fetch(('event_odds', sport_key, event_id, bookmakers),
+                           lambda: self.client.getEventOdds(sportKey=sport_key, eventId=event_id, bookmakers=bookmakers))
+
+
+class RequestPlanner:
+    """The web API's per-scan RequestPlanner (api/lib/planner.py) behind the CLI client's interface
+
+    Identical calls are made once per scan, event lists are derived from the
+    bulk odds response for the sport instead of calling the events endpoint,
+    and with SUPERSET_FETCH (on by default) a subset of the supported
+    bookmakers is filtered from one fetch of them all, cached for
+    ODDS_CACHE_SECONDS.
+    """
+
+    def __init__(self, client, checkpoint=None):
+        apiLibPath()
+        from lib import planner
+        self.client = PlannerClient(client, checkpoint)
+        self.planner = planner.RequestPlanner(self.client)
+
+    @property
+    def remaining_credits(self):
+        return self.planner.remaining_credits
+
+    def getSportsOdds(self, sport_key, bookmakers=None, markets='h2h,spreads,totals'):
+        return self.planner.get_sports_odds(sport_key, bookmakers, markets)['data']
+
+    def getEvents(self, sportKey):
+        return self.planner.get_events(sportKey)['data']
+
+    def getEventOdds(self, sportKey, eventId, bookmakers=None):
+        return self.planner.get_event_odds(sportKey, eventId, bookmakers)['data']
+
+    def summary(self):
+        stats = self.planner.stats()
+        # Payloads read back from the checkpoint reached the planner as calls
+        saved_calls = dict(stats['saved_by_reason'])
+        if self.client.restored:
+            saved_calls['checkpoint'] = self.client.restored
+        upstream = stats['upstream'] - self.client.restored
+        reasons = ', '.join(f"{reason}: {count}" for reason, count in sorted(saved_calls.items()))
+        return f"{upstream} upstream, {sum(saved_calls.values())} saved" + (f" ({reasons})" if reasons else '')
+
+
+class ScanCheckpoint:
+    """Gzipped JSON record of a scan in progress, so an interrupted scan can resume
+
+    Per sport it holds the opportunities found and, until the sport is
+    finished, every payload fetched for it. Finished sports drop their
+    payloads to keep the file small. Saved at most every `interval` seconds
+    while fetching, whenever a sport finishes, and when the scan stops.
+    """
+    VERSION = 1
+
+    def __init__(self, path, resume=False, max_age=None, interval=None):
+        self.path = path
+        self.resume = resume
+        # Longer than the odds cache on purpose: a resume usually comes minutes
+        # later, and refetching everything would spend the credits it saves
+        self.max_age = max_age if max_age is not None else float(os.getenv('ARB_CHECKPOINT_MAX_AGE', 1800))
+        self.interval = interval if interval is not None else float(os.getenv('ARB_CHECKPOINT_SECONDS', 15))
+        self.bookmakers = None
+        self.sports = {}
+        self._lastSaved = time.monotonic()
+
+    def open(self, bookmakers):
+        """Start a checkpoint for these bookmakers, taking over the previous one when resuming"""
+        self.bookmakers = bookmakers
+        self.sports = {}
+        if not self.resume:
+            return
+        try:
+            with gzip.open(self.path, 'rt', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            print("[Checkpoint] Nothing to resume; starting a full scan.")
+            return
+        if data.get('version') != self.VERSION or data.get('bookmakers') != bookmakers:
+            print("[Checkpoint] Saved scan used other bookmakers; starting a full scan.")
+            return
+        self.sports = data['sports']
+        done = sum(1 for sport_key in self.sports if self.completed(sport_key) is not None)
+        payloads = sum(len(sport['payloads']) for sport in self.sports.values())
+        print(f"[Checkpoint] Resuming: {done} sport(s) done, {payloads} fetched payload(s) saved")
+
+    def _fresh(self, stamp):
+        return time.time() - stamp <= self.max_age
+
+    def completed(self, sport_key):
+        """Opportunities of a sport finished within max_age, or None if it must be scanned"""
+        sport = self.sports.get(sport_key)
+        if sport and sport['done'] and self._fresh(sport['updated']):
+            return sport['opportunities']
+        return None
+
+    def payload(self, sport_key, key):
+        """A payload fetched within max_age for this request key, or None"""
+        entry = self.sports.get(sport_key, {}).get('payloads', {}).get(json.dumps(key))
+        if entry and self._fresh(entry['fetched']):
+            return entry['data']
+        return None
+
+    def startSport(self, sport_key):
+        # Payloads of an interrupted run are kept; its partial results are found again from them
+        payloads = self.sports.get(sport_key, {}).get('payloads', {})
+        self.sports[sport_key] = {'done': False, 'updated': time.time(), 'opportunities': [], 'payloads': payloads}
+
+    def recordPayload(self, sport_key, key, data):
+        sport = self.sports.setdefault(sport_key, {'done': False, 'updated': time.time(), 'opportunities': [], 'payloads': {}})
+        sport['payloads'][json.dumps(key)] = {'fetched': time.time(), 'data': data}
+        if time.monotonic() - self._lastSaved >= self.interval:
+            self.save()
+
+    def recordOpportunity(self, sport_key, opportunity):
+        self.sports[sport_key]['opportunities'].append(opportunity)
+
+    def finishSport(self, sport_key):
+        sport = self.sports[sport_key]
+        sport.update(done=True, updated=time.time(), payloads={})
+        self.save()
 
+    def save(self):
+        """Write atomically so an interrupt never leaves a truncated checkpoint"""
+        data = {'version': self.VERSION, 'bookmakers': self.bookmakers, 'sports': self.sports}
+        tmp = f"{self.path}.tmp"
+        with gzip.open(tmp, 'wt', encoding='utf-8', compresslevel=6) as f:
+            json.dump(data, f, separators=(',', ':'))
+        os.replace(tmp, self.path)
+        self._lastSaved = time.monotonic()
 
-def parse_and_filter_event_time(commence_time_iso: str, minutes_buffer: int = 10):
+
+@lru_cache(maxsize=4096)
+def _parseCommenceTime(commence_time_iso):
+    """Parse an ISO 8601 start time once; the same events recur across stages"""
+    # Normalize ISO 8601 format (handle both 'Z' and explicit +00:00)
+    normalized = commence_time_iso.replace('Z', '+00:00')
+
+    # Parse UTC timestamp and convert to local system timezone
+    local_time = datetime.fromisoformat(normalized).astimezone()
+
+    # Format time: "2025-12-01 07:30 PM"
+    return local_time, local_time.strftime("%Y-%m-%d %I:%M %p")
+
+
+def parse_and_filter_event_time(commence_time_iso: str, minutes_buffer: int = 10, now: datetime = None):
     """
     Parse ISO 8601 datetime string and determine if event is still valid for betting.
 
@@ -185,6 +529,7 @@ def parse_and_filter_event_time(commence_time_iso: str, minutes_buffer: int = 10
     Args:
         commence_time_iso: ISO 8601 formatted datetime from API (e.g., "2025-12-01T19:30:00Z")
         minutes_buffer: Minutes to exclude before game start (default 10 minutes)
+        now: Shared clock for a batch of events (defaults to the current time)
 
     Returns:
         Tuple of (is_valid: bool, formatted_time: str)
@@ -196,25 +541,16 @@ def parse_and_filter_event_time(commence_time_iso: str, minutes_buffer: int = 10
         if not commence_time_iso:
             return False, "Time unavailable"
 
-        # Normalize ISO 8601 format (handle both 'Z' and explicit +00:00)
-        normalized = commence_time_iso.replace('Z', '+00:00')
-
-        # Parse UTC timestamp
-        utc_time = datetime.fromisoformat(normalized)
-
-        # Convert to local system timezone
-        local_time = utc_time.astimezone()
+        local_time, formatted_time = _parseCommenceTime(commence_time_iso)
 
         # Get current time with buffer applied
-        now = datetime.now(timezone.utc).astimezone()
+        if now is None:
+            now = datetime.now(timezone.utc).astimezone()
         buffer_time = now + timedelta(minutes=minutes_buffer)
 
         # Check if event is valid (hasn't started and beyond buffer)
         is_valid = local_time > buffer_time
 
-        # Format time: "2025-12-01 07:30 PM"
-        formatted_time = local_time.strftime("%Y-%m-%d %I:%M %p")
-
         return is_valid, formatted_time
 
     except (ValueError, AttributeError, TypeError) as e:
@@ -222,9 +558,626 @@ def parse_and_filter_event_time(commence_time_iso: str, minutes_buffer: int = 10
         return False, "Time unavailable"
 
 
+class ScanStages:
+    """Counts how many items each scan stage received and kept"""
+    ORDER = ['list', 'time-filter', 'fetch', 'analyze']
+
+    def __init__(self):
+        self.received = {}
+        self.kept = {}
+
+    def record(self, stage, received, kept):
+        self.received[stage] = self.received.get(stage, 0) + received
+        self.kept[stage] = self.kept.get(stage, 0) + kept
+
+    def summary(self):
+        parts = []
+        for stage in self.ORDER:
+            if stage in self.kept:
+                parts.append(f"{stage}: {self.kept[stage]}/{self.received[stage]}")
+        return ' -> '.join(parts)
+
+
+def filterEventsByTime(events, sport_key, now, stages, minutes_buffer=10):
+    """Time-filter stage: keep events that have not started and are beyond the buffer"""
+    kept = []
+    for event in events:
+        is_valid_time, formatted_time = parse_and_filter_event_time(
+            event.get('commence_time'), minutes_buffer, now=now
+        )
+        if not is_valid_time:
+            continue
+        event_info = {
+            'home_team': event.get('home_team'),
+            'away_team': event.get('away_team'),
+            'title': event.get('sport_title') or sport_key,
+            'sport': sport_key,
+            'commence_time': formatted_time
+        }
+        kept.append((event, event_info))
+    stages.record('time-filter', len(events), len(kept))
+    return kept
+
+
+def buildPropsOdds(event_odds_data, prop_markets):
+    """Group player prop prices by market and player line"""
+    odds_dictionary = {m: {} for m in prop_markets}
+
+    for bookmaker in event_odds_data.get('bookmakers', []):
+        for market in bookmaker['markets']:
+            market_key = market['key']
+            for outcome in market['outcomes']:
+
+                if 'description' not in outcome:
+                    break
+                outcome_name = outcome['name']
+                outcome_odds = outcome['price']
+                outcome_description = outcome['description']
+                outcome_point = outcome.get('point', None)
+                bookmaker_name = bookmaker.get('title', bookmaker.get('key', 'Unknown'))
+                player_key = f"{outcome_description}|||{outcome_point}"
+
+                if market_key not in odds_dictionary:
+                    odds_dictionary[market_key] = {}
+                if player_key not in odds_dictionary[market_key]:
+                    odds_dictionary[market_key][player_key] = {}
+
+                odds_dictionary[market_key][player_key][bookmaker_name] = {
+                    'over/under': outcome_name,
+                    'odds': outcome_odds,
+                    'player_name': outcome_description,
+                    'point': outcome_point
+                }
+
+    return odds_dictionary
+
+
+def buildMarketOdds(event):
+    """Group h2h, spreads, totals and outright prices by market and outcome"""
+    oddsDict = {}
+
+    for bookmaker in event['bookmakers']:
+        for market in bookmaker['markets']:
+            market_key = market['key']
+            if market_key not in ('h2h', 'spreads', 'totals', 'outrights'):
+                continue
+            if market_key not in oddsDict:
+                oddsDict[market_key] = {}
+
+            for outcome in market['outcomes']:
+                outcome_name = outcome['name']
+                odds = outcome['price']
+                point = outcome.get('point', None)
+
+                if outcome_name not in oddsDict[market_key]:
+                    oddsDict[market_key][outcome_name] = []
+
+                if point is not None:
+                    oddsDict[market_key][outcome_name].append((bookmaker['title'], odds, point))
+                else:
+                    oddsDict[market_key][outcome_name].append((bookmaker['title'], odds))
+
+    return oddsDict
+
+
+def eventName(event_info):
+    """Outright events have no teams, so they are named after the tournament"""
+    if event_info.get('home_team') and event_info.get('away_team'):
+        return f"{event_info['home_team']} vs {event_info['away_team']}"
+    return event_info.get('title') or event_info['sport']
+
+
+def formatOpportunity(event_info, market, result):
+    opportunities_dict = {}
+    for i, outcome in enumerate(result['outcomes']):
+        opportunities_dict[outcome] = {
+            'bookmaker': result['bookmakers'][i],
+            'odds': result['odds'][i],
+            'bet_percentage': result['bet_percentages'][i],
+            'bet_amount_1000': result['bet_amounts_1000'][i]
+        }
+    return {
+        'event': eventName(event_info),
+        'sport': event_info['sport'],
+        'market': market,
+        'roi': result['roi'],
+        'commence_time': event_info['commence_time'],
+        'opportunities': opportunities_dict
+    }
+
+
+def analyzePropOdds(event_info, odds_dictionary):
+    """Analyze stage for one event's player props"""
+    for market_key, market_data in odds_dictionary.items():
+        for player_key, player_props in market_data.items():
+            result = analyzePlayerPropArbitrage(player_props)
+            if result and result['roi'] > 0:
+                yield formatOpportunity(event_info, f"{market_key} - {result.get('player_name', 'Unknown')}", result)
+
+
+def analyzeMainOdds(event_info, oddsDict):
+    """Analyze stage for one event's h2h, spreads, totals or outrights"""
+    for market_key, market_data in oddsDict.items():
+        result = analyzeMarketArbitrage(market_data, market_key)
+        if result and result['roi'] > 0:
+            yield formatOpportunity(event_info, market_key, result)
+
+
+def scanSport(client, sport_key, bookmaker_api_keys, stages):
+    """
+    Scan one sport as explicit stages, yielding opportunities as they are found.
+
+    list -> time-filter -> fetch -> analyze. Every event is time-filtered
+    against one clock taken at the start of the sport, before any per-event
+    odds are fetched, so no credits are spent on events that would be dropped.
+    The bulk odds call comes first so that, through a RequestPlanner, the
+    props stage can reuse its event list instead of calling the events endpoint.
+    """
+    now = datetime.now(timezone.utc).astimezone()
+    prop_markets = [m for m in getPropMarkets(sport_key).split(',') if m]
+
+    # Main markets: one bulk call already carries every event's odds
+    odds_data = client.getSportsOdds(sport_key=sport_key, bookmakers=bookmaker_api_keys, markets=getMainMarkets(sport_key))
+    stages.record('list', len(odds_data), len(odds_data))
+    for event, event_info in filterEventsByTime(odds_data, sport_key, now, stages):
+        found = list(analyzeMainOdds(event_info, buildMarketOdds(event)))
+        stages.record('analyze', 1, len(found))
+        yield from found
+
+    # Player props: list events, filter, then fetch per-event odds
+    if prop_markets:
+        events = client.getEvents(sportKey=sport_key)
+        stages.record('list', len(events), len(events))
+        for event, event_info in filterEventsByTime(events, sport_key, now, stages):
+            event_odds_data = client.getEventOdds(sportKey=sport_key, eventId=event['id'], bookmakers=bookmaker_api_keys)
+            stages.record('fetch', 1, 1)
+            found = list(analyzePropOdds(event_info, buildPropsOdds(event_odds_data, prop_markets)))
+            stages.record('analyze', 1, len(found))
+            yield from found
+
+
+# Per-process state for sharded scans, set up once by _initScanWorker
+_scan_worker = {}
+
+
+def _initScanWorker(key_slices, bookmaker_api_keys):
+    """Give each worker process its own client, connection pool and API key slice"""
+    client = APIClient(api_keys=key_slices.get(), verbose=False)
+    _scan_worker['planner'] = RequestPlanner(client)
+    _scan_worker['client'] = client
+    _scan_worker['bookmakers'] = bookmaker_api_keys
+
+
+def _scanSportInWorker(sport_key):
+    stages = ScanStages()
+    # Fresh counters per sport so the parent can add each result once
+    _scan_worker['client'].metrics = ScanMetrics()
+    opportunities = []
+    exhausted = False
+    try:
+        for opportunity in scanSport(_scan_worker['planner'], sport_key, _scan_worker['bookmakers'], stages):
+            opportunities.append(opportunity)
+    except APIKeysExhaustedException:
+        exhausted = True
+    return {
+        'sport': sport_key,
+        'opportunities': opportunities,
+        'stages': (stages.received, stages.kept),
+        'credits': _scan_worker['client'].remaining_credits,
+        'metrics': _scan_worker['client'].metrics.snapshot(),
+        'exhausted': exhausted
+    }
+
+
+def scanShardedSports(active_sports, api_keys, bookmaker_api_keys, workers, stages, status, on_opportunity):
+    """
+    Scan sports across a pool of worker processes.
+
+    API keys are split round-robin so every worker rotates through its own
+    slice; there can be no more workers than keys. Each sport's results are
+    streamed back as soon as its worker finishes it.
+    """
+    workers = max(1, min(workers, len(api_keys), len(active_sports)))
+    context = multiprocessing.get_context()
+    key_slices = context.Queue()
+    for i in range(workers):
+        key_slices.put(api_keys[i::workers])
+
+    exhausted_sports = []
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context,
+                             initializer=_initScanWorker,
+                             initargs=(key_slices, bookmaker_api_keys)) as pool:
+        futures = [pool.submit(_scanSportInWorker, sport['key']) for sport in active_sports]
+        for done, future in enumerate(as_completed(futures), 1):
+            result = future.result()
+            for opportunity in result['opportunities']:
+                on_opportunity(opportunity)
+            if status.metrics is not None:
+                status.metrics.merge(result['metrics'])
+            received, kept = result['stages']
+            for stage in kept:
+                stages.record(stage, received[stage], kept[stage])
+            if result['exhausted']:
+                exhausted_sports.append(result['sport'])
+            status.update(credits=result['credits'], sport=f"{done}/{len(futures)} sports ({workers} workers)")
+
+    if exhausted_sports:
+        print(f"\n[!] API keys exhausted before finishing {len(exhausted_sports)} sport(s): {', '.join(exhausted_sports)}")
+
+
+# Distributed scans: a coordinator hands out (sport, event, market-group) leases
+# over HTTP to worker processes on any number of machines
+PROP_MARKET_GROUP_SIZE = 10
+LEASE_SECONDS = float(os.getenv('ARB_LEASE_SECONDS', 60))
+
+
+def propWorkUnits(sport_key, events):
+    """One unit per event per group of prop markets; groups are scanned independently"""
+    markets = [m for m in getPropMarkets(sport_key).split(',') if m]
+    groups = [markets[i:i + PROP_MARKET_GROUP_SIZE] for i in range(0, len(markets), PROP_MARKET_GROUP_SIZE)]
+    return [
+        {'sport': sport_key, 'event': event, 'group': f"props:{i}", 'markets': ','.join(group)}
+        for event in events
+        for i, group in enumerate(groups)
+    ]
+
+
+def scanWorkUnit(client, unit, bookmaker_api_keys):
+    """
+    Scan one leased unit and return its opportunities.
+
+    The main unit of a sport is its bulk odds call; it also returns the
+    time-filtered events so the coordinator can create their prop units.
+    """
+    apiLibPath()
+    from lib.planner import EVENT_FIELDS
+
+    stages = ScanStages()
+    now = datetime.now(timezone.utc).astimezone()
+    sport_key = unit['sport']
+    opportunities = []
+    events = []
+
+    if unit['group'] == 'main':
+        odds_data = client.getSportsOdds(sport_key=sport_key, bookmakers=bookmaker_api_keys, markets=getMainMarkets(sport_key))
+        stages.record('list', len(odds_data), len(odds_data))
+        for event, event_info in filterEventsByTime(odds_data, sport_key, now, stages):
+            found = list(analyzeMainOdds(event_info, buildMarketOdds(event)))
+            stages.record('analyze', 1, len(found))
+            opportunities.extend(found)
+            events.append({field: event[field] for field in EVENT_FIELDS if field in event})
+    else:
+        for event, event_info in filterEventsByTime([unit['event']], sport_key, now, stages):
+            event_odds_data = client.getEventOdds(sportKey=sport_key, eventId=event['id'],
+                                                  bookmakers=bookmaker_api_keys, markets=unit['markets'])
+            stages.record('fetch', 1, 1)
+            found = list(analyzePropOdds(event_info, buildPropsOdds(event_odds_data, unit['markets'].split(','))))
+            stages.record('analyze', 1, len(found))
+            opportunities.extend(found)
+
+    return {'opportunities': opportunities, 'events': events, 'stages': (stages.received, stages.kept)}
+
+
+class ScanCoordinator:
+    """
+    Work queue, lease table and API key pool of a distributed scan.
 
+    Every unit is leased to one worker at a time. A lease that isn't reported
+    back within lease_seconds (the worker died or hung) returns to the queue,
+    and results for a lease that was taken over are dropped, so each unit is
+    counted exactly once. Workers share the key pool, each holding the key with
+    the fewest holders until it is exhausted.
+    """
+    def __init__(self, sports, api_keys, bookmaker_api_keys, stages, status, on_opportunity,
+                 lease_seconds=LEASE_SECONDS, max_attempts=3):
+        self.bookmakers = bookmaker_api_keys
+        self.stages = stages
+        self.status = status
+        self.on_opportunity = on_opportunity
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.lock = threading.Lock()
+        self.finished = threading.Event()
+
+        self.units = {}
+        self.pending = []
+        self.leases = {}
+        self.done = 0
+        self.failed = []
+        self.workers = {}
+        self.key_holders = {key: 0 for key in api_keys}
+        for sport_key in sports:
+            self._add({'sport': sport_key, 'event': None, 'group': 'main', 'markets': getMainMarkets(sport_key)})
+        if not self.units:
+            self.finished.set()
+
+    def _add(self, unit):
+        event_id = unit['event']['id'] if unit['event'] else '*'
+        unit['id'] = f"{unit['sport']}/{event_id}/{unit['group']}"
+        unit['attempts'] = 0
+        self.units[unit['id']] = unit
+        self.pending.append(unit['id'])
+
+    def _assignKey(self, worker):
+        keys = [k for k in self.key_holders if k is not None]
+        if worker.get('key') in self.key_holders:
+            self.key_holders[worker['key']] -= 1
+        worker['key'] = min(keys, key=lambda k: self.key_holders[k]) if keys else None
+        if worker['key'] is not None:
+            self.key_holders[worker['key']] += 1
+        return worker['key']
+
+    def register(self, name):
+        with self.lock:
+            worker_id = f"w{len(self.workers) + 1}"
+            worker = self.workers[worker_id] = {'name': name, 'last_seen': time.time(), 'units': 0}
+            api_key = self._assignKey(worker)
+        return {'worker_id': worker_id, 'api_key': api_key, 'bookmakers': self.bookmakers,
+                'lease_seconds': self.lease_seconds}
+
+    def replaceKey(self, worker_id, exhausted_key):
+        """Retire a key a worker found exhausted and hand it the next one"""
+        with self.lock:
+            if exhausted_key in self.key_holders:
+                del self.key_holders[exhausted_key]
+            worker = self.workers[worker_id]
+            worker['key'] = None
+            api_key = self._assignKey(worker)
+            if api_key is None:
+                print("\n[!] Every API key in the pool is exhausted. Finishing with the results so far...")
+                self.finished.set()
+        return {'api_key': api_key}
+
+    def lease(self, worker_id):
+        with self.lock:
+            self.workers[worker_id]['last_seen'] = time.time()
+            self._reap()
+            if self.finished.is_set():
+                return {'lease': None, 'done': True}
+            if not self.pending:
+                # Everything is leased; idle workers wait in case a lease expires
+                return {'lease': None, 'done': False, 'retry_in': 0.25}
+            unit = self.units[self.pending.pop(0)]
+            unit['attempts'] += 1
+            self.leases[unit['id']] = (worker_id, time.time() + self.lease_seconds)
+            return {'lease': unit, 'done': False}
+
+    def report(self, worker_id, unit_id, result):
+        with self.lock:
+            worker = self.workers[worker_id]
+            worker['last_seen'] = time.time()
+            if self.leases.get(unit_id, (None,))[0] != worker_id:
+                # Lease expired and was reassigned; the new holder's report counts
+                return {'accepted': False}
+            del self.leases[unit_id]
+            unit = self.units[unit_id]
+
+            if result.get('error'):
+                if unit['attempts'] < self.max_attempts:
+                    self.pending.append(unit_id)
+                else:
+                    self.failed.append(f"{unit_id}: {result['error']}")
+            else:
+                self.done += 1
+                worker['units'] += 1
+                for opportunity in result['opportunities']:
+                    self.on_opportunity(opportunity)
+                received, kept = result['stages']
+                for stage in kept:
+                    self.stages.record(stage, received[stage], kept[stage])
+                if unit['group'] == 'main':
+                    for prop_unit in propWorkUnits(unit['sport'], result['events']):
+                        self._add(prop_unit)
+
+            if self.status.metrics is not None and result.get('metrics'):
+                self.status.metrics.merge(result['metrics'])
+            self.status.update(credits=result.get('credits'), sport=self.progress())
+            if not self.pending and not self.leases:
+                self.finished.set()
+        return {'accepted': True}
+
+    def _reap(self):
+        """Requeue leases whose worker missed the deadline"""
+        now = time.time()
+        for unit_id, (worker_id, deadline) in list(self.leases.items()):
+            if deadline >= now:
+                continue
+            del self.leases[unit_id]
+            if self.units[unit_id]['attempts'] < self.max_attempts:
+                self.pending.insert(0, unit_id)
+            else:
+                self.failed.append(f"{unit_id}: lease expired {self.max_attempts} times")
+        if not self.pending and not self.leases and self.units:
+            self.finished.set()
+
+    def reap(self):
+        with self.lock:
+            self._reap()
+
+    def progress(self):
+        alive = sum(1 for w in self.workers.values() if time.time() - w['last_seen'] < self.lease_seconds)
+        return f"{self.done}/{len(self.units)} units ({alive} workers)"
+
+    def snapshot(self):
+        with self.lock:
+            return {
+                'units': len(self.units),
+                'done': self.done,
+                'pending': len(self.pending),
+                'leased': len(self.leases),
+                'failed': list(self.failed),
+                'workers': {wid: {'name': w['name'], 'units': w['units'], 'last_seen': w['last_seen']}
+                            for wid, w in self.workers.items()},
+                'finished': self.finished.is_set()
+            }
+
+
+def isLoopback(host):
+    """True for hosts only this machine can reach"""
+    if host == 'localhost':
+        return True
+    try:
+        return ipaddress.ip_address(host.strip('[]')).is_loopback
+    except ValueError:
+        return False
+
+
+def coordinatorHandler(coordinator, token):
+    """HTTP handler class bound to one coordinator"""
+    from http.server import BaseHTTPRequestHandler
+
+    class Handler(BaseHTTPRequestHandler):
+        def _reply(self, code, payload):
+            body = json.dumps(payload).encode()
+            self.send_response(code)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _authorized(self):
+            if token and not hmac.compare_digest(self.headers.get('X-Coordinator-Token', ''), token):
+                self._reply(401, {'error': 'bad coordinator token'})
+                return False
+            return True
+
+        def do_GET(self):
+            if not self._authorized():
+                return
+            if self.path == '/status':
+                self._reply(200, coordinator.snapshot())
+            else:
+                self._reply(404, {'error': 'not found'})
+
+        def do_POST(self):
+            if not self._authorized():
+                return
+            body = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'{}')
+            try:
+                if self.path == '/register':
+                    self._reply(200, coordinator.register(body.get('name', '?')))
+                elif self.path == '/lease':
+                    self._reply(200, coordinator.lease(body['worker_id']))
+                elif self.path == '/report':
+                    self._reply(200, coordinator.report(body['worker_id'], body['unit_id'], body))
+                elif self.path == '/key':
+                    self._reply(200, coordinator.replaceKey(body['worker_id'], body.get('api_key')))
+                else:
+                    self._reply(404, {'error': 'not found'})
+            except KeyError as e:
+                self._reply(400, {'error': f"unknown or missing {e}"})
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+def scanDistributed(active_sports, api_keys, bookmaker_api_keys, bind, stages, status, on_opportunity):
+    """Serve leases to remote workers until every unit is scanned, merging results as they arrive"""
+    from http.server import ThreadingHTTPServer
+
+    host, _, port = bind.rpartition(':')
+    coordinator = ScanCoordinator([s['key'] for s in active_sports], api_keys, bookmaker_api_keys,
+                                  stages, status, on_opportunity)
+    token = os.getenv('ARB_COORDINATOR_TOKEN')
+    server = ThreadingHTTPServer((host or '0.0.0.0', int(port)), coordinatorHandler(coordinator, token))
+    threading.Thread(target=server.serve_forever, name='coordinator', daemon=True).start()
+    print(f"Coordinator listening on {bind}; start workers with: --worker http://<this-host>:{server.server_address[1]}")
+
+    try:
+        while not coordinator.finished.wait(1.0):
+            coordinator.reap()
+            status.update(sport=coordinator.progress())
+        # Let polling workers see that the scan is done before going away
+        time.sleep(1.0)
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    summary = coordinator.snapshot()
+    per_worker = ', '.join(f"{w['name']}: {w['units']}" for w in summary['workers'].values())
+    print(f"Coordinator: {summary['done']}/{summary['units']} units by {len(summary['workers'])} workers ({per_worker})")
+    if summary['failed']:
+        print(f"[!] {len(summary['failed'])} unit(s) failed, e.g. {summary['failed'][0]}")
+
+
+def runScanWorker(url, threads=1):
+    """Lease units from a coordinator and scan them until it reports the scan is done"""
+    url = url.rstrip('/')
+    token = os.getenv('ARB_COORDINATOR_TOKEN')
+    headers = {'X-Coordinator-Token': token} if token else {}
+    name = f"{__import__('socket').gethostname()}:{os.getpid()}"
+
+    def call(session, path, payload):
+        response = session.post(f"{url}{path}", json=payload, headers=headers, timeout=30)
+        response.raise_for_status()
+        return response.json()
+
+    def loop(index):
+        session = requests.Session()
+        reg = call(session, '/register', {'name': f"{name}/{index}"})
+        worker_id = reg['worker_id']
+        if reg['api_key'] is None:
+            print("[!] The coordinator has no API keys left to hand out.")
+            return 0
+        client = APIClient(api_keys=[reg['api_key']], verbose=False)
+        processed = 0
+
+        while True:
+            try:
+                reply = call(session, '/lease', {'worker_id': worker_id})
+            except requests.exceptions.RequestException:
+                # Coordinator gone: the scan finished or was stopped
+                break
+            if reply['done']:
+                break
+            unit = reply['lease']
+            if unit is None:
+                time.sleep(reply.get('retry_in', 1.0))
+                continue
+
+            client.metrics = ScanMetrics()
+            report = {'worker_id': worker_id, 'unit_id': unit['id']}
+            while True:
+                try:
+                    report.update(scanWorkUnit(client, unit, reg['bookmakers']))
+                except APIKeysExhaustedException:
+                    try:
+                        new_key = call(session, '/key', {'worker_id': worker_id, 'api_key': client.api_keys[0]})['api_key']
+                    except requests.exceptions.RequestException:
+                        new_key = None
+                    if new_key is None:
+                        report['error'] = 'API keys exhausted'
+                    else:
+                        client.api_keys, client.current_key_index = [new_key], 0
+                        continue
+                except Exception as e:
+                    report['error'] = str(e)
+                break
+
+            report.update(credits=client.remaining_credits, metrics=client.metrics.snapshot())
+            try:
+                call(session, '/report', report)
+            except requests.exceptions.RequestException:
+                # Coordinator gone mid-unit; its lease would be requeued anyway
+                break
+            processed += 1
+        return processed
+
+    print(f"Worker {name} scanning for {url} with {threads} thread(s)")
+    pool = [threading.Thread(target=loop, args=(i,), name=f'scan-worker-{i}') for i in range(threads)]
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+    print("Coordinator reports the scan is done.")
+
+
+def promptScanOptions():
+    """Ask for the number of opportunities to show and the bookmakers to compare"""
+    import questionary
 
-def scanAllGames():
     while True:
         numOpps=input('Enter the number of arbitrage opportunities you want to see: ')
         if numOpps.isdigit() and int(numOpps) > 0:
@@ -233,17 +1186,7 @@ def scanAllGames():
             print('Invalid input. Please enter a positive integer.')
     numOpps=int(numOpps)
     
-    bookmakers=[
-        'BetOnline.ag',
-        'BetMGM',
-        'BetRivers',
-        'BetUS',
-        'Bovada',
-        'DraftKings',
-        'FanDuel',
-        'LowVig.ag',
-        'MyBookie.ag'
-    ]
+    bookmakers=list(regionBookmakers())
     
     selection_type = questionary.select(
         'Bookmaker selection:',
@@ -276,188 +1219,132 @@ def scanAllGames():
     for bookie in selected:
         print(f"- {bookie}")
 
+    return numOpps, selected
+
+
+def runScan(selected, workers=1, interactive=True, coordinator=None, checkpoint=None):
+    """Scan every active sport for the selected bookmakers and return all opportunities found
+
+    With coordinator set to HOST:PORT the sports are scanned by remote --worker
+    processes instead of this one. A ScanCheckpoint records the single-process
+    scan as it goes and, when resuming, skips the work it already holds.
+    """
     # Convert display names to API keys for the API call
-    bookmaker_api_keys = ','.join([BOOKMAKER_API_KEYS[b] for b in selected])
+    books = regionBookmakers()
+    bookmaker_api_keys = ','.join([books[b] for b in selected])
 
     # Initialize status display and client
-    load_dotenv()
-    api_keys_str = os.getenv('API_KEYS', '')
-    if api_keys_str:
-        num_keys = len([k.strip() for k in api_keys_str.split(',') if k.strip()])
-    else:
-        num_keys = 1 if os.getenv('API_KEY', '') else 0
-
-    status = StatusDisplay(num_keys)
-    client = APIClient(status_display=status)
+    api_keys = loadAPIKeys()
+    scan_metrics = ScanMetrics()
+    status = StatusDisplay(len(api_keys), metrics=scan_metrics)
+    client = APIClient(status_display=status, api_keys=api_keys, verbose=interactive, metrics=scan_metrics)
     sports = client.getSports()
-    active_sports = [
-        sport for sport in sports
-        if '_winner' not in sport['key'].lower() and sport.get('active', True)
-    ]
+    # *_winner sports are scanned too, as N-way outright markets
+    active_sports = [sport for sport in sports if sport.get('active', True)]
 
     all_opportunities = []
+    stages = ScanStages()
+    if checkpoint is not None and (coordinator or workers > 1):
+        print("[Checkpoint] Only single-process scans are checkpointed.")
+        checkpoint = None
+    if checkpoint is not None:
+        checkpoint.open(bookmaker_api_keys)
+    planner = RequestPlanner(client, checkpoint)
+
+    # Alerts go out in the background as soon as opportunities are found
+    alerter = EmailAlerter()
+    alerts = alerter.start_dispatcher()
 
     print(f"\nScanning {len(active_sports)} active sports...\n")
 
-    with Live(status.render(), refresh_per_second=4, transient=True) as live:
-        status.live = live
-        try:
-            for sport in active_sports:
-                sport_Key = sport['key']
-                status.update(sport=sport_Key)
-                eventsK = client.getEvents(sportKey=sport_Key)
-                for key in eventsK:
-                    event_id=key['id']
-                    event_odds_data = client.getEventOdds(sportKey=sport_Key, eventId=event_id, bookmakers=bookmaker_api_keys)
-                    l=''
-                    if sport_Key=='americanfootball_nfl' or sport_Key=='americanfootball_ncaaf' or sport_Key=='americanfootball_cfl':
-                        l=americanFootballMarkets.split(',')
-                    elif sport_Key=='basketball_nba' or sport_Key=='basketball_ncaab' or sport_Key=='basketball_wbna':
-                        l=basketballMarkets.split(',')
-                    elif sport_Key=='baseball_mlb':
-                        l=baseballMarkets.split(',')
-                    elif sport_Key=='icehockey_nhl':
-                        l=iceHockeyMarkets.split(',')
-                    elif sport_Key=='aussierules_afl':
-                        l=aussieRulesMarkets.split(',')
-                    elif sport_Key=='soccer_epl' or sport_Key=='soccer_france_ligue_one' or sport_Key=='soccer_germany_bundesliga' or sport_Key=='soccer_italy_serie_a' or sport_Key=='soccer_spain_la_liga' or sport_Key=='soccer_usa_mls':
-                        l=soccerMarkets.split(',')
-                    odds_dictionary={ke: {} for ke in l} if l else {}
-                    unpaired_odds_dict={ke: {} for ke in l} if l else {}
-
-                    for bookmaker in event_odds_data.get('bookmakers', []):
-                        for market in bookmaker['markets']:
-                            market_key=market['key']
-                            for outcome in market['outcomes']:
-
-                                if 'description' not in outcome:
-                                    break
-                                outcome_name=outcome['name']
-                                outcome_odds=outcome['price']
-                                outcome_description=outcome['description']
-                                outcome_point=outcome.get('point',None)
-                                bookmaker_name = bookmaker.get('title', bookmaker.get('key', 'Unknown'))
-                                player_key = f"{outcome_description}|||{outcome_point}"
-
-                                if market_key not in odds_dictionary:
-                                    odds_dictionary[market_key] = {}
-                                if player_key not in odds_dictionary[market_key]:
-                                    odds_dictionary[market_key][player_key] = {}
-
-                                odds_dictionary[market_key][player_key][bookmaker_name] = {
-                                    'over/under': outcome_name,
-                                    'odds': outcome_odds,
-                                    'player_name': outcome_description,
-                                    'point': outcome_point
-                                }
-
-                    commense_time_iso=key.get('commence_time',None)
-                    is_valid_time, formatted_time = parse_and_filter_event_time(commense_time_iso)
-                    event_info={
-                        'home_team': key['home_team'],
-                        'away_team': key['away_team'],
-                        'sport': sport_Key,
-                        'commence_time': formatted_time,
-                        'is_valid_time': is_valid_time
-                    }
-                    if not event_info['is_valid_time']:
-                        continue
+    def onOpportunity(opportunity):
+        all_opportunities.append(opportunity)
+        scan_metrics.recordOpportunity(opportunity)
+        alerts.submit(opportunity)
 
-                    for market_key, market_data in odds_dictionary.items():
-                        for player_key, player_props in market_data.items():
-                            result = analyzePlayerPropArbitrage(player_props)
-                            if result and result['roi'] > 0:
-                                opportunities_dict = {}
-                                for i, outcome in enumerate(result['outcomes']):
-                                    opportunities_dict[outcome] = {
-                                        'bookmaker': result['bookmakers'][i],
-                                        'odds': result['odds'][i],
-                                        'bet_percentage': result['bet_percentages'][i],
-                                        'bet_amount_1000': result['bet_amounts_1000'][i]
-                                    }
-                                opportunity = {
-                                    'event': f"{event_info['home_team']} vs {event_info['away_team']}",
-                                    'sport': event_info['sport'],
-                                    'market': f"{market_key} - {result.get('player_name', 'Unknown')}",
-                                    'roi': result['roi'],
-                                    'commence_time': event_info['commence_time'],
-                                    'opportunities': opportunities_dict
-                                }
-                                all_opportunities.append(opportunity)
-
-                odds_data=client.getSportsOdds(sport_key=sport_Key, bookmakers=bookmaker_api_keys)
-                for event in odds_data:
-
-                    oddsDict = {
-                        'h2h': {},
-                        'spreads': {},
-                        'totals': {}
-                    }
+    def onRestored(opportunity):
+        # Alerted by the run that found it
+        all_opportunities.append(opportunity)
+        scan_metrics.recordOpportunity(opportunity)
 
-                    for bookmaker in event['bookmakers']:
-                        for market in bookmaker['markets']:
-                            market_key = market['key']
+    def scan():
+        try:
+            if coordinator:
+                scanDistributed(active_sports, api_keys, bookmaker_api_keys, coordinator, stages, status, onOpportunity)
+            elif workers > 1:
+                scanShardedSports(active_sports, api_keys, bookmaker_api_keys, workers, stages, status, onOpportunity)
+            else:
+                for sport in active_sports:
+                    sport_Key = sport['key']
+                    status.update(sport=sport_Key)
+                    if checkpoint is not None:
+                        completed = checkpoint.completed(sport_Key)
+                        if completed is not None:
+                            for opportunity in completed:
+                                onRestored(opportunity)
+                            continue
+                        checkpoint.startSport(sport_Key)
+                    for opportunity in scanSport(planner, sport_Key, bookmaker_api_keys, stages):
+                        onOpportunity(opportunity)
+                        if checkpoint is not None:
+                            checkpoint.recordOpportunity(sport_Key, opportunity)
+                    if checkpoint is not None:
+                        checkpoint.finishSport(sport_Key)
 
-                            for outcome in market['outcomes']:
-                                outcome_name = outcome['name']
-                                odds = outcome['price']
+        except APIKeysExhaustedException:
+            print(f"\n[!] API keys exhausted. Stopping scan and showing results found so far...")
+            if checkpoint is not None:
+                print(f"[Checkpoint] Progress saved to {checkpoint.path}; run again with --resume to continue.")
+        finally:
+            if checkpoint is not None:
+                checkpoint.save()
+
+    if interactive:
+        from rich.live import Live
+        with Live(status.render(), refresh_per_second=4, transient=True) as live:
+            status.live = live
+            scan()
+    else:
+        scan()
 
-                                point = outcome.get('point', None)
+    print(f"Stages (kept/received): {stages.summary()}")
+    if workers <= 1 and not coordinator:
+        print(f"Requests: {planner.summary()}")
+    print(f"Metrics: {scan_metrics.summary()}")
 
-                                if market_key in oddsDict:
-                                    if outcome_name not in oddsDict[market_key]:
-                                        oddsDict[market_key][outcome_name] = []
+    # Flush any alerts still waiting in the batch window
+    alerts.close()
 
-                                    if point is not None:
-                                        oddsDict[market_key][outcome_name].append((bookmaker['title'], odds, point))
-                                    else:
-                                        oddsDict[market_key][outcome_name].append((bookmaker['title'], odds))
+    all_opportunities.sort(key=lambda x: x['roi'], reverse=True)
+    return all_opportunities
 
-                    # Extract commence_time from API response
-                    commence_time_iso = event.get('commence_time', None)
 
-                    # Parse, filter, and format the time
-                    is_valid_time, formatted_time = parse_and_filter_event_time(commence_time_iso)
+def profiledScan(profile_path, selected, workers=1, interactive=True, coordinator=None, checkpoint=None):
+    """Run runScan under the sampling profiler and write folded stacks to profile_path"""
+    # The profiler lives with the web API's shared modules
+    apiLibPath()
+    from lib.profiler import SamplingProfiler
 
-                    event_info = {
-                        'home_team': event['home_team'],
-                        'away_team': event['away_team'],
-                        'sport': sport_Key,
-                        'commence_time': formatted_time,
-                        'is_valid_time': is_valid_time
-                    }
+    if workers > 1:
+        print("[Profile] Only this process is sampled; worker processes are not profiled.")
+    with SamplingProfiler() as profiler:
+        all_opportunities = runScan(selected, workers, interactive, coordinator, checkpoint)
+    profiler.write_folded(profile_path)
 
-                    # Skip events that don't meet time filtering criteria
-                    if not event_info['is_valid_time']:
-                        continue
+    summary = profiler.summary()
+    stages = ', '.join(f"{stage} {info['percent']}%" for stage, info in summary['stages'].items() if info['samples'])
+    print(f"[Profile] {summary['samples']} samples over {summary['wall_seconds']:.1f}s: {stages}")
+    print(f"[Profile] Folded stacks written to {profile_path} (flamegraph.pl or speedscope)")
+    return all_opportunities
 
-                    for market_key, market_data in oddsDict.items():
-                        result = analyzeMarketArbitrage(market_data, market_key)
-
-                        if result and result['roi'] > 0:
-                            opportunities_dict = {}
-                            for i, outcome in enumerate(result['outcomes']):
-                                opportunities_dict[outcome] = {
-                                    'bookmaker': result['bookmakers'][i],
-                                    'odds': result['odds'][i],
-                                    'bet_percentage': result['bet_percentages'][i],
-                                    'bet_amount_1000': result['bet_amounts_1000'][i]
-                                }
-
-                            opportunity = {
-                                'event': f"{event_info['home_team']} vs {event_info['away_team']}",
-                                'sport': event_info['sport'],
-                                'market': market_key,
-                                'roi': result['roi'],
-                                'commence_time': event_info['commence_time'],
-                                'opportunities': opportunities_dict
-                            }
-                            all_opportunities.append(opportunity)
 
-        except APIKeysExhaustedException:
-            print(f"\n[!] API keys exhausted. Stopping scan and showing results found so far...")
+def scanAllGames(workers=1, profile_path=None, coordinator=None, checkpoint=None):
+    numOpps, selected = promptScanOptions()
+    if profile_path:
+        all_opportunities = profiledScan(profile_path, selected, workers, coordinator=coordinator, checkpoint=checkpoint)
+    else:
+        all_opportunities = runScan(selected, workers, coordinator=coordinator, checkpoint=checkpoint)
 
-    all_opportunities.sort(key=lambda x: x['roi'], reverse=True)
     if numOpps > len(all_opportunities):
         print(f"Only {len(all_opportunities)} opportunities found. Showing all available.")
         numOpps = len(all_opportunities)
@@ -482,12 +1369,54 @@ def scanAllGames():
             print(f"  {outcome}: {details['odds']} at {details['bookmaker']} | Bet: {details['bet_percentage']:.2f}% (${details['bet_amount_1000']:.2f})")
         print(f"{'-'*70}\n")
 
-    # Send email alert for high-ROI opportunities
-    alerter = EmailAlerter()
-    alerter.send_alert(all_opportunities)
-
     return top_3
 
+
+def parseBookmakers(value):
+    """Turn a comma-separated list of bookmaker names or API keys into display names"""
+    books = regionBookmakers()
+    if not value or value.strip().lower() == 'all':
+        return list(books)
+    by_key = {v: k for k, v in books.items()}
+    by_name = {k.lower(): k for k in books}
+    selected = []
+    for item in value.split(','):
+        item = item.strip()
+        name = by_key.get(item.lower()) or by_name.get(item.lower())
+        if name is None:
+            raise ValueError(f"Unknown bookmaker: {item}")
+        if name not in selected:
+            selected.append(name)
+    if len(selected) < 2:
+        raise ValueError('Select at least 2 bookmakers.')
+    return selected
+
+
+def runBatch(selected, top=0, output='-', workers=1, profile_path=None, coordinator=None, checkpoint=None):
+    """Scan without prompts or the live display and write opportunities as JSON lines"""
+    import contextlib
+
+    to_stdout = output in (None, '', '-')
+
+    # Progress and summaries go to stderr so stdout carries only results
+    with contextlib.redirect_stdout(sys.stderr):
+        if profile_path:
+            all_opportunities = profiledScan(profile_path, selected, workers, interactive=False,
+                                             coordinator=coordinator, checkpoint=checkpoint)
+        else:
+            all_opportunities = runScan(selected, workers, interactive=False, coordinator=coordinator,
+                                        checkpoint=checkpoint)
+
+    results = all_opportunities[:top] if top else all_opportunities
+    out = sys.stdout if to_stdout else open(output, 'w')
+    try:
+        for opp in results:
+            out.write(json.dumps(opp) + '\n')
+    finally:
+        if not to_stdout:
+            out.close()
+    return results
+
 def analyzePlayerPropArbitrage(player_props):
     if not player_props:
         return None
@@ -528,7 +1457,21 @@ def analyzePlayerPropArbitrage(player_props):
 
 
 
+def fullFieldOdds(market_data):
+    """Only the bookmakers pricing every runner; a partial field would show false arbs"""
+    runners = [runner for runner, odds_list in market_data.items() if odds_list]
+    books = None
+    for runner in runners:
+        quoted = {item[0] for item in market_data[runner]}
+        books = quoted if books is None else books & quoted
+    if not books:
+        return {}
+    return {runner: [item for item in market_data[runner] if item[0] in books] for runner in runners}
+
+
 def analyzeMarketArbitrage(market_data, market_key):
+    if market_key == 'outrights':
+        market_data = fullFieldOdds(market_data)
     if not market_data or len(market_data) < 2:
         return None
 
@@ -625,7 +1568,7 @@ def findBestArbitrageForEvent(oddsDict, event_info):
         }
 
     return {
-        'event': f"{event_info['home_team']} vs {event_info['away_team']}",
+        'event': eventName(event_info),
         'sport': event_info['sport'],
         'market': best_market,
         'roi': best_roi,
@@ -644,16 +1587,21 @@ def testEvents():
          
 
 class ArbitrageAgent():
-    def findArbitrage(odds1,odds2,odds3=None):
-        def american_to_decimal(american_odds):
+    def findArbitrage(*odds):
+        """Arbitrage for any number of outcomes (2-way, 3-way or outrights) in one pass"""
+        implied=[]
+        inverse_sum=0.0
+        for american_odds in odds:
+            if american_odds is None:
+                continue
             if american_odds > 0:
-                return (american_odds / 100) + 1
+                probability=100 / (american_odds + 100)
             else:
-                return (100 / abs(american_odds)) + 1
-        decimal_odds=[american_to_decimal(odds) for odds in [odds1,odds2,odds3] if odds is not None]
-        inverse_sum=sum(1/odds for odds in decimal_odds)
+                probability=-american_odds / (100 - american_odds)
+            implied.append(probability)
+            inverse_sum+=probability
         roi=(1 - inverse_sum) * 100
-        bet_percentages=[(1/odds) / inverse_sum * 100 for odds in decimal_odds]
+        bet_percentages=[p / inverse_sum * 100 for p in implied]
         bet_amounts_1000=[pct * 10 for pct in bet_percentages]
         return {
             'roi': roi,
@@ -662,6 +1610,261 @@ class ArbitrageAgent():
         }
 
 
+class SMTPSink:
+    """Email sink that keeps one SMTP connection open across alert batches"""
+    def __init__(self, host, port, user, password, from_addr, to_addr, use_tls=True):
+        self.host = host
+        self.port = port
+        self.user = user
+        self.password = password
+        self.from_addr = from_addr
+        self.to_addr = to_addr
+        self.use_tls = use_tls
+        self._server = None
+
+    def _connect(self):
+        import smtplib
+        server = smtplib.SMTP(self.host, self.port, timeout=30)
+        server.ehlo()
+        if self.use_tls:
+            server.starttls()
+            server.ehlo()
+        # Local SMTP stand-ins usually advertise no AUTH; skip login there
+        if self.user and self.password and server.has_extn('auth'):
+            server.login(self.user, self.password)
+        return server
+
+    def _connection(self):
+        """Reuse the open connection if the server still answers NOOP"""
+        import smtplib
+        if self._server is not None:
+            try:
+                if self._server.noop()[0] == 250:
+                    return self._server
+            except (smtplib.SMTPException, OSError):
+                pass
+            self._server = None
+        self._server = self._connect()
+        return self._server
+
+    def send(self, subject, body, opportunities):
+        import smtplib
+        from email.mime.text import MIMEText
+        from email.mime.multipart import MIMEMultipart
+        msg = MIMEMultipart()
+        msg['From'] = self.from_addr
+        msg['To'] = self.to_addr
+        msg['Subject'] = subject
+        msg.attach(MIMEText(body, 'plain'))
+        try:
+            self._connection().send_message(msg)
+        except (smtplib.SMTPServerDisconnected, OSError):
+            # Connection dropped between NOOP and send; retry once on a fresh one
+            self._server = None
+            self._connection().send_message(msg)
+
+    def close(self):
+        import smtplib
+        if self._server is not None:
+            try:
+                self._server.quit()
+            except (smtplib.SMTPException, OSError):
+                pass
+            self._server = None
+
+    def __str__(self):
+        return f"email ({self.to_addr})"
+
+
+class WebhookSink:
+    """Webhook sink that POSTs alert batches as JSON"""
+    def __init__(self, url):
+        self.url = url
+        self.session = requests.Session()
+
+    def send(self, subject, body, opportunities):
+        payload = {
+            'subject': subject,
+            'text': f"{subject}\n\n{body}",
+            'opportunities': opportunities
+        }
+        response = self.session.post(self.url, json=payload, timeout=10)
+        response.raise_for_status()
+
+    def close(self):
+        self.session.close()
+
+    def __str__(self):
+        return f"webhook ({self.url})"
+
+
+class AlertIndex:
+    """Persistent fingerprint index of alerted opportunities with TTL eviction
+
+    Entries are kept in an OrderedDict ordered by when they were last alerted,
+    so expired entries are always at the front and eviction, lookup and insert
+    are all O(1) amortized.
+    """
+    def __init__(self, path, ttl=6 * 3600, roi_delta=0.5):
+        self.path = path
+        self.ttl = ttl
+        self.roi_delta = roi_delta
+        self.entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._load()
+
+    def fingerprint(self, opp):
+        """Hash event, market, outcomes and bookmakers
+
+        Odds are left out: a better price is the same opportunity with a higher
+        ROI, which the index value tracks for the roi_delta re-alert.
+        """
+        legs = sorted(
+            f"{outcome}@{details['bookmaker']}"
+            for outcome, details in opp['opportunities'].items()
+        )
+        raw = '|'.join([opp['sport'], opp['event'], opp['commence_time'], opp['market']] + legs)
+        return hashlib.sha1(raw.encode('utf-8')).hexdigest()[:20]
+
+    def should_alert(self, opp):
+        """True if the opportunity is new or its ROI improved by more than roi_delta"""
+        with self._lock:
+            self._evict(time.time())
+            previous = self.entries.get(self.fingerprint(opp))
+        return previous is None or opp['roi'] - previous[0] > self.roi_delta
+
+    def record(self, opp):
+        fp = self.fingerprint(opp)
+        with self._lock:
+            self.entries[fp] = (opp['roi'], time.time())
+            self.entries.move_to_end(fp)
+
+    def _evict(self, now):
+        while self.entries:
+            fp, (_, alerted_at) = next(iter(self.entries.items()))
+            if now - alerted_at < self.ttl:
+                break
+            self.entries.popitem(last=False)
+
+    def _load(self):
+        try:
+            with open(self.path) as f:
+                rows = json.load(f)
+        except (OSError, ValueError):
+            return
+        for fp, roi, alerted_at in sorted(rows, key=lambda r: r[2]):
+            self.entries[fp] = (roi, alerted_at)
+        self._evict(time.time())
+
+    def save(self):
+        with self._lock:
+            self._evict(time.time())
+            rows = [[fp, roi, alerted_at] for fp, (roi, alerted_at) in self.entries.items()]
+        tmp_path = f"{self.path}.tmp"
+        try:
+            with open(tmp_path, 'w') as f:
+                json.dump(rows, f, separators=(',', ':'))
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f"[Alert] Could not save alert index: {e}")
+
+
+class AlertDispatcher:
+    """Background queue that batches alerts and delivers them to every sink"""
+    _STOP = object()
+
+    def __init__(self, sinks, min_roi, formatter, batch_window=5.0, index=None):
+        self.sinks = sinks
+        self.min_roi = min_roi
+        self.formatter = formatter
+        self.batch_window = batch_window
+        self.index = index
+        self.sent = 0
+        self.suppressed = 0
+        self._queue = queue.Queue()
+        self._thread = None
+        if self.sinks:
+            self._thread = threading.Thread(target=self._run, name='alert-dispatcher', daemon=True)
+            self._thread.start()
+
+    def submit(self, opportunity):
+        """Queue an opportunity for alerting if it clears the ROI threshold"""
+        if self._thread is None or opportunity['roi'] < self.min_roi:
+            return
+        self._queue.put(opportunity)
+
+    def close(self, timeout=30):
+        """Flush pending alerts, close sink connections and stop the worker"""
+        if self._thread is None:
+            return
+        self._queue.put(self._STOP)
+        self._thread.join(timeout)
+        self._thread = None
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            item = self._queue.get()
+            if item is self._STOP:
+                break
+
+            # Collect everything else that arrives within the batch window
+            batch = [item]
+            deadline = time.monotonic() + self.batch_window
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is self._STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+
+            self._deliver(batch)
+
+        for sink in self.sinks:
+            sink.close()
+
+    def _deliver(self, batch):
+        if self.index is not None:
+            # Keep only the best ROI seen for each fingerprint within the batch,
+            # then check the index now rather than at submit time so an
+            # opportunity alerted by the previous batch isn't sent again
+            best = {}
+            for opp in batch:
+                fp = self.index.fingerprint(opp)
+                if fp not in best or opp['roi'] > best[fp]['roi']:
+                    best[fp] = opp
+            batch = [opp for opp in best.values() if self.index.should_alert(opp)]
+            self.suppressed += len(best) - len(batch)
+            if not batch:
+                return
+
+        batch.sort(key=lambda x: x['roi'], reverse=True)
+        noun = 'Opportunity' if len(batch) == 1 else 'Opportunities'
+        subject = f"Arbitrage Alert: {len(batch)} {noun} Found!"
+        body = self.formatter(batch)
+        delivered = False
+        for sink in self.sinks:
+            try:
+                sink.send(subject, body, batch)
+                delivered = True
+                print(f"[Alert] Sent {len(batch)} opportunities via {sink}")
+            except Exception as e:
+                print(f"[Alert] Failed to send via {sink}: {e}")
+        self.sent += len(batch)
+
+        # Only remember opportunities that actually reached someone
+        if delivered and self.index is not None:
+            for opp in batch:
+                self.index.record(opp)
+            self.index.save()
+
+
 class EmailAlerter:
     def __init__(self):
         load_dotenv()
@@ -669,37 +1872,49 @@ class EmailAlerter:
         self.smtp_port = int(os.getenv('SMTP_PORT', 587))
         self.smtp_user = os.getenv('SMTP_USER')
         self.smtp_password = os.getenv('SMTP_PASSWORD')
+        self.smtp_starttls = os.getenv('SMTP_STARTTLS', 'true').lower() not in ('0', 'false', 'no')
         self.alert_email = os.getenv('ALERT_EMAIL')
+        self.smtp_from = os.getenv('SMTP_FROM') or self.smtp_user or self.alert_email
         self.min_roi = float(os.getenv('MIN_ROI_ALERT', 1.0))
-        self.enabled = all([self.smtp_user, self.smtp_password, self.alert_email])
+        self.batch_window = float(os.getenv('ALERT_BATCH_SECONDS', 5.0))
+        self.webhook_urls = [u.strip() for u in os.getenv('ALERT_WEBHOOK_URL', '').split(',') if u.strip()]
+        self.index_path = os.getenv('ALERT_INDEX_PATH', '.alert_index.json')
+        self.dedup_ttl = float(os.getenv('ALERT_DEDUP_TTL', 6 * 3600))
+        self.roi_delta = float(os.getenv('ALERT_ROI_DELTA', 0.5))
+        # Without SMTP_USER the server is used without authentication (local stand-ins)
+        self.enabled = bool(self.alert_email) and (not self.smtp_user or bool(self.smtp_password))
+
+    def _sinks(self):
+        sinks = []
+        if self.enabled:
+            sinks.append(SMTPSink(
+                self.smtp_host, self.smtp_port, self.smtp_user, self.smtp_password,
+                self.smtp_from, self.alert_email, use_tls=self.smtp_starttls
+            ))
+        sinks.extend(WebhookSink(url) for url in self.webhook_urls)
+        return sinks
+
+    def start_dispatcher(self):
+        """Start a background dispatcher that alerts as opportunities are found"""
+        sinks = self._sinks()
+        index = None
+        if not sinks:
+            print("[Email] Alerts disabled (set ALERT_EMAIL, and SMTP_PASSWORD with SMTP_USER)")
+        elif self.index_path:
+            index = AlertIndex(self.index_path, ttl=self.dedup_ttl, roi_delta=self.roi_delta)
+        return AlertDispatcher(sinks, self.min_roi, self._format_opportunities, self.batch_window, index=index)
 
     def send_alert(self, opportunities):
-        """Send email alert for high-ROI opportunities"""
-        if not self.enabled:
-            print("[Email] Alerts disabled (missing SMTP credentials)")
-            return
-
+        """Send alerts for high-ROI opportunities and wait for delivery"""
         high_roi = [o for o in opportunities if o['roi'] >= self.min_roi]
         if not high_roi:
             print(f"[Email] No opportunities above {self.min_roi}% ROI threshold")
             return
 
-        body = self._format_opportunities(high_roi)
-
-        msg = MIMEMultipart()
-        msg['From'] = self.smtp_user
-        msg['To'] = self.alert_email
-        msg['Subject'] = f"Arbitrage Alert: {len(high_roi)} Opportunities Found!"
-        msg.attach(MIMEText(body, 'plain'))
-
-        try:
-            with smtplib.SMTP(self.smtp_host, self.smtp_port) as server:
-                server.starttls()
-                server.login(self.smtp_user, self.smtp_password)
-                server.send_message(msg)
-            print(f"[Email] Alert sent for {len(high_roi)} opportunities")
-        except Exception as e:
-            print(f"[Email] Failed to send alert: {e}")
+        dispatcher = self.start_dispatcher()
+        for opp in high_roi:
+            dispatcher.submit(opp)
+        dispatcher.close()
 
     def _format_opportunities(self, opportunities):
         """Format opportunities as readable text"""
@@ -718,5 +1933,56 @@ class EmailAlerter:
 
 
 if __name__ == "__main__":
-    scanAllGames()
+    # Before the parser, so .env values become the option defaults
+    load_dotenv()
+    parser = argparse.ArgumentParser(description='Scan sportsbooks for arbitrage opportunities.')
+    parser.add_argument('--workers', type=int, default=int(os.getenv('SCAN_WORKERS', 1)),
+                        help='worker processes to shard sports across (each needs its own API key)')
+    parser.add_argument('--batch', action='store_true', default=os.getenv('ARB_BATCH', '').lower() in ('1', 'true', 'yes'),
+                        help='run without prompts or the live display and write JSON lines (also ARB_BATCH=1)')
+    parser.add_argument('--top', type=int, default=int(os.getenv('ARB_TOP', 0)),
+                        help='batch mode: number of opportunities to write, 0 for all (ARB_TOP)')
+    parser.add_argument('--bookmakers', default=os.getenv('ARB_BOOKMAKERS', 'all'),
+                        help='batch mode: comma-separated bookmaker names or API keys, or "all" (ARB_BOOKMAKERS)')
+    parser.add_argument('--output', default=os.getenv('ARB_OUTPUT', '-'),
+                        help='batch mode: JSON lines file to write, "-" for stdout (ARB_OUTPUT)')
+    parser.add_argument('--profile', metavar='PATH', default=os.getenv('ARB_PROFILE'),
+                        help='sample the scan with a low-overhead profiler and write folded stacks to PATH')
+    parser.add_argument('--transport', choices=('live', 'record', 'replay'), default=os.getenv('ODDS_TRANSPORT', 'live'),
+                        help='record upstream responses to a corpus, or replay one offline without credits (ODDS_TRANSPORT)')
+    parser.add_argument('--corpus', metavar='DIR', default=os.getenv('ODDS_CORPUS', 'odds_corpus'),
+                        help='record/replay corpus directory (ODDS_CORPUS)')
+    parser.add_argument('--coordinator', metavar='HOST:PORT', default=os.getenv('ARB_COORDINATOR'),
+                        help='serve the scan to remote --worker processes instead of scanning here (ARB_COORDINATOR)')
+    parser.add_argument('--worker', metavar='URL', default=os.getenv('ARB_WORKER'),
+                        help='scan units leased from the coordinator at URL; --workers sets threads (ARB_WORKER)')
+    parser.add_argument('--regions', default=os.getenv('ODDS_REGIONS', 'us'),
+                        help='comma-separated regions whose bookmakers are offered: us, us2, uk, eu, au (ODDS_REGIONS)')
+    parser.add_argument('--checkpoint', metavar='PATH', default=os.getenv('ARB_CHECKPOINT', 'scan_checkpoint.json.gz'),
+                        help='where scan progress is checkpointed, "" to disable (ARB_CHECKPOINT)')
+    parser.add_argument('--resume', action='store_true',
+                        help='continue from the checkpoint, reusing sports and payloads saved within '
+                             'ARB_CHECKPOINT_MAX_AGE seconds (default 1800); their odds may be that old')
+    args = parser.parse_args()
+    # Through the environment so worker processes use the same transport
+    os.environ['ODDS_TRANSPORT'] = args.transport
+    os.environ['ODDS_CORPUS'] = args.corpus
+    os.environ['ODDS_REGIONS'] = args.regions
+    if (args.coordinator and not os.getenv('ARB_COORDINATOR_TOKEN')
+            and not isLoopback(args.coordinator.rpartition(':')[0])):
+        # Anyone who can reach the coordinator could register and take an API key
+        parser.error('--coordinator hands out API keys: set ARB_COORDINATOR_TOKEN or bind to 127.0.0.1')
+    checkpoint = ScanCheckpoint(args.checkpoint, resume=args.resume) if args.checkpoint else None
+    if args.worker:
+        runScanWorker(args.worker, threads=max(1, args.workers))
+    elif args.batch:
+        try:
+            selected = parseBookmakers(args.bookmakers)
+        except ValueError as e:
+            parser.error(str(e))
+        runBatch(selected, top=args.top, output=args.output, workers=args.workers, profile_path=args.profile,
+                 coordinator=args.coordinator, checkpoint=checkpoint)
+    else:
+        scanAllGames(workers=args.workers, profile_path=args.profile, coordinator=args.coordinator,
+                     checkpoint=checkpoint)
     #testEvents()
\ No newline at end of file
@@ -0,0 +1,65 @@
+"""Replay recorded odds snapshots through the arbitrage analyzers.
+
+Usage:
+    python backtest.py CORPUS_OR_SNAPSHOT_DIR [--workers 8] [--thresholds 0,1,2,5] [--buffers 0,5,10,15,30]
+
+Reads a corpus recorded with --transport record (ODDS_TRANSPORT=record), or a
+folder of snapshot files; see api/lib/backtest.py for both formats.
+"""
+
+import argparse
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'api'))
+
+from lib.backtest import DEFAULT_BUFFERS, DEFAULT_ROI_THRESHOLDS, run_backtest  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Replay recorded odds snapshots and report arbitrage statistics.')
+    parser.add_argument('directory', help='corpus recorded with --transport record (one time slice per day), '
+                                          'or a folder of *.jsonl or *.jsonl.gz snapshot files, one slice per file')
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help='parallel worker processes')
+    parser.add_argument('--thresholds', default=','.join(str(t) for t in DEFAULT_ROI_THRESHOLDS),
+                        help='ROI percentages to count arbitrage episodes above')
+    parser.add_argument('--buffers', default=','.join(str(b) for b in DEFAULT_BUFFERS),
+                        help='minutes_buffer values to sweep')
+    parser.add_argument('--json', action='store_true', help='print the full summary as JSON')
+    args = parser.parse_args()
+
+    summary = run_backtest(
+        args.directory,
+        workers=args.workers,
+        roi_thresholds=[float(t) for t in args.thresholds.split(',')],
+        buffers=[int(b) for b in args.buffers.split(',')]
+    )
+
+    if args.json:
+        print(json.dumps(summary, indent=2))
+        return
+
+    print(f"Replayed {summary['snapshots']:,} snapshots from {summary['slices']} time slice(s) "
+          f"in {summary['wall_seconds']:.1f}s")
+    print(f"Throughput: {summary['snapshots_per_second']:,.0f} snapshots/s "
+          f"({summary['speedup_vs_realtime']:,.0f}x real time)")
+    print(f"Unchanged events reused: {summary['reused_analyses']:,}")
+
+    print(f"\nArbitrage episodes: {summary['episodes']:,}")
+    thresholds = args.thresholds.split(',')
+    print('Day         ' + ''.join(f"{'>' + t + '%':>10}" for t in thresholds))
+    for day, counts in summary['per_day'].items():
+        print(f"{day}  " + ''.join(f"{count:>10}" for count in counts.values()))
+
+    survival = summary['survival_seconds']
+    if survival['median'] is not None:
+        print(f"\nSurvival: median {survival['median']:.0f}s | p90 {survival['p90']:.0f}s | max {survival['max']:.0f}s")
+
+    print('\nminutes_buffer sweep (episodes still actionable):')
+    for buffer, count in summary['buffer_sweep'].items():
+        print(f"  {buffer:>4} min: {count}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,153 @@
+"""Benchmark the no-vig +EV pass against the arbitrage analysis it runs beside.
+
+Usage:
+    python benchmarks/bench_ev.py [--events 10,50,200] [--books 8] [--request-ms 250]
+
+'cpu' compares against the CPU side of a scan alone (odds dicts and arbitrage
+analysis for main markets and props). 'scan' adds the upstream calls a real
+scan makes, one bulk odds request plus one event odds request per event, at
+--request-ms each.
+
+On CPU the pass is not cheap. Collecting the prices costs one half to two
+thirds of the arbitrage analysis; evaluating them adds about a third more
+with numpy (+cpu 70-115% in total) and two to three times the analysis in
+pure Python (+cpu 160-350%). It is a few percent of a scan only because the
+upstream requests dominate.
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'api'))
+
+from lib import ev  # noqa: E402
+from lib.arbitrage import analyze_market_arbitrage, analyze_player_prop_arbitrage  # noqa: E402
+from lib.markets import BASKETBALL_MARKETS, BOOKMAKER_API_KEYS  # noqa: E402
+from lib.scanner import build_market_odds, build_props_odds, event_info_for  # noqa: E402
+
+# Bookmaker margin and price disagreement around the true probability
+VIG = 0.045
+SPREAD = 0.02
+
+
+def priced(rng, probability):
+    """American odds of a probability plus one bookmaker's margin and noise, in steps of 5."""
+    p = min(max(probability * (1 + VIG) + rng.gauss(0, SPREAD), 0.02), 0.98)
+    odds = -100 * p / (1 - p) if p >= 0.5 else 100 * (1 - p) / p
+    return int(round(odds / 5) * 5) or 100
+
+
+def two_way(rng, probability):
+    return priced(rng, probability), priced(rng, 1 - probability)
+
+
+def synthetic_events(count, books, players=12, seed=7):
+    """Bulk odds events and their event odds payloads, shaped like the upstream API."""
+    rng = random.Random(seed)
+    titles = list(BOOKMAKER_API_KEYS)[:books]
+    prop_markets = BASKETBALL_MARKETS.split(',')
+    events = []
+    for i in range(count):
+        home, away = f"Home {i}", f"Away {i}"
+        total = rng.randrange(200, 240) + 0.5
+        spread = rng.randrange(1, 12) + 0.5
+        home_win = rng.uniform(0.2, 0.8)
+        prop_lines = {(market, p): rng.uniform(0.4, 0.6) for market in prop_markets for p in range(players)}
+        bulk_books, prop_books = [], []
+        for title in titles:
+            h2h, spreads, totals = two_way(rng, home_win), two_way(rng, 0.5), two_way(rng, 0.5)
+            bulk_books.append({'key': title.lower(), 'title': title, 'markets': [
+                {'key': 'h2h', 'outcomes': [{'name': home, 'price': h2h[0]}, {'name': away, 'price': h2h[1]}]},
+                {'key': 'spreads', 'outcomes': [{'name': home, 'price': spreads[0], 'point': -spread},
+                                                {'name': away, 'price': spreads[1], 'point': spread}]},
+                {'key': 'totals', 'outcomes': [{'name': 'Over', 'price': totals[0], 'point': total},
+                                               {'name': 'Under', 'price': totals[1], 'point': total}]},
+            ]})
+            markets = []
+            for market in prop_markets:
+                outcomes = []
+                for p in range(players):
+                    point = (p % 25) + 0.5
+                    for side, price in zip(('Over', 'Under'), two_way(rng, prop_lines[(market, p)])):
+                        outcomes.append({'name': side, 'description': f"Player {i}-{p}",
+                                         'price': price, 'point': point})
+                markets.append({'key': market, 'outcomes': outcomes})
+            prop_books.append({'key': title.lower(), 'title': title, 'markets': markets})
+        event = {'id': f"e{i}", 'home_team': home, 'away_team': away, 'commence_time': '2030-01-01T00:00:00Z'}
+        events.append((dict(event, bookmakers=bulk_books), {'id': event['id'], 'bookmakers': prop_books}))
+    return events, prop_markets
+
+
+def arbitrage_pass(events, market_list):
+    for event, event_odds in events:
+        for market_key, market_data in build_market_odds(event).items():
+            analyze_market_arbitrage(market_data, market_key)
+        for market_data in build_props_odds(event_odds, market_list).values():
+            for player_props in market_data.values():
+                analyze_player_prop_arbitrage(player_props)
+
+
+def collect(events, market_list, infos, odds_dicts):
+    # A scan builds the main market odds dicts once for both passes
+    batch = ev.EVBatch()
+    for (event, event_odds), info, odds_dict in zip(events, infos, odds_dicts):
+        batch.add_markets(info, odds_dict)
+        batch.add_props(info, event_odds, market_list)
+    return batch
+
+
+def timed(fn, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def bench(count, books, repeat, request_ms):
+    events, market_list = synthetic_events(count, books)
+    infos = [event_info_for(event, 'basketball_nba', '01/01 12:00 AM') for event, _ in events]
+
+    odds_dicts = [build_market_odds(event) for event, _ in events]
+
+    base_seconds, _ = timed(lambda: arbitrage_pass(events, market_list), repeat)
+    collect_seconds, batch = timed(lambda: collect(events, market_list, infos, odds_dicts), repeat)
+
+    scan_seconds = base_seconds + (1 + count) * request_ms / 1000
+    rows = []
+    numpy = ev.np
+    for name, module in [('numpy', numpy), ('python', None)]:
+        if name == 'numpy' and numpy is None:
+            continue
+        ev.np = module
+        eval_seconds, bets = timed(batch.evaluate, repeat)
+        added = collect_seconds + eval_seconds
+        rows.append([name, len(batch), base_seconds * 1000, collect_seconds * 1000, eval_seconds * 1000,
+                     added / base_seconds * 100, added / scan_seconds * 100, len(bets)])
+    ev.np = numpy
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--events', default='10,50,200')
+    parser.add_argument('--books', type=int, default=8)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--request-ms', type=float, default=250)
+    args = parser.parse_args()
+
+    print(f"numpy: {'yes' if ev.np is not None else 'no'} | {args.books} bookmakers")
+    print(f"{'events':>7}{'backend':>9}{'prices':>9}{'arb ms':>9}{'collect ms':>12}{'eval ms':>9}"
+          f"{'+cpu':>7}{'+scan':>7}{'+EV bets':>10}")
+    for count in [int(s) for s in args.events.split(',')]:
+        for row in bench(count, args.books, args.repeat, args.request_ms):
+            print(f"{count:>7}{row[0]:>9}{row[1]:>9,}{row[2]:>9.2f}{row[3]:>12.2f}{row[4]:>9.2f}"
+                  f"{row[5]:>6.0f}%{row[6]:>6.1f}%{row[7]:>10,}")
+
+
+if __name__ == '__main__':
+    main()
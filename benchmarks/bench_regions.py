@@ -0,0 +1,98 @@
+"""Benchmark multi-region fetching: sequential vs concurrent calls and the merged payload size.
+
+Usage:
+    python benchmarks/bench_regions.py [--events 40] [--books 8] [--request-ms 250]
+
+Each region returns the same events, each with its own bookmakers, after
+--request-ms of simulated latency. 'sequential' fetches the regions one by
+one; 'concurrent' is what APIClient.get_sports_odds does. 'merged KiB' is the
+memory held by the merged payload, measured on a separate call so tracing
+doesn't slow the timed one.
+
+The merged payload grows linearly with the regions because every region
+adds its own bookmakers' prices; 'B/book' (bytes per bookmaker entry) stays
+flat. Events are stored once and bookmaker entries are shared with the
+parsed responses rather than copied, so there is no per-region overhead to
+remove short of dropping prices the analyzers need.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+import requests
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'api'))
+
+from lib.api_client import APIClient  # noqa: E402
+from lib.markets import REGIONS  # noqa: E402
+
+
+def region_payload(region, events, books):
+    return [{
+        'id': f"e{i}", 'sport_key': 'basketball_nba', 'home_team': f"Home {i}", 'away_team': f"Away {i}",
+        'commence_time': f"2030-01-01T{i % 24:02d}:00:00Z",
+        'bookmakers': [{'key': f"{region}{b}", 'title': f"{region} {b}", 'markets': [
+            {'key': 'h2h', 'outcomes': [{'name': f"Home {i}", 'price': -110}, {'name': f"Away {i}", 'price': 100}]}
+        ]} for b in range(books)]
+    } for i in range(events)]
+
+
+def fake_session(events, books, request_ms):
+    bodies = {region: json.dumps(region_payload(region, events, books)).encode() for region in REGIONS}
+
+    def get(url, params=None, timeout=None, **kwargs):
+        time.sleep(request_ms / 1000)
+        response = requests.Response()
+        response.status_code = 200
+        response._content = bodies[params['regions']]
+        response.headers['x-requests-remaining'] = '500'
+        return response
+
+    session = requests.Session()
+    session.get = get
+    return session
+
+
+def bench(count, events, books, request_ms):
+    client = APIClient(api_key='bench')
+    client.session = fake_session(events, books, request_ms)
+    regions = ','.join(REGIONS[:count])
+
+    start = time.perf_counter()
+    for region in REGIONS[:count]:
+        client.get_sports_odds('basketball_nba', regions=region)
+    sequential = time.perf_counter() - start
+
+    start = time.perf_counter()
+    client.get_sports_odds('basketball_nba', regions=regions)
+    concurrent = time.perf_counter() - start
+
+    tracemalloc.start()
+    merged = client.get_sports_odds('basketball_nba', regions=regions)['data']
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    return sequential, concurrent, size, len(merged), sum(len(e['bookmakers']) for e in merged)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--events', type=int, default=40)
+    parser.add_argument('--books', type=int, default=8)
+    parser.add_argument('--request-ms', type=float, default=250)
+    args = parser.parse_args()
+
+    print(f"{'regions':>8}{'sequential ms':>15}{'concurrent ms':>15}{'merged KiB':>12}{'events':>8}{'books':>7}"
+          f"{'B/book':>8}")
+    for count in range(1, len(REGIONS) + 1):
+        sequential, concurrent, size, events, books = bench(count, args.events, args.books, args.request_ms)
+        print(f"{count:>8}{sequential * 1000:>15.0f}{concurrent * 1000:>15.0f}{size / 1024:>12.0f}"
+              f"{events:>8}{books:>7}{size / books:>8.0f}")
+
+
+if __name__ == '__main__':
+    main()
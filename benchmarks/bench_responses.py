@@ -0,0 +1,105 @@
+"""Benchmark /api/scan response encoding: serialization time and bytes on the wire.
+
+Usage:
+    python benchmarks/bench_responses.py [--sizes 100,1000,10000]
+"""
+
+import argparse
+import gzip
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'api'))
+
+from lib import responses  # noqa: E402
+from lib.markets import BOOKMAKER_API_KEYS, BASKETBALL_MARKETS  # noqa: E402
+
+
+def synthetic_opportunities(count, seed=7):
+    """Formatted opportunities shaped like real /api/scan output."""
+    rng = random.Random(seed)
+    books = list(BOOKMAKER_API_KEYS)
+    props = BASKETBALL_MARKETS.split(',')
+    teams = [f"Team {i}" for i in range(30)]
+    opportunities = []
+    for i in range(count):
+        home, away = rng.sample(teams, 2)
+        if rng.random() < 0.7:
+            market = f"{rng.choice(props)} - Player {rng.randrange(300)}"
+            point = rng.randrange(5, 40) + 0.5
+            outcomes = [f"Over {point}", f"Under {point}"]
+        else:
+            market = rng.choice(['h2h', 'spreads', 'totals'])
+            outcomes = [home, away]
+        pct = round(rng.uniform(40, 60), 2)
+        opportunities.append({
+            'event': f"{home} vs {away}",
+            'sport': 'basketball_nba',
+            'market': market,
+            'roi': round(rng.uniform(0.01, 5), 2),
+            'commence_time': f"2025-12-{1 + i % 28:02d} 07:30 PM",
+            'bets': [
+                {'outcome': outcome, 'bookmaker': rng.choice(books), 'odds': rng.choice([-120, -110, 100, 105, 115]),
+                 'bet_percentage': p, 'bet_amount_100': p}
+                for outcome, p in zip(outcomes, [pct, round(100 - pct, 2)])
+            ]
+        })
+    return opportunities
+
+
+def timed(fn, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def bench(count, repeat):
+    opportunities = synthetic_opportunities(count)
+    payload = {'opportunities': opportunities, 'total_found': count}
+
+    # Flask's default provider in production: compact separators, sorted keys, ASCII
+    baseline = lambda: json.dumps(payload, separators=(',', ':'), sort_keys=True).encode('ascii')
+    fast = lambda: responses.dumps(payload)
+    compact = lambda: responses.dumps({'opportunities': responses.compact_opportunities(opportunities),
+                                       'total_found': count})
+
+    rows = []
+    for name, fn in [('jsonify-equivalent', baseline), ('fast encoder', fast), ('compact shape', compact)]:
+        seconds, body = timed(fn, repeat)
+        gz_seconds, gz = timed(lambda: gzip.compress(body, compresslevel=5), repeat)
+        row = [name, seconds * 1000, len(body), len(gz), gz_seconds * 1000]
+        if responses.brotli is not None:
+            br_seconds, br = timed(lambda: responses.brotli.compress(body, quality=5), repeat)
+            row += [len(br), br_seconds * 1000]
+        rows.append(row)
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', default='100,1000,10000')
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"orjson: {'yes' if responses.orjson else 'no'} | brotli: {'yes' if responses.brotli else 'no'}")
+    for count in [int(s) for s in args.sizes.split(',')]:
+        print(f"\n{count} opportunities")
+        header = f"{'shape':<20}{'encode ms':>10}{'raw B':>11}{'gzip B':>10}{'gzip ms':>9}"
+        if responses.brotli is not None:
+            header += f"{'br B':>10}{'br ms':>8}"
+        print(header)
+        for row in bench(count, args.repeat):
+            line = f"{row[0]:<20}{row[1]:>10.2f}{row[2]:>11,}{row[3]:>10,}{row[4]:>9.2f}"
+            if len(row) > 5:
+                line += f"{row[5]:>10,}{row[6]:>8.2f}"
+            print(line)
+
+
+if __name__ == '__main__':
+    main()
@@ -11,6 +11,7 @@ import { Card, CardContent, CardHeader, CardTitle } from '@/components/ui/card';
 import { useSports } from '@/hooks/useSports';
 import { useBookmakers } from '@/hooks/useBookmakers';
 import { useScan } from '@/hooks/useScan';
+import { useLiveFeed } from '@/hooks/useLiveFeed';
 import { Search, Zap } from 'lucide-react';
 
 export default function Home() {
@@ -19,13 +20,17 @@ export default function Home() {
   const {
     opportunities,
     isScanning,
+    isLoadingMore,
+    hasMore,
     progress,
     currentSport,
     error,
     totalFound,
     remainingCredits,
+    skipped,
     scanSingleSport,
     scanMultipleSports,
+    loadMore,
     clearResults,
   } = useScan();
 
@@ -35,6 +40,11 @@ export default function Home() {
     'fanduel',
   ]);
   const [includeProps, setIncludeProps] = useState(true);
+  const [liveUpdates, setLiveUpdates] = useState(false);
+
+  // The live feed follows one sport; "all" keeps using one-off scans
+  const liveSport = liveUpdates && selectedSport && selectedSport !== 'all' ? selectedSport : null;
+  const live = useLiveFeed(liveSport, selectedBookmakers);
 
   const handleToggleBookmaker = useCallback((key: string) => {
     setSelectedBookmakers((prev) =>
@@ -71,7 +81,7 @@ export default function Home() {
   ]);
 
   const canScan = selectedSport && selectedBookmakers.length >= 2 && !isScanning;
-  const displayCredits = remainingCredits || sportsCredits;
+  const displayCredits = (liveSport && live.remainingCredits) || remainingCredits || sportsCredits;
 
   return (
     <div className="min-h-screen flex flex-col">
@@ -109,9 +119,19 @@ export default function Home() {
                     />
                     <span className="text-sm">Include player props</span>
                   </label>
+                  <label className="flex items-center gap-2 cursor-pointer">
+                    <input
+                      type="checkbox"
+                      checked={liveUpdates}
+                      onChange={(e) => setLiveUpdates(e.target.checked)}
+                      className="h-4 w-4 rounded border-gray-300"
+                    />
+                    <span className="text-sm">Live updates</span>
+                  </label>
                 </div>
                 <p className="text-xs text-muted-foreground">
-                  Player props use more API credits but find more opportunities
+                  Player props use more API credits but find more opportunities.
+                  Live updates follow the selected sport from the server&apos;s shared feed.
                 </p>
               </div>
             </div>
@@ -153,15 +173,40 @@ export default function Home() {
           isScanning={isScanning}
         />
 
+        {skipped.length > 0 && (
+          <p className="text-sm text-muted-foreground">
+            Skipped while upstream is failing: {skipped.join(', ')}
+          </p>
+        )}
+
         {/* Results Section */}
         <div>
-          <h2 className="text-xl font-semibold mb-4">Arbitrage Opportunities</h2>
-          <OpportunityList
-            opportunities={opportunities}
-            isLoading={isScanning && opportunities.length === 0}
-            error={error}
-            totalFound={totalFound}
-          />
+          <h2 className="text-xl font-semibold mb-4">
+            Arbitrage Opportunities
+            {liveSport && (
+              <span className="ml-3 text-sm font-normal text-muted-foreground">
+                {live.isConnected ? `Live, update ${live.version}` : 'Connecting...'}
+              </span>
+            )}
+          </h2>
+          {liveSport ? (
+            <OpportunityList
+              opportunities={live.opportunities}
+              isLoading={!live.error && live.version === 0}
+              error={live.error}
+              totalFound={live.opportunities.length}
+            />
+          ) : (
+            <OpportunityList
+              opportunities={opportunities}
+              isLoading={isScanning && opportunities.length === 0}
+              error={error}
+              totalFound={totalFound}
+              hasMore={hasMore && !isScanning}
+              isLoadingMore={isLoadingMore}
+              onLoadMore={loadMore}
+            />
+          )}
         </div>
       </main>
 
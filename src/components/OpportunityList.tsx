@@ -2,6 +2,7 @@
 
 import { OpportunityCard } from './OpportunityCard';
 import { Skeleton } from '@/components/ui/skeleton';
+import { Button } from '@/components/ui/button';
 import { TrendingUp, AlertCircle } from 'lucide-react';
 import type { Opportunity } from '@/lib/types';
 
@@ -10,6 +11,9 @@ interface OpportunityListProps {
   isLoading?: boolean;
   error?: string | null;
   totalFound?: number;
+  hasMore?: boolean;
+  isLoadingMore?: boolean;
+  onLoadMore?: () => void;
 }
 
 export function OpportunityList({
@@ -17,6 +21,9 @@ export function OpportunityList({
   isLoading,
   error,
   totalFound,
+  hasMore,
+  isLoadingMore,
+  onLoadMore,
 }: OpportunityListProps) {
   if (error) {
     return (
@@ -71,6 +78,13 @@ export function OpportunityList({
       {opportunities.map((opp, index) => (
         <OpportunityCard key={`${opp.event}-${opp.market}-${index}`} opportunity={opp} rank={index + 1} />
       ))}
+      {hasMore && onLoadMore && (
+        <div className="flex justify-center">
+          <Button variant="outline" onClick={onLoadMore} disabled={isLoadingMore}>
+            {isLoadingMore ? 'Loading...' : 'Load more'}
+          </Button>
+        </div>
+      )}
     </div>
   );
 }
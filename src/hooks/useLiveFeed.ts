@@ -0,0 +1,84 @@
+"use client";
+
+import { useEffect, useState } from 'react';
+import type { FeedDelta, FeedOpportunity, FeedSnapshot } from '@/lib/types';
+
+interface UseLiveFeedResult {
+  opportunities: FeedOpportunity[];
+  isConnected: boolean;
+  version: number;
+  error: string | null;
+  remainingCredits: string | null;
+}
+
+const sortByRoi = (opps: Iterable<FeedOpportunity>) => [...opps].sort((a, b) => b.roi - a.roi);
+
+// Subscribe to /api/feed; the server sends one snapshot, then only what changed.
+// EventSource reconnects on its own and resumes from the last event id.
+// The feed is scanned server-side for configured sports; bookmakers only filters it.
+export function useLiveFeed(sportKey: string | null, bookmakers: string[]): UseLiveFeedResult {
+  const [opportunities, setOpportunities] = useState<FeedOpportunity[]>([]);
+  const [isConnected, setIsConnected] = useState(false);
+  const [version, setVersion] = useState(0);
+  const [error, setError] = useState<string | null>(null);
+  const [remainingCredits, setRemainingCredits] = useState<string | null>(null);
+  const bookmakerKey = bookmakers.join(',');
+
+  useEffect(() => {
+    if (!sportKey || bookmakers.length < 2) return;
+
+    const params = new URLSearchParams({
+      sport_key: sportKey,
+      bookmakers: bookmakerKey,
+    });
+    const source = new EventSource(`/api/feed?${params.toString()}`);
+    let current = new Map<string, FeedOpportunity>();
+
+    source.onopen = () => setIsConnected(true);
+    source.onerror = () => {
+      setIsConnected(false);
+      // A refused stream (e.g. 404 for a sport nobody publishes) is not retried
+      if (source.readyState === EventSource.CLOSED) {
+        setError('No live feed is published for this sport');
+      }
+    };
+
+    source.addEventListener('snapshot', (event) => {
+      const snapshot: FeedSnapshot = JSON.parse((event as MessageEvent).data);
+      current = new Map(snapshot.opportunities.map((opp) => [opp.id, opp]));
+      setOpportunities(sortByRoi(current.values()));
+      setVersion(snapshot.version);
+      setRemainingCredits(snapshot.remaining_credits);
+      setError(null);
+    });
+
+    source.addEventListener('delta', (event) => {
+      const delta: FeedDelta = JSON.parse((event as MessageEvent).data);
+      delta.removed.forEach((id) => current.delete(id));
+      [...delta.added, ...delta.changed].forEach((opp) => current.set(opp.id, opp));
+      setOpportunities(sortByRoi(current.values()));
+      setVersion(delta.version);
+      setRemainingCredits(delta.remaining_credits);
+      setError(null);
+    });
+
+    source.addEventListener('error', (event) => {
+      const data = (event as MessageEvent).data;
+      if (data) {
+        setError(JSON.parse(data).error);
+      }
+    });
+
+    return () => {
+      source.close();
+      setIsConnected(false);
+      setOpportunities([]);
+      setVersion(0);
+      setError(null);
+    };
+    // bookmakerKey stands in for the bookmakers array
+    // eslint-disable-next-line react-hooks/exhaustive-deps
+  }, [sportKey, bookmakerKey]);
+
+  return { opportunities, isConnected, version, error, remainingCredits };
+}
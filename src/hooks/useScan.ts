@@ -1,22 +1,33 @@
 "use client";
 
 import { useState, useCallback } from 'react';
-import { scanSport } from '@/lib/api';
+import { UpstreamSkippedError, fetchResults, scanSport } from '@/lib/api';
 import type { Opportunity, Sport } from '@/lib/types';
 
+interface PendingPage {
+  scanId: string;
+  cursor: string;
+}
+
 interface UseScanResult {
   opportunities: Opportunity[];
   isScanning: boolean;
+  isLoadingMore: boolean;
+  hasMore: boolean;
   progress: number;
   currentSport: string;
   error: string | null;
   totalFound: number;
   remainingCredits: string | null;
+  skipped: string[];
   scanSingleSport: (sportKey: string, bookmakers: string[], includeProps?: boolean) => Promise<void>;
   scanMultipleSports: (sports: Sport[], bookmakers: string[], includeProps?: boolean) => Promise<void>;
+  loadMore: () => Promise<void>;
   clearResults: () => void;
 }
 
+const sortByRoi = (opps: Opportunity[]) => [...opps].sort((a, b) => b.roi - a.roi);
+
 export function useScan(): UseScanResult {
   const [opportunities, setOpportunities] = useState<Opportunity[]>([]);
   const [isScanning, setIsScanning] = useState(false);
@@ -25,6 +36,9 @@ export function useScan(): UseScanResult {
   const [error, setError] = useState<string | null>(null);
   const [totalFound, setTotalFound] = useState(0);
   const [remainingCredits, setRemainingCredits] = useState<string | null>(null);
+  const [pendingPages, setPendingPages] = useState<PendingPage[]>([]);
+  const [isLoadingMore, setIsLoadingMore] = useState(false);
+  const [skipped, setSkipped] = useState<string[]>([]);
 
   const scanSingleSport = useCallback(async (
     sportKey: string,
@@ -35,6 +49,7 @@ export function useScan(): UseScanResult {
     setProgress(0);
     setCurrentSport(sportKey);
     setError(null);
+    setSkipped([]);
 
     try {
       const result = await scanSport({
@@ -46,8 +61,15 @@ export function useScan(): UseScanResult {
       setOpportunities(result.opportunities);
       setTotalFound(result.total_found);
       setRemainingCredits(result.remaining_credits);
+      setPendingPages(
+        result.next_cursor ? [{ scanId: result.scan_id, cursor: result.next_cursor }] : []
+      );
+      setSkipped(result.skipped ?? []);
       setProgress(100);
     } catch (err) {
+      if (err instanceof UpstreamSkippedError) {
+        setSkipped(err.skipped);
+      }
       setError(err instanceof Error ? err.message : 'Scan failed');
     } finally {
       setIsScanning(false);
@@ -64,8 +86,12 @@ export function useScan(): UseScanResult {
     setProgress(0);
     setError(null);
     setOpportunities([]);
+    setPendingPages([]);
+    setSkipped([]);
 
     const allOpportunities: Opportunity[] = [];
+    const pages: PendingPage[] = [];
+    const skippedKeys: string[] = [];
     let totalCount = 0;
     let credits = '';
 
@@ -83,43 +109,84 @@ export function useScan(): UseScanResult {
         allOpportunities.push(...result.opportunities);
         totalCount += result.total_found;
         credits = result.remaining_credits;
-
-        // Update progress
-        setProgress(Math.round(((i + 1) / sports.length) * 100));
+        if (result.next_cursor) {
+          pages.push({ scanId: result.scan_id, cursor: result.next_cursor });
+        }
+        skippedKeys.push(...(result.skipped ?? []));
 
         // Update opportunities in real-time
-        const sorted = [...allOpportunities].sort((a, b) => b.roi - a.roi);
-        setOpportunities(sorted);
+        setOpportunities(sortByRoi(allOpportunities));
 
       } catch (err) {
-        console.error(`Failed to scan ${sport.key}:`, err);
+        if (err instanceof UpstreamSkippedError) {
+          // Breaker is open for this sport; the server failed fast
+          skippedKeys.push(...err.skipped);
+        } else {
+          console.error(`Failed to scan ${sport.key}:`, err);
+        }
         // Continue with other sports
       }
+
+      // Update progress
+      setProgress(Math.round(((i + 1) / sports.length) * 100));
+      setSkipped([...skippedKeys]);
     }
 
     setTotalFound(totalCount);
     setRemainingCredits(credits);
+    setPendingPages(pages);
     setIsScanning(false);
     setCurrentSport('');
   }, []);
 
+  // Fetch the next stored page of every scan that has more results; no rescan
+  const loadMore = useCallback(async () => {
+    if (pendingPages.length === 0) return;
+    setIsLoadingMore(true);
+
+    const nextPages: PendingPage[] = [];
+    const more: Opportunity[] = [];
+
+    for (const page of pendingPages) {
+      try {
+        const result = await fetchResults({ scan_id: page.scanId, cursor: page.cursor });
+        more.push(...result.opportunities);
+        if (result.next_cursor) {
+          nextPages.push({ scanId: page.scanId, cursor: result.next_cursor });
+        }
+      } catch (err) {
+        console.error(`Failed to load more results for scan ${page.scanId}:`, err);
+      }
+    }
+
+    setOpportunities((prev) => sortByRoi([...prev, ...more]));
+    setPendingPages(nextPages);
+    setIsLoadingMore(false);
+  }, [pendingPages]);
+
   const clearResults = useCallback(() => {
     setOpportunities([]);
     setTotalFound(0);
     setProgress(0);
     setError(null);
+    setPendingPages([]);
+    setSkipped([]);
   }, []);
 
   return {
     opportunities,
     isScanning,
+    isLoadingMore,
+    hasMore: pendingPages.length > 0,
     progress,
     currentSport,
     error,
     totalFound,
     remainingCredits,
+    skipped,
     scanSingleSport,
     scanMultipleSports,
+    loadMore,
     clearResults,
   };
 }
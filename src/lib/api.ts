@@ -1,12 +1,63 @@
 import type {
+  CompactOpportunities,
+  Opportunity,
   SportsResponse,
   BookmakersResponse,
   ScanResponse,
   ScanRequest,
+  ResultsPage,
+  ResultsQuery,
 } from './types';
 
 const API_BASE = '/api';
 
+// Thrown when the server refuses a scan because the sport's upstream circuit breaker is open
+export class UpstreamSkippedError extends Error {
+  skipped: string[];
+  retryIn: number | null;
+
+  constructor(message: string, skipped: string[], retryIn: number | null) {
+    super(message);
+    this.name = 'UpstreamSkippedError';
+    this.skipped = skipped;
+    this.retryIn = retryIn;
+  }
+}
+
+export function expandOpportunities(compact: CompactOpportunities): Opportunity[] {
+  const { columns } = compact;
+  const opportunities: Opportunity[] = [];
+  for (let i = 0; i < compact.count; i++) {
+    const [outcomes, bookmakerIds, odds, percentages] = columns.bets[i];
+    opportunities.push({
+      event: compact.events[columns.event[i]],
+      sport: compact.sports[columns.sport[i]],
+      market: compact.markets[columns.market[i]],
+      roi: columns.roi[i],
+      commence_time: columns.commence_time[i],
+      bets: outcomes.map((outcome, j) => ({
+        outcome,
+        bookmaker: compact.bookmakers[bookmakerIds[j]],
+        odds: odds[j],
+        bet_percentage: percentages[j],
+        bet_amount_100: percentages[j],
+      })),
+      ...(columns.extra?.[i] ?? {}),
+    });
+  }
+  return opportunities;
+}
+
+function withExpandedOpportunities<T extends { opportunities: Opportunity[] }>(
+  result: Omit<T, 'opportunities'> & { opportunities: Opportunity[] | CompactOpportunities }
+): T {
+  const { opportunities } = result;
+  return {
+    ...result,
+    opportunities: Array.isArray(opportunities) ? opportunities : expandOpportunities(opportunities),
+  } as T;
+}
+
 export async function fetchSports(): Promise<SportsResponse> {
   const response = await fetch(`${API_BASE}/sports`);
   if (!response.ok) {
@@ -16,8 +67,10 @@ export async function fetchSports(): Promise<SportsResponse> {
   return response.json();
 }
 
-export async function fetchBookmakers(): Promise<BookmakersResponse> {
-  const response = await fetch(`${API_BASE}/bookmakers`);
+// regions (us, us2, uk, eu, au) defaults to the server's ODDS_REGIONS
+export async function fetchBookmakers(regions?: string[]): Promise<BookmakersResponse> {
+  const query = regions?.length ? `?regions=${encodeURIComponent(regions.join(','))}` : '';
+  const response = await fetch(`${API_BASE}/bookmakers${query}`);
   if (!response.ok) {
     const error = await response.json();
     throw new Error(error.error || 'Failed to fetch bookmakers');
@@ -31,11 +84,29 @@ export async function scanSport(request: ScanRequest): Promise<ScanResponse> {
     headers: {
       'Content-Type': 'application/json',
     },
-    body: JSON.stringify(request),
+    body: JSON.stringify({ compact: true, ...request }),
   });
   if (!response.ok) {
     const error = await response.json();
+    if (response.status === 503 && error.skipped) {
+      throw new UpstreamSkippedError(error.error, error.skipped, error.retry_in ?? null);
+    }
     throw new Error(error.error || 'Scan failed');
   }
-  return response.json();
+  return withExpandedOpportunities<ScanResponse>(await response.json());
+}
+
+export async function fetchResults(query: ResultsQuery): Promise<ResultsPage> {
+  const params = new URLSearchParams();
+  Object.entries({ compact: true, ...query }).forEach(([key, value]) => {
+    if (value !== undefined && value !== null && value !== '') {
+      params.set(key, String(value));
+    }
+  });
+  const response = await fetch(`${API_BASE}/results?${params.toString()}`);
+  if (!response.ok) {
+    const error = await response.json();
+    throw new Error(error.error || 'Failed to fetch results');
+  }
+  return withExpandedOpportunities<ResultsPage>(await response.json());
 }
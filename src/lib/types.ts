@@ -3,11 +3,13 @@ export interface Sport {
   title: string;
   group: string;
   active: boolean;
+  outrights?: boolean;
 }
 
 export interface Bookmaker {
   key: string;
   name: string;
+  region: string;
 }
 
 export interface Bet {
@@ -36,14 +38,103 @@ export interface BookmakersResponse {
   bookmakers: Bookmaker[];
 }
 
+export interface RequestStats {
+  upstream: number;
+  saved: number;
+  saved_by_reason: Record<string, number>;
+  coalesced?: number;
+}
+
 export interface ScanResponse {
   opportunities: Opportunity[];
   total_found: number;
   remaining_credits: string;
+  // null when no shared store is configured; every opportunity is then in this response
+  scan_id: string | null;
+  next_cursor: string | null;
+  requests?: RequestStats;
+  skipped?: string[];
+  ev_bets?: EVBet[];
+}
+
+// Single bet priced above the bookmakers' no-vig consensus (include_ev)
+export interface EVBet {
+  event: string;
+  sport: string;
+  market: string;
+  commence_time: string;
+  outcome: string;
+  bookmaker: string;
+  odds: number;
+  fair_odds: number;
+  fair_probability: number;
+  ev: number;
+  books: number;
+}
+
+export interface ResultsPage {
+  scan_id: string;
+  opportunities: Opportunity[];
+  next_cursor: string | null;
+  total_found: number;
+  total_matching: number;
+  expires_at: number;
+}
+
+export interface ResultsQuery {
+  compact?: boolean;
+  scan_id: string;
+  cursor?: string;
+  limit?: number;
+  market_type?: string;
+  bookmaker?: string;
+  min_roi?: number;
 }
 
 export interface ScanRequest {
   sport_key: string;
   bookmakers: string[];
   include_props?: boolean;
+  include_ev?: boolean;
+  compact?: boolean;
+}
+
+// Columnar response shape with shared lookup tables (see api/lib/responses.py)
+export interface CompactOpportunities {
+  format: 'compact-v1';
+  count: number;
+  events: string[];
+  sports: string[];
+  markets: string[];
+  bookmakers: string[];
+  columns: {
+    event: number[];
+    sport: number[];
+    market: number[];
+    roi: number[];
+    commence_time: string[];
+    bets: [string[], number[], number[], number[]][];
+    // Fields beyond the ones above (e.g. a feed id), null where there are none
+    extra?: (Record<string, unknown> | null)[];
+  };
+}
+
+// Server-sent events from /api/feed; opportunities carry a stable id across scans
+export interface FeedOpportunity extends Opportunity {
+  id: string;
+}
+
+export interface FeedSnapshot {
+  version: number;
+  opportunities: FeedOpportunity[];
+  remaining_credits: string | null;
+}
+
+export interface FeedDelta {
+  version: number;
+  added: FeedOpportunity[];
+  changed: FeedOpportunity[];
+  removed: string[];
+  total: number;
+  remaining_credits: string | null;
 }
@@ -0,0 +1,154 @@
+"""Alert delivery through a local SMTP stand-in."""
+
+import os
+import socketserver
+import sys
+import threading
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import arbitrageCalculator  # noqa: E402
+
+
+class StandInHandler(socketserver.StreamRequestHandler):
+    """Just enough SMTP to accept messages without TLS or AUTH."""
+
+    def reply(self, line):
+        self.wfile.write(f"{line}\r\n".encode())
+
+    def handle(self):
+        self.reply('220 stand-in ready')
+        data = None
+        for raw in self.rfile:
+            line = raw.decode().rstrip('\r\n')
+            if data is not None:
+                if line == '.':
+                    self.server.messages.append('\n'.join(data))
+                    data = None
+                    self.reply('250 OK')
+                else:
+                    data.append(line)
+                continue
+            command = line.split(' ', 1)[0].upper()
+            if command == 'EHLO':
+                self.reply('250 stand-in')
+            elif command == 'DATA':
+                data = []
+                self.reply('354 End data with <CR><LF>.<CR><LF>')
+            elif command == 'QUIT':
+                self.reply('221 Bye')
+                return
+            else:
+                self.reply('250 OK')
+
+
+@pytest.fixture
+def smtp_server():
+    server = socketserver.ThreadingTCPServer(('127.0.0.1', 0), StandInHandler)
+    server.daemon_threads = True
+    server.messages = []
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def opportunity(roi, event='Away @ Home'):
+    return {
+        'roi': roi, 'event': event, 'sport': 'basketball_nba', 'market': 'h2h',
+        'commence_time': '01/01 07:00 PM',
+        'opportunities': {
+            'Home': {'odds': 150, 'bookmaker': 'FanDuel', 'bet_percentage': 42.0, 'bet_amount_1000': 420.0},
+            'Away': {'odds': -120, 'bookmaker': 'DraftKings', 'bet_percentage': 58.0, 'bet_amount_1000': 580.0},
+        },
+    }
+
+
+def test_alerts_reach_smtp_stand_in_without_credentials(smtp_server, monkeypatch):
+    monkeypatch.setattr(arbitrageCalculator, 'load_dotenv', lambda *args, **kwargs: None)
+    monkeypatch.setenv('SMTP_HOST', '127.0.0.1')
+    monkeypatch.setenv('SMTP_PORT', str(smtp_server.server_address[1]))
+    monkeypatch.setenv('SMTP_STARTTLS', 'false')
+    monkeypatch.delenv('SMTP_USER', raising=False)
+    monkeypatch.delenv('SMTP_PASSWORD', raising=False)
+    monkeypatch.setenv('ALERT_EMAIL', 'alerts@example.com')
+    monkeypatch.setenv('MIN_ROI_ALERT', '1')
+    monkeypatch.setenv('ALERT_BATCH_SECONDS', '0.1')
+    monkeypatch.setenv('ALERT_INDEX_PATH', '')
+    monkeypatch.delenv('ALERT_WEBHOOK_URL', raising=False)
+
+    alerter = arbitrageCalculator.EmailAlerter()
+    assert alerter.enabled
+
+    alerter.send_alert([opportunity(2.5), opportunity(0.5, event='Below @ Threshold')])
+
+    assert len(smtp_server.messages) == 1
+    message = smtp_server.messages[0]
+    assert 'To: alerts@example.com' in message
+    assert 'Away @ Home' in message
+    assert 'Below @ Threshold' not in message
+
+
+def test_login_still_required_when_user_is_set(monkeypatch):
+    monkeypatch.setattr(arbitrageCalculator, 'load_dotenv', lambda *args, **kwargs: None)
+    monkeypatch.setenv('ALERT_EMAIL', 'alerts@example.com')
+    monkeypatch.setenv('SMTP_USER', 'sender@example.com')
+    monkeypatch.delenv('SMTP_PASSWORD', raising=False)
+
+    assert not arbitrageCalculator.EmailAlerter().enabled
+
+
+
+class RecordingSink:
+    def __init__(self):
+        self.batches = []
+        self.sending = threading.Event()
+        self.release = threading.Event()
+        self.release.set()
+
+    def send(self, subject, body, opportunities):
+        self.sending.set()
+        self.release.wait(5)
+        self.batches.append([opp['roi'] for opp in opportunities])
+
+    def close(self):
+        pass
+
+
+def with_odds(opp, home_odds):
+    legs = dict(opp['opportunities'], Home=dict(opp['opportunities']['Home'], odds=home_odds))
+    return dict(opp, opportunities=legs)
+
+
+def test_index_suppresses_repeat_in_next_batch(tmp_path):
+    index = arbitrageCalculator.AlertIndex(str(tmp_path / 'index.json'))
+    sink = RecordingSink()
+    sink.release.clear()
+    dispatcher = arbitrageCalculator.AlertDispatcher([sink], 1.0, lambda batch: '', batch_window=0.05, index=index)
+
+    dispatcher.submit(opportunity(2.0))
+    assert sink.sending.wait(5)
+    # Submitted while the first batch is still being sent, so it lands in the next one
+    dispatcher.submit(opportunity(2.0))
+    sink.release.set()
+    dispatcher.close()
+
+    assert sink.batches == [[2.0]]
+    assert dispatcher.suppressed == 1
+
+
+def test_index_realerts_only_when_roi_improves(tmp_path):
+    index = arbitrageCalculator.AlertIndex(str(tmp_path / 'index.json'), roi_delta=0.5)
+    sink = RecordingSink()
+
+    # A better price on the same legs is the same opportunity with a higher ROI
+    for roi, home_odds in [(2.0, 150), (2.3, 155), (3.1, 170)]:
+        dispatcher = arbitrageCalculator.AlertDispatcher([sink], 1.0, lambda batch: '', batch_window=0.05,
+                                                         index=index)
+        dispatcher.submit(with_odds(opportunity(roi), home_odds))
+        dispatcher.close()
+
+    assert sink.batches == [[2.0], [3.1]]
@@ -0,0 +1,52 @@
+"""Upstream responses the client must not trust."""
+
+import os
+import sys
+
+import pytest
+import requests
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'api'))
+
+from lib.api_client import APIClient, CircuitOpenError, TransientAPIError  # noqa: E402
+from lib.circuit_breaker import CircuitBreakers  # noqa: E402
+from lib.storage import FileStore  # noqa: E402
+
+
+def html_client(tmp_path, bodies):
+    def get(url, params=None, timeout=None, **kwargs):
+        response = requests.Response()
+        response.status_code = 200
+        response._content = bodies.pop(0)
+        response.headers['content-type'] = 'text/html' if response._content.startswith(b'<') else 'application/json'
+        response.headers['x-requests-remaining'] = '500'
+        return response
+
+    client = APIClient(api_key='test')
+    client.session = requests.Session()
+    client.session.get = get
+    client.breakers = CircuitBreakers(failure_threshold=1, reset_timeout=0, store=FileStore(str(tmp_path)))
+    return client
+
+
+def test_non_json_body_is_a_breaker_failure(tmp_path):
+    maintenance = b'<html><body>Down for maintenance</body></html>'
+    client = html_client(tmp_path, [maintenance, maintenance, b'[]'])
+
+    with pytest.raises(TransientAPIError):
+        client.get_sports()
+    # The half-open probe fails the same way and gives its slot back,
+    # so the next probe goes through and closes the breaker
+    with pytest.raises(TransientAPIError):
+        client.get_sports()
+    assert client.get_sports()['data'] == []
+    assert client.breakers.snapshot() == {}
+
+
+def test_open_breaker_refuses_without_a_request(tmp_path):
+    client = html_client(tmp_path, [b'<html></html>'])
+    client.breakers.reset_timeout = 60
+    with pytest.raises(TransientAPIError):
+        client.get_sports()
+    with pytest.raises(CircuitOpenError):
+        client.get_sports()
@@ -0,0 +1,40 @@
+"""Outright fields priced by several bookmakers."""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'api'))
+
+import arbitrageCalculator  # noqa: E402
+from lib.arbitrage import analyze_market_arbitrage  # noqa: E402
+
+# Book B lists only the favourite, at a price that looks like an arb
+# against A's prices for the rest of the field
+PARTIAL_FIELD = {
+    'Runner 1': [('A', 120), ('B', 400)],
+    'Runner 2': [('A', 180)],
+    'Runner 3': [('A', 250)],
+}
+
+
+def test_partial_field_book_is_left_out():
+    result = analyze_market_arbitrage(PARTIAL_FIELD, 'outrights')
+    assert result['bookmakers'] == ['A', 'A', 'A']
+    assert result['roi'] < 0
+
+
+def test_cli_leaves_partial_field_book_out():
+    result = arbitrageCalculator.analyzeMarketArbitrage(PARTIAL_FIELD, 'outrights')
+    assert result['bookmakers'] == ['A', 'A', 'A']
+
+
+def test_full_field_books_are_combined():
+    field = {
+        'Runner 1': [('A', 120), ('B', 400)],
+        'Runner 2': [('A', 200), ('B', 250)],
+        'Runner 3': [('A', 300), ('B', 350)],
+    }
+    result = analyze_market_arbitrage(field, 'outrights')
+    assert result['bookmakers'] == ['B', 'B', 'B']
+    assert result['roi'] > 0
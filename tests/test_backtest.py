@@ -0,0 +1,73 @@
+"""Backtesting a corpus written by the record transport."""
+
+import json
+import os
+import sys
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'api'))
+
+from lib.backtest import run_backtest  # noqa: E402
+from lib.transport import Corpus, request_digest  # noqa: E402
+
+BASE = 'https://api.the-odds-api.com/v4/'
+START = datetime(2030, 1, 1, 18, 0, tzinfo=timezone.utc).timestamp()
+
+
+def h2h_event(event_id, home_price, away_price):
+    outcomes = lambda home, away: [{'name': 'Home', 'price': home}, {'name': 'Away', 'price': away}]  # noqa: E731
+    return {
+        'id': event_id, 'home_team': 'Home', 'away_team': 'Away', 'commence_time': '2030-01-02T01:00:00Z',
+        'bookmakers': [
+            {'key': 'fanduel', 'title': 'FanDuel', 'markets': [{'key': 'h2h', 'outcomes': outcomes(home_price, -160)}]},
+            {'key': 'draftkings', 'title': 'DraftKings',
+             'markets': [{'key': 'h2h', 'outcomes': outcomes(-170, away_price)}]},
+        ]
+    }
+
+
+def props_event(event_id, over_price, under_price):
+    def side(name, price):
+        return [{'key': 'player_points', 'outcomes': [
+            {'name': name, 'description': 'Player One', 'price': price, 'point': 24.5}
+        ]}]
+    return {
+        'id': event_id, 'commence_time': '2030-01-02T01:00:00Z',
+        'bookmakers': [
+            {'key': 'fanduel', 'title': 'FanDuel', 'markets': side('Over', over_price)},
+            {'key': 'draftkings', 'title': 'DraftKings', 'markets': side('Under', under_price)},
+        ]
+    }
+
+
+def record(corpus, url, params, responses):
+    entry = {'method': 'GET', 'url': url, 'params': params, 'responses': []}
+    for minutes, data in responses:
+        entry['responses'].append({
+            'status': 200, 'headers': {'x-requests-remaining': '100'},
+            'body': corpus.put_body(json.dumps(data).encode()), 'elapsed': 0.1,
+            'recorded_at': START + minutes * 60
+        })
+    corpus.save(request_digest('GET', url, params), entry)
+
+
+def test_backtest_reads_recorded_corpus(tmp_path):
+    corpus = Corpus(str(tmp_path))
+    params = {'markets': 'h2h', 'oddsFormat': 'american', 'regions': 'us'}
+    # Bulk odds: an arbitrage for two snapshots, then the prices move back
+    record(corpus, f'{BASE}sports/basketball_nba/odds/', params, [
+        (0, [h2h_event('a', 150, 160)]), (1, [h2h_event('a', 150, 160)]), (2, [h2h_event('a', -150, -160)]),
+    ])
+    # Event odds for two events, interleaved; one event's snapshot must not end the other's episode
+    for event_id, offset in (('b', 0.1), ('c', 0.2)):
+        record(corpus, f'{BASE}sports/basketball_nba/events/{event_id}/odds', {'markets': 'player_points'},
+               [(minute + offset, props_event(event_id, 150, 160)) for minute in range(3)])
+    # Non-odds endpoints are not snapshots
+    record(corpus, f'{BASE}sports/basketball_nba/events', {}, [(0, [])])
+
+    summary = run_backtest(str(tmp_path), workers=1)
+
+    assert summary['snapshots'] == 9
+    assert summary['episodes'] == 3
+    assert summary['per_day'] == {'2030-01-01': {'0.0': 3, '1.0': 3, '2.0': 3, '5.0': 3}}
+    assert summary['survival_seconds']['max'] == 120
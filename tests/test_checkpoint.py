@@ -0,0 +1,78 @@
+"""Resuming a scan from its checkpoint."""
+
+import gzip
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import arbitrageCalculator  # noqa: E402
+
+OPPORTUNITY = {'event': 'Away @ Home', 'sport': 'mma_mixed_martial_arts', 'market': 'h2h', 'roi': 2.5,
+               'bookmakers': ['DraftKings', 'FanDuel'], 'odds': [150, 150]}
+
+
+class FakeClient:
+    def __init__(self, **kwargs):
+        pass
+
+    def getSports(self):
+        return [{'key': 'mma_mixed_martial_arts', 'active': True}]
+
+
+class FakeAlerter:
+    submitted = []
+
+    def start_dispatcher(self):
+        return self
+
+    def submit(self, opportunity):
+        self.submitted.append(opportunity)
+
+    def close(self):
+        pass
+
+
+def test_max_age_outlives_the_odds_cache(monkeypatch):
+    # A resume minutes after the keys ran out still reuses what was fetched
+    monkeypatch.delenv('ARB_CHECKPOINT_MAX_AGE', raising=False)
+    monkeypatch.setenv('ODDS_CACHE_SECONDS', '60')
+    assert arbitrageCalculator.ScanCheckpoint('unused').max_age == 1800
+    monkeypatch.setenv('ARB_CHECKPOINT_MAX_AGE', '120')
+    assert arbitrageCalculator.ScanCheckpoint('unused').max_age == 120
+
+
+def test_resume_reuses_payloads_saved_minutes_ago(tmp_path, monkeypatch):
+    monkeypatch.delenv('ARB_CHECKPOINT_MAX_AGE', raising=False)
+    checkpoint = arbitrageCalculator.ScanCheckpoint(str(tmp_path / 'checkpoint.json.gz'))
+    checkpoint.open('draftkings,fanduel')
+    checkpoint.startSport('mma_mixed_martial_arts')
+    checkpoint.recordPayload('mma_mixed_martial_arts', ['odds', 'mma_mixed_martial_arts'], {'data': []})
+    checkpoint.save()
+
+    resumed = arbitrageCalculator.ScanCheckpoint(str(tmp_path / 'checkpoint.json.gz'), resume=True)
+    resumed.open('draftkings,fanduel')
+    monkeypatch.setattr(arbitrageCalculator.time, 'time', lambda now=time.time(): now + 600)
+    assert resumed.payload('mma_mixed_martial_arts', ['odds', 'mma_mixed_martial_arts']) == {'data': []}
+
+
+def test_restored_opportunities_are_not_alerted_again(tmp_path, monkeypatch):
+    bookmakers = 'draftkings,fanduel'
+    path = tmp_path / 'checkpoint.json.gz'
+    with gzip.open(path, 'wt', encoding='utf-8') as f:
+        json.dump({'version': arbitrageCalculator.ScanCheckpoint.VERSION, 'bookmakers': bookmakers, 'sports': {
+            'mma_mixed_martial_arts': {'done': True, 'updated': time.time(), 'opportunities': [OPPORTUNITY],
+                                       'payloads': {}}
+        }}, f)
+
+    monkeypatch.setattr(arbitrageCalculator, 'loadAPIKeys', lambda: ['key'])
+    monkeypatch.setattr(arbitrageCalculator, 'APIClient', FakeClient)
+    monkeypatch.setattr(arbitrageCalculator, 'EmailAlerter', FakeAlerter)
+    checkpoint = arbitrageCalculator.ScanCheckpoint(str(path), resume=True)
+
+    found = arbitrageCalculator.runScan(['DraftKings', 'FanDuel'], interactive=False, checkpoint=checkpoint)
+
+    assert found == [OPPORTUNITY]
+    assert FakeAlerter.submitted == []
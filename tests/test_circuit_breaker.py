@@ -0,0 +1,33 @@
+"""Breaker state shared through the store and reported by /api/health."""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'api'))
+
+from lib.circuit_breaker import OPEN, CircuitBreakers, load_breaker_states  # noqa: E402
+from lib.storage import FileStore  # noqa: E402
+
+
+def test_open_breaker_is_seen_by_other_functions(tmp_path):
+    store = FileStore(str(tmp_path))
+    breakers = CircuitBreakers(failure_threshold=2, reset_timeout=30, store=store)
+    breakers.record_failure('odds:basketball_nba')
+    breakers.record_failure('odds:basketball_nba')
+
+    states = load_breaker_states(store)
+    assert states['odds:basketball_nba']['state'] == OPEN
+    assert 29 < states['odds:basketball_nba']['retry_in'] <= 30
+    # A new instance starts with the breaker open
+    assert CircuitBreakers(store=store).allow('odds:basketball_nba')[0] is False
+
+
+def test_open_breaker_past_its_reset_time_is_not_reported(tmp_path):
+    store = FileStore(str(tmp_path))
+    breakers = CircuitBreakers(failure_threshold=1, reset_timeout=0.1, store=store)
+    breakers.record_failure('odds:basketball_nba')
+    assert load_breaker_states(store)
+
+    time.sleep(0.2)
+    assert load_breaker_states(store) == {}
@@ -0,0 +1,94 @@
+"""A coordinator and two worker processes scanning a replayed corpus."""
+
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'api'))
+
+from lib.transport import Corpus, request_digest  # noqa: E402
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+SCRIPT = os.path.join(ROOT, 'arbitrageCalculator.py')
+BASE = 'https://api.the-odds-api.com/v4/'
+# Sports without player props, so each one is a single unit
+SPORTS = ['mma_mixed_martial_arts', 'boxing_boxing', 'tennis_atp_a', 'tennis_atp_b', 'tennis_wta_a', 'tennis_wta_b']
+
+
+def record(corpus, url, params, data):
+    corpus.save(request_digest('GET', url, params), {
+        'method': 'GET', 'url': url, 'params': params, 'responses': [{
+            'status': 200, 'headers': {'x-requests-remaining': '100'},
+            'body': corpus.put_body(json.dumps(data).encode()), 'elapsed': 0.2, 'recorded_at': time.time()
+        }]
+    })
+
+
+def arb_event(sport_key):
+    def book(key, title, home, away):
+        return {'key': key, 'title': title, 'markets': [{'key': 'h2h', 'outcomes': [
+            {'name': 'Home', 'price': home}, {'name': 'Away', 'price': away}]}]}
+    return {
+        'id': f"{sport_key}-1", 'sport_key': sport_key, 'home_team': 'Home', 'away_team': 'Away',
+        'commence_time': '2099-01-01T00:00:00Z',
+        'bookmakers': [book('draftkings', 'DraftKings', 150, -200), book('fanduel', 'FanDuel', -200, 150)]
+    }
+
+
+def build_corpus(directory):
+    corpus = Corpus(directory)
+    record(corpus, f'{BASE}sports/', {}, [{'key': key, 'active': True} for key in SPORTS])
+    for sport_key in SPORTS:
+        record(corpus, f'{BASE}sports/{sport_key}/odds/',
+               {'markets': 'h2h,spreads,totals', 'oddsFormat': 'american', 'bookmakers': 'draftkings,fanduel'},
+               [arb_event(sport_key)])
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def cli(tmp_path, *args, **env):
+    return subprocess.Popen(
+        [sys.executable, SCRIPT, '--transport', 'replay', '--corpus', str(tmp_path / 'corpus'), *args],
+        cwd=tmp_path, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True,
+        env=dict(os.environ, ODDS_REPLAY_TIMING='1', ARB_STATE_DIR=str(tmp_path / 'state'), **env)
+    )
+
+
+def test_two_workers_scan_a_replayed_corpus(tmp_path):
+    build_corpus(str(tmp_path / 'corpus'))
+    port = free_port()
+    coordinator = cli(tmp_path, '--batch', '--bookmakers', 'DraftKings,FanDuel', '--checkpoint', '',
+                      '--coordinator', f'127.0.0.1:{port}', API_KEYS='key-1,key-2')
+    deadline = time.time() + 20
+    while True:
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=0.2).close()
+            break
+        except OSError:
+            assert time.time() < deadline, coordinator.stderr.read()
+            time.sleep(0.1)
+
+    workers = [cli(tmp_path, '--worker', f'http://127.0.0.1:{port}') for _ in range(2)]
+    output, errors = coordinator.communicate(timeout=60)
+    for worker in workers:
+        worker.communicate(timeout=30)
+        assert worker.returncode == 0
+
+    assert coordinator.returncode == 0, errors
+    opportunities = [json.loads(line) for line in output.splitlines()]
+    assert sorted(o['sport'] for o in opportunities) == sorted(SPORTS)
+    assert f"{len(SPORTS)}/{len(SPORTS)} units by 2 workers" in errors
+
+
+def test_public_bind_requires_a_token(tmp_path):
+    coordinator = cli(tmp_path, '--batch', '--coordinator', '0.0.0.0:0', ARB_COORDINATOR_TOKEN='')
+    _, errors = coordinator.communicate(timeout=30)
+    assert coordinator.returncode == 2
+    assert 'ARB_COORDINATOR_TOKEN' in errors
@@ -0,0 +1,104 @@
+"""No-vig consensus lines, with numpy and with the pure Python fallback."""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'api'))
+
+from lib import ev  # noqa: E402
+from lib.scanner import event_info_for  # noqa: E402
+
+EVENT = event_info_for({'home_team': 'Home', 'away_team': 'Away'}, 'basketball_nba', '01/01 12:00 AM')
+
+
+def prop(name, price, description='Player 1', point=20.5):
+    return {'name': name, 'description': description, 'price': price, 'point': point}
+
+
+def props_payload(books):
+    return {'bookmakers': [{'key': title.lower(), 'title': title,
+                            'markets': [{'key': 'player_points', 'outcomes': outcomes}]}
+                           for title, outcomes in books.items()]}
+
+
+@pytest.fixture(params=['numpy', 'python'])
+def backend(request, monkeypatch):
+    if request.param == 'python':
+        monkeypatch.setattr(ev, 'np', None)
+    elif ev.np is None:
+        pytest.skip('numpy is not installed')
+    return request.param
+
+
+def test_one_outcome_line_has_no_consensus(backend):
+    # A single listed outcome de-vigs to a probability of 1
+    batch = ev.EVBatch()
+    batch.add_markets(EVENT, {'h2h': {'Home': [('A', 150), ('B', 140)]}})
+    assert batch.evaluate(min_ev=0, min_books=1) == []
+
+
+def test_repeated_outcome_leaves_the_book_out(backend):
+    # C lists Over twice and no Under: two rows for a two outcome line, but not a complete line
+    batch = ev.EVBatch()
+    batch.add_props(EVENT, props_payload({
+        'A': [prop('Over', -110), prop('Under', -110)],
+        'B': [prop('Over', -110), prop('Under', -110)],
+        'C': [prop('Over', 300), prop('Over', 300)],
+    }), ['player_points'])
+    bets = batch.evaluate(min_ev=0, min_books=2)
+
+    assert len(bets) == 1
+    assert bets[0]['bookmaker'] == 'C'
+    assert bets[0]['outcome'] == 'Over 20.5'
+    assert bets[0]['books'] == 2
+    assert bets[0]['fair_probability'] == 50.0
+
+
+def test_backends_agree():
+    batch = ev.EVBatch()
+    batch.add_markets(EVENT, {
+        'h2h': {'Home': [('A', -150), ('B', -140), ('C', -120)], 'Away': [('A', 130), ('B', 120), ('C', 110)]},
+        'totals': {'Over': [('A', -110, 220.5), ('B', 105, 220.5)], 'Under': [('A', -110, 220.5), ('B', -125, 220.5)]},
+    })
+    batch.add_props(EVENT, props_payload({
+        'A': [prop('Over', -115), prop('Under', -105)],
+        'B': [prop('Over', 120), prop('Under', -140)],
+    }), ['player_points'])
+
+    numpy = ev.np
+    try:
+        ev.np = None
+        expected = batch.evaluate(min_ev=0)
+    finally:
+        ev.np = numpy
+    if numpy is None:
+        pytest.skip('numpy is not installed')
+    assert expected
+    assert batch.evaluate(min_ev=0) == expected
+
+
+def test_numpy_and_python_rows_match():
+    if ev.np is None:
+        pytest.skip('numpy is not installed')
+    batch = ev.EVBatch()
+    batch.add_markets(EVENT, {
+        'h2h': {'Home': [('A', -150), ('B', -140), ('C', 105)], 'Away': [('A', 130), ('B', 120), ('C', 110)]},
+        'spreads': {'Home': [('A', -110, -3.5), ('B', 100, -3.5)], 'Away': [('A', -110, 3.5), ('B', -120, 3.5)]},
+        # Only one book prices the Under, so the total has no consensus
+        'totals': {'Over': [('A', -110, 220.5), ('B', 105, 220.5)], 'Under': [('A', -110, 220.5)]},
+    })
+    batch.add_props(EVENT, props_payload({
+        'A': [prop('Over', -115), prop('Under', -105), prop('Over', 140, 'Player 2', 9.5)],
+        'B': [prop('Over', 120), prop('Under', -140), prop('Over', 150, 'Player 2', 9.5)],
+    }), ['player_points'])
+
+    numpy_rows = sorted(ev._evaluate_numpy(batch, 0.0, 1))
+    python_rows = sorted(ev._evaluate_python(batch, 0.0, 1))
+
+    assert numpy_rows
+    assert [(row, books) for row, _, books, _ in numpy_rows] == [(row, books) for row, _, books, _ in python_rows]
+    for (_, fair_n, _, ev_n), (_, fair_p, _, ev_p) in zip(numpy_rows, python_rows):
+        assert fair_n == pytest.approx(fair_p)
+        assert ev_n == pytest.approx(ev_p)
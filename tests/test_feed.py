@@ -0,0 +1,123 @@
+"""The live feed: one publisher writes changes, readers only stream them."""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'api'))
+
+from lib import feed  # noqa: E402
+from lib.feed import LiveScanner, subscribe  # noqa: E402
+from lib.storage import FileStore  # noqa: E402
+
+
+def h2h_event(books):
+    return {
+        'id': 'e1', 'home_team': 'Home', 'away_team': 'Away', 'commence_time': '2099-01-01T00:00:00Z',
+        'bookmakers': [{'key': key, 'title': title, 'markets': [{'key': 'h2h', 'outcomes': [
+            {'name': 'Home', 'price': home}, {'name': 'Away', 'price': away}]}]} for key, title, home, away in books]
+    }
+
+
+class FakeClient:
+    """Serves one payload per scan and counts upstream calls."""
+
+    def __init__(self, payloads):
+        self.payloads = payloads
+        self.calls = 0
+        self.remaining_credits = '100'
+        self.coalesced_calls = 0
+
+    def __call__(self):
+        return self
+
+    def get_sports_odds(self, sport_key, bookmakers=None, markets=None):
+        payload = self.payloads[min(self.calls, len(self.payloads) - 1)]
+        self.calls += 1
+        return {'data': [payload], 'remaining': self.remaining_credits}
+
+
+def events(stream):
+    return [chunk.decode() for chunk in stream if not chunk.startswith(b':')]
+
+
+def test_readers_stream_published_changes_without_scanning(tmp_path, monkeypatch):
+    monkeypatch.setenv('SUPERSET_FETCH', '0')
+    monkeypatch.setattr(feed, 'POLL_SECONDS', 0.01)
+    store = FileStore(str(tmp_path))
+    client = FakeClient([
+        h2h_event([('draftkings', 'DraftKings', 150, -200), ('fanduel', 'FanDuel', -200, 150)]),
+        h2h_event([('draftkings', 'DraftKings', 160, -200), ('fanduel', 'FanDuel', -200, 150),
+                   ('betmgm', 'BetMGM', -200, 170)]),
+    ])
+    publisher = LiveScanner('basketball_nba', 'draftkings,fanduel,betmgm', interval=60,
+                            client_factory=client, store=store)
+    publisher.scan_once()
+    publisher.scan_once()
+    assert client.calls == 2
+
+    # A new client gets a snapshot, a resuming one only the missed delta
+    fresh = events(subscribe('basketball_nba', max_seconds=0.05, store=store))
+    resumed = events(subscribe('basketball_nba', last_version=1, max_seconds=0.05, store=store))
+    assert len(fresh) == 1 and fresh[0].startswith('id: 2\nevent: snapshot')
+    assert len(resumed) == 1 and resumed[0].startswith('id: 2\nevent: delta')
+    assert '"changed":[{' in resumed[0] and 'BetMGM' in resumed[0]
+
+    # A client without BetMGM sees the line it can no longer place removed
+    filtered = events(subscribe('basketball_nba', last_version=1, bookmakers=['draftkings', 'fanduel'],
+                                max_seconds=0.05, store=store))
+    assert '"changed":[]' in filtered[0] and '"removed":["' in filtered[0]
+    assert client.calls == 2
+
+
+def test_restarted_publisher_continues_versions(tmp_path, monkeypatch):
+    monkeypatch.setenv('SUPERSET_FETCH', '0')
+    store = FileStore(str(tmp_path))
+    payload = h2h_event([('draftkings', 'DraftKings', 150, -200), ('fanduel', 'FanDuel', -200, 150)])
+    LiveScanner('basketball_nba', 'draftkings,fanduel', client_factory=FakeClient([payload]), store=store).scan_once()
+
+    restarted = LiveScanner('basketball_nba', 'draftkings,fanduel', client_factory=FakeClient([payload]), store=store)
+    delta = restarted.scan_once()
+    assert restarted.version == 1
+    assert delta == {'added': [], 'changed': [], 'removed': []}
+
+
+class CountingStore(FileStore):
+    def __init__(self, path):
+        super().__init__(path)
+        self.reads = []
+
+    def get(self, key):
+        self.reads.append(key)
+        return super().get(key)
+
+
+def test_filtered_client_gets_an_opportunity_it_never_saw_as_added(tmp_path, monkeypatch):
+    monkeypatch.setenv('SUPERSET_FETCH', '0')
+    monkeypatch.setattr(feed, 'POLL_SECONDS', 0.01)
+    store = CountingStore(str(tmp_path))
+    client = FakeClient([
+        # The best Away price is at BetMGM, which the client doesn't use
+        h2h_event([('draftkings', 'DraftKings', 150, -200), ('fanduel', 'FanDuel', -200, -200),
+                   ('betmgm', 'BetMGM', -200, 170)]),
+        # Same opportunity, now placeable at DraftKings and FanDuel
+        h2h_event([('draftkings', 'DraftKings', 150, -200), ('fanduel', 'FanDuel', -200, 180),
+                   ('betmgm', 'BetMGM', -200, 170)]),
+    ])
+    publisher = LiveScanner('basketball_nba', 'draftkings,fanduel,betmgm', interval=60,
+                            client_factory=client, store=store)
+    publisher.scan_once()
+
+    stream = subscribe('basketball_nba', bookmakers=['draftkings', 'fanduel'], max_seconds=5, keepalive=60,
+                       store=store)
+    snapshot = next(stream).decode()
+    assert '"opportunities":[]' in snapshot
+
+    store.reads.clear()
+    assert publisher.scan_once()['changed']
+    delta = next(stream).decode()
+    stream.close()
+    assert '"added":[{' in delta and '"changed":[]' in delta and 'FanDuel' in delta
+
+    # Polling reads the head and the new delta, never the full state
+    assert feed.state_key('basketball_nba') not in store.reads
+    assert feed.head_key('basketball_nba') in store.reads
@@ -0,0 +1,15 @@
+"""Validation of /api/jobs requests."""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'api'))
+
+import jobs as jobs_endpoint  # noqa: E402
+
+
+def test_string_sport_keys_are_rejected():
+    client = jobs_endpoint.app.test_client()
+    response = client.post('/api/jobs', json={'sport_keys': 'basketball_nba', 'bookmakers': ['draftkings', 'fanduel']})
+    assert response.status_code == 400
+    assert 'list' in response.get_json()['error']
@@ -0,0 +1,63 @@
+"""Metrics flushed by several processes and collected through the store."""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'api'))
+
+from lib import metrics as metrics_module  # noqa: E402
+from lib.metrics import STORE_KEY, Metrics, collect  # noqa: E402
+from lib.storage import FileStore  # noqa: E402
+
+
+def test_collect_sums_every_process(tmp_path):
+    store = FileStore(str(tmp_path))
+    scan, prewarm = Metrics(store), Metrics(store)
+    scan.record_upstream('odds', '200', 0.2, {'x-requests-last': '3', 'x-requests-remaining': '97'})
+    prewarm.record_upstream('odds', '200', 0.4, {'x-requests-last': '3', 'x-requests-remaining': '94'})
+    scan.flush()
+    prewarm.flush()
+
+    snapshot = collect(store)
+    assert snapshot['counters']['upstream_requests_total']['endpoint=odds,status=200'] == 2
+    assert snapshot['counters']['credits_used_total'][''] == 6
+    assert snapshot['credits']['remaining'] == 94
+
+
+def test_processes_that_stopped_flushing_are_pruned(tmp_path, monkeypatch):
+    store = FileStore(str(tmp_path))
+    gone = Metrics(store)
+    gone.inc('cache_lookups_total', cache='odds', result='hit')
+    gone.flush()
+
+    monkeypatch.setattr(metrics_module, 'RETENTION_SECONDS', 0.1)
+    time.sleep(0.2)
+    live = Metrics(store)
+    live.flush()
+
+    assert collect(store)['counters'] == {}
+    assert list(store.hgetall(STORE_KEY)) == [live.process_id]
+
+
+def test_burn_rate_tracks_each_key(tmp_path, monkeypatch):
+    store = FileStore(str(tmp_path))
+    scan, prewarm = Metrics(store), Metrics(store)
+    clock = iter(range(0, 3600, 600))
+    monkeypatch.setattr(metrics_module.time, 'time', lambda: next(clock))
+
+    # Two keys interleaved across two processes; the 997 response arrives after the 994 one
+    scan.record_upstream('odds', '200', 0.2, {'x-requests-remaining': '1000'}, api_key='first')
+    prewarm.record_upstream('odds', '200', 0.2, {'x-requests-remaining': '400'}, api_key='second')
+    scan.record_upstream('odds', '200', 0.2, {'x-requests-remaining': '994'}, api_key='first')
+    prewarm.record_upstream('odds', '200', 0.2, {'x-requests-remaining': '997'}, api_key='first')
+    scan.record_upstream('odds', '200', 0.2, {'x-requests-remaining': '397'}, api_key='second')
+    prewarm.record_upstream('odds', '200', 0.2, {'x-requests-remaining': '991'}, api_key='first')
+    monkeypatch.undo()
+    scan.flush()
+    prewarm.flush()
+
+    credits = collect(store)['credits']
+    assert credits['remaining'] == 991 + 397
+    # 9 credits from the first key and 3 from the second over 3000 seconds
+    assert credits['burn_per_hour'] == 14.4
@@ -0,0 +1,113 @@
+"""The per-scan request planner, shared by the web API and the CLI."""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'api'))
+
+import arbitrageCalculator  # noqa: E402
+from lib.cache import TTLCache  # noqa: E402
+from lib.planner import SUPERSET_BOOKMAKERS, RequestPlanner  # noqa: E402
+from lib.storage import FileStore  # noqa: E402
+
+
+def event(*keys):
+    return {'id': 'e1', 'sport_key': 'basketball_nba', 'commence_time': '2099-01-01T00:00:00Z',
+            'home_team': 'Home', 'away_team': 'Away',
+            'bookmakers': [{'key': key, 'title': key, 'markets': []} for key in keys]}
+
+
+class FakeClient:
+    """Web API client interface; records each upstream call."""
+
+    def __init__(self):
+        self.calls = []
+        self.remaining_credits = '100'
+        self.coalesced_calls = 0
+
+    def get_sports_odds(self, sport_key, bookmakers=None, markets=None):
+        self.calls.append(('odds', sport_key, bookmakers))
+        return {'data': [event(*bookmakers.split(','))], 'remaining': '100'}
+
+    def get_events(self, sport_key):
+        self.calls.append(('events', sport_key))
+        return {'data': [], 'remaining': '100'}
+
+    def get_event_odds(self, sport_key, event_id, bookmakers=None):
+        self.calls.append(('event_odds', sport_key, event_id, bookmakers))
+        return {'data': event(*bookmakers.split(',')), 'remaining': '100'}
+
+
+def test_subsets_are_filtered_from_one_superset_fetch(tmp_path):
+    client = FakeClient()
+    cache = TTLCache('odds', ttl=60, store=FileStore(str(tmp_path)))
+
+    first = RequestPlanner(client, superset=True, cache=cache)
+    second = RequestPlanner(client, superset=True, cache=cache)
+    dk_fd = first.get_sports_odds('basketball_nba', bookmakers='draftkings,fanduel')
+    mgm = second.get_sports_odds('basketball_nba', bookmakers='betmgm')
+    props = first.get_event_odds('basketball_nba', 'e1', bookmakers='fanduel')
+
+    assert [b['key'] for b in dk_fd['data'][0]['bookmakers']] == ['draftkings', 'fanduel']
+    assert [b['key'] for b in mgm['data'][0]['bookmakers']] == ['betmgm']
+    assert [b['key'] for b in props['data']['bookmakers']] == ['fanduel']
+    assert client.calls == [('odds', 'basketball_nba', SUPERSET_BOOKMAKERS),
+                            ('event_odds', 'basketball_nba', 'e1', SUPERSET_BOOKMAKERS)]
+    assert second.stats()['saved_by_reason'] == {'cache': 1}
+
+
+def test_unsupported_bookmaker_is_fetched_as_asked(tmp_path):
+    client = FakeClient()
+    planner = RequestPlanner(client, superset=True, cache=TTLCache('odds', ttl=60, store=FileStore(str(tmp_path))))
+    planner.get_sports_odds('basketball_nba', bookmakers='draftkings,pinnacle')
+    assert client.calls == [('odds', 'basketball_nba', 'draftkings,pinnacle')]
+
+
+def test_events_are_derived_from_bulk_odds(tmp_path):
+    client = FakeClient()
+    planner = RequestPlanner(client, superset=False)
+    planner.get_sports_odds('basketball_nba', bookmakers='draftkings')
+    planner.get_sports_odds('basketball_nba', bookmakers='draftkings')
+    events = planner.get_events('basketball_nba')['data']
+
+    assert events == [{'id': 'e1', 'sport_key': 'basketball_nba', 'commence_time': '2099-01-01T00:00:00Z',
+                       'home_team': 'Home', 'away_team': 'Away'}]
+    assert client.calls == [('odds', 'basketball_nba', 'draftkings')]
+    assert planner.stats()['saved_by_reason'] == {'duplicate': 1, 'derived_events': 1}
+
+
+class FakeCLIClient:
+    """The CLI client's interface: camelCase, raw payloads."""
+
+    def __init__(self):
+        self.calls = 0
+        self.remaining_credits = '100'
+
+    def getSportsOdds(self, sport_key, bookmakers=None, markets=None):
+        self.calls += 1
+        return [event(*bookmakers.split(','))]
+
+    def getEvents(self, sportKey):
+        self.calls += 1
+        return []
+
+
+def test_cli_uses_the_shared_planner_with_its_checkpoint(tmp_path, monkeypatch):
+    monkeypatch.setenv('SUPERSET_FETCH', '0')
+    checkpoint = arbitrageCalculator.ScanCheckpoint(str(tmp_path / 'checkpoint.json.gz'))
+    checkpoint.open('draftkings')
+    checkpoint.startSport('basketball_nba')
+
+    client = FakeCLIClient()
+    planner = arbitrageCalculator.RequestPlanner(client, checkpoint)
+    odds = planner.getSportsOdds('basketball_nba', bookmakers='draftkings')
+    assert [e['id'] for e in planner.getEvents('basketball_nba')] == ['e1']
+    assert client.calls == 1
+    assert planner.summary() == '1 upstream, 1 saved (derived_events: 1)'
+
+    # A resumed scan reads the payload back instead of calling upstream
+    resumed = arbitrageCalculator.RequestPlanner(client, checkpoint)
+    assert resumed.getSportsOdds('basketball_nba', bookmakers='draftkings') == odds
+    assert client.calls == 1
+    assert resumed.summary() == '0 upstream, 1 saved (checkpoint: 1)'
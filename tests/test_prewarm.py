@@ -0,0 +1,70 @@
+"""The pre-warmer's guards and the cache it warms."""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'api'))
+
+import prewarm as prewarm_endpoint  # noqa: E402
+from lib import cache as cache_module  # noqa: E402
+from lib.cache import TTLCache  # noqa: E402
+from lib.prewarm import PrewarmJob  # noqa: E402
+from lib.storage import FileStore  # noqa: E402
+
+
+class NoCalls:
+    """A client the guarded runs must never use."""
+
+    remaining_credits = None
+
+    def __getattr__(self, name):
+        raise AssertionError(f"unexpected upstream call: {name}")
+
+
+def test_endpoint_refuses_without_cron_secret(monkeypatch):
+    monkeypatch.delenv('CRON_SECRET', raising=False)
+    response = prewarm_endpoint.app.test_client().get('/api/prewarm')
+    assert response.status_code == 403
+
+
+def test_endpoint_rejects_wrong_secret(monkeypatch):
+    monkeypatch.setenv('CRON_SECRET', 'right')
+    response = prewarm_endpoint.app.test_client().get('/api/prewarm', headers={'Authorization': 'Bearer wrong'})
+    assert response.status_code == 401
+
+
+def test_requested_budget_cannot_exceed_configured(monkeypatch):
+    monkeypatch.setenv('PREWARM_CREDIT_BUDGET', '40')
+    assert PrewarmJob(NoCalls(), budget=100000).budget == 40
+    assert PrewarmJob(NoCalls(), budget=10).budget == 10
+    assert PrewarmJob(NoCalls()).budget == 40
+
+
+def test_unshared_cache_is_not_warmed(tmp_path, monkeypatch):
+    monkeypatch.setenv('VERCEL', '1')
+    cache = TTLCache('odds', ttl=60, store=FileStore(str(tmp_path)))
+    report = PrewarmJob(NoCalls(), cache=cache).run(['basketball_nba'])
+    assert report['stopped'] == 'cache_not_shared'
+    assert report['credits_spent'] == 0
+
+
+def test_warmed_entry_is_read_by_another_function(tmp_path):
+    store = FileStore(str(tmp_path))
+    TTLCache('odds', ttl=60, store=store).set(('odds', 'basketball_nba'), {'data': [], 'remaining': '9'}, ttl=60)
+    scan_cache = TTLCache('odds', ttl=60, store=store)
+    assert scan_cache.get(('odds', 'basketball_nba')) == {'data': [], 'remaining': '9'}
+    assert 0 <= scan_cache.age(('odds', 'basketball_nba')) < 5
+
+
+def test_warmed_entries_expire_with_the_odds_cache(tmp_path, monkeypatch):
+    monkeypatch.delenv('PREWARM_MAX_AGE', raising=False)
+    cache = TTLCache('odds', ttl=60, store=FileStore(str(tmp_path)))
+    job = PrewarmJob(NoCalls(), cache=cache)
+    assert job.max_age == 60
+    assert job.refresh_after == 30
+
+    job._fetch(('odds', 'basketball_nba'), 'odds', 1, lambda: {'data': [], 'remaining': '9'})
+    later = time.time() + 61
+    monkeypatch.setattr(cache_module.time, 'time', lambda: later)
+    assert cache.get(('odds', 'basketball_nba')) is None
@@ -0,0 +1,37 @@
+"""Incremental best-price index."""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'api'))
+
+from lib.price_index import PriceIndex  # noqa: E402
+
+
+def h2h(title, home, away):
+    return {'key': title.lower(), 'title': title,
+            'markets': [{'key': 'h2h', 'outcomes': [{'name': 'Home', 'price': home}, {'name': 'Away', 'price': away}]}]}
+
+
+def test_bookmaker_missing_from_payload_is_withdrawn():
+    index = PriceIndex()
+    index.ingest_event({'id': 'e', 'bookmakers': [h2h('X', 150, -120), h2h('Y', 110, -130)]})
+    assert index.best('e', 'h2h', None, 'Home') == ('X', 150)
+    assert index.opportunities()
+
+    # X pulled the event: its 150 must not stay best or keep a phantom arbitrage alive
+    touched = index.ingest_event({'id': 'e', 'bookmakers': [h2h('Y', 110, -130)]})
+
+    assert touched == {('e', 'h2h', None)}
+    assert index.best('e', 'h2h', None, 'Home') == ('Y', 110)
+    assert index.opportunities() == []
+
+
+def test_drop_event_clears_its_lines():
+    index = PriceIndex()
+    index.ingest_event({'id': 'e', 'bookmakers': [h2h('X', 150, -120), h2h('Y', 110, -130)]})
+    index.drop_event('e')
+
+    assert index.best('e', 'h2h', None, 'Home') is None
+    assert index.results == {}
+    assert index.events() == set()
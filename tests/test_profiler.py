@@ -0,0 +1,49 @@
+"""Stage attribution of the sampling profiler."""
+
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'api'))
+
+from lib.profiler import SamplingProfiler, classify, is_idle  # noqa: E402
+
+REQUESTS = os.path.join('site-packages', 'requests', 'sessions.py')
+URLLIB3 = os.path.join('site-packages', 'urllib3', 'connectionpool.py')
+
+
+def test_classify_uses_the_innermost_matching_frame():
+    # json decoding inside requests is decode, not http
+    assert classify([(os.path.join('lib', 'json', 'decoder.py'), 'raw_decode'),
+                     (REQUESTS, 'json'), ('api_client.py', '_request_upstream')]) == 'decode'
+    assert classify([('socket.py', 'readinto'), (URLLIB3, 'urlopen'), ('planner.py', 'get')]) == 'http'
+    assert classify([('arbitrage.py', 'find_arbitrage'), ('scanner.py', 'scan_sport')]) == 'analyzers'
+    assert classify([('scanner.py', 'build_market_odds'), ('scanner.py', 'scan_sport')]) == 'odds_dict build'
+    assert classify([('responses.py', 'dumps'), ('scan.py', 'scan')]) == 'formatting'
+    assert classify([('scanner.py', 'scan_sport')]) == 'other'
+    assert classify([]) == 'other'
+
+
+def test_waiting_threads_are_idle():
+    assert is_idle([('threading.py', 'wait'), (os.path.join('concurrent', 'futures', '_base.py'), 'result')])
+    assert is_idle([('queue.py', 'get'), ('alerts.py', 'run')])
+    assert not is_idle([('socket.py', 'readinto'), ('threading.py', 'run')])
+    assert not is_idle([])
+
+
+def _send():
+    # Stands in for an HTTP call made on a pool thread
+    deadline = time.monotonic() + 0.3
+    while time.monotonic() < deadline:
+        time.sleep(0.001)
+
+
+def test_pool_thread_http_is_not_lost_in_the_caller_wait():
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        with SamplingProfiler(interval=0.002) as profiler:
+            for future in [pool.submit(_send), pool.submit(_send)]:
+                future.result()
+
+    assert profiler.samples
+    assert profiler.stage_samples['http'] / profiler.samples > 0.8
@@ -0,0 +1,47 @@
+"""Multi-region fetches when some regions fail."""
+
+import json
+import os
+import sys
+
+import pytest
+import requests
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'api'))
+
+from lib.api_client import APIClient, APIError  # noqa: E402
+
+
+def region_event(region):
+    return [{'id': 'e1', 'sport_key': 'basketball_nba', 'home_team': 'Home', 'away_team': 'Away',
+             'commence_time': '2030-01-01T00:00:00Z',
+             'bookmakers': [{'key': f"{region}book", 'title': f"{region} book", 'markets': []}]}]
+
+
+def client_with_failing(failing):
+    def get(url, params=None, timeout=None, **kwargs):
+        response = requests.Response()
+        region = params['regions']
+        response.status_code = 401 if region in failing else 200
+        response._content = json.dumps(region_event(region)).encode()
+        response.headers['x-requests-remaining'] = '500'
+        return response
+
+    client = APIClient(api_key='test')
+    client.session = requests.Session()
+    client.session.get = get
+    return client
+
+
+def test_failed_region_is_skipped_and_the_rest_merged():
+    client = client_with_failing({'uk'})
+    result = client.get_sports_odds('basketball_nba', regions='us,uk,eu')
+
+    assert [b['key'] for b in result['data'][0]['bookmakers']] == ['usbook', 'eubook']
+    assert list(client.skipped) == ['odds:basketball_nba:uk']
+
+
+def test_every_region_failing_raises():
+    client = client_with_failing({'us', 'uk'})
+    with pytest.raises(APIError):
+        client.get_sports_odds('basketball_nba', regions='us,uk')
@@ -0,0 +1,97 @@
+"""Compact result shape and response compression."""
+
+import gzip
+import os
+import sys
+
+import pytest
+from flask import Flask
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'api'))
+
+from lib import responses  # noqa: E402
+from lib.responses import compact_opportunities, expand_opportunities, negotiate_encoding  # noqa: E402
+
+brotli = pytest.importorskip('brotli')
+
+
+def opportunity(event, market, bets, **extra):
+    return dict({
+        'event': event, 'sport': 'basketball_nba', 'market': market, 'roi': 1.25,
+        'commence_time': '01/01 07:00 PM',
+        'bets': [{'outcome': outcome, 'bookmaker': bookmaker, 'odds': odds,
+                  'bet_percentage': percentage, 'bet_amount_100': percentage}
+                 for outcome, bookmaker, odds, percentage in bets]
+    }, **extra)
+
+
+OPPORTUNITIES = [
+    opportunity('Away @ Home', 'h2h', [('Home', 'DraftKings', 150, 40.0), ('Away', 'FanDuel', -130, 60.0)]),
+    opportunity('Away @ Home', 'player_points - Player 1',
+                [('Over 20.5', 'FanDuel', 110, 48.78), ('Under 20.5', 'BetMGM', 105, 51.22)]),
+    # Feed opportunities carry an id the others don't have
+    opportunity('B @ A', 'totals', [('Over 220.5', 'BetMGM', 105, 50.0), ('Under 220.5', 'DraftKings', 105, 50.0)],
+                id='0972934da848c061'),
+]
+
+
+def test_compact_round_trip():
+    compact = compact_opportunities(OPPORTUNITIES)
+    assert compact['format'] == 'compact-v1'
+    assert compact['bookmakers'] == ['DraftKings', 'FanDuel', 'BetMGM']
+    assert compact['columns']['extra'] == [None, None, {'id': '0972934da848c061'}]
+    assert expand_opportunities(compact) == OPPORTUNITIES
+
+
+def test_compact_layout_without_optional_fields():
+    compact = compact_opportunities(OPPORTUNITIES[:2])
+    # The column layout the frontend's expandOpportunities reads
+    assert list(compact['columns']) == ['event', 'sport', 'market', 'roi', 'commence_time', 'bets']
+    assert compact['columns']['bets'][0] == [['Home', 'Away'], [0, 1], [150, -130], [40.0, 60.0]]
+    assert expand_opportunities(compact) == OPPORTUNITIES[:2]
+    assert expand_opportunities(compact_opportunities([])) == []
+
+
+@pytest.mark.parametrize('header, expected', [
+    (None, None),
+    ('', None),
+    ('identity', None),
+    ('gzip', 'gzip'),
+    ('gzip, deflate, br', 'br'),
+    ('gzip;q=1.0, br;q=0.5', 'gzip'),
+    ('br;q=0.8, gzip;q=0.8', 'br'),
+    ('br;q=0, gzip', 'gzip'),
+    ('gzip;q=0, br;q=0', None),
+    ('*', 'br'),
+    ('*;q=0.5, br;q=0', 'gzip'),
+    ('br; q=0.000, *;q=0', None),
+    ('GZIP;Q=0.9', 'gzip'),
+])
+def test_negotiate_encoding(header, expected):
+    assert negotiate_encoding(header) == expected
+
+
+def test_without_brotli_gzip_is_chosen(monkeypatch):
+    monkeypatch.setattr(responses, 'brotli', None)
+    assert negotiate_encoding('br, gzip;q=0.5') == 'gzip'
+    assert negotiate_encoding('br') is None
+
+
+def test_json_response_compresses_large_bodies():
+    app = Flask(__name__)
+    payload = {'opportunities': OPPORTUNITIES * 20}
+    body = responses.dumps(payload)
+
+    with app.test_request_context(headers={'Accept-Encoding': 'gzip;q=1, br;q=0.5'}):
+        response = responses.json_response(payload)
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert gzip.decompress(response.get_data()) == body
+
+    with app.test_request_context(headers={'Accept-Encoding': 'br'}):
+        response = responses.json_response(payload)
+    assert response.headers['Content-Encoding'] == 'br'
+    assert brotli.decompress(response.get_data()) == body
+
+    with app.test_request_context(headers={'Accept-Encoding': 'br'}):
+        response = responses.json_response({'ok': True})
+    assert 'Content-Encoding' not in response.headers
@@ -0,0 +1,52 @@
+"""/api/results status codes for bad cursors and unknown scans."""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'api'))
+
+import results as results_endpoint  # noqa: E402
+from lib.result_store import ResultStore, encode_cursor  # noqa: E402
+from lib.storage import FileStore  # noqa: E402
+
+OPPORTUNITIES = [{'event': f"Away {i} @ Home {i}", 'market': 'h2h', 'roi': 3.0 - i,
+                  'bookmakers': ['DraftKings', 'FanDuel']} for i in range(3)]
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    monkeypatch.setattr(results_endpoint, 'store', ResultStore(store=FileStore(str(tmp_path))))
+    return results_endpoint.app.test_client()
+
+
+def test_pages_through_a_saved_scan(client):
+    scan_id = results_endpoint.store.save(OPPORTUNITIES)
+
+    first = client.get(f"/api/results?scan_id={scan_id}&limit=2").get_json()
+    second = client.get(f"/api/results?scan_id={scan_id}&limit=2&cursor={first['next_cursor']}").get_json()
+
+    assert [o['event'] for o in first['opportunities'] + second['opportunities']] == \
+        [o['event'] for o in OPPORTUNITIES]
+    assert second['next_cursor'] is None
+
+
+@pytest.mark.parametrize('cursor', ['not-a-cursor', 'eDo1', '%FF%FE'])
+def test_invalid_cursor_is_a_bad_request(client, cursor):
+    scan_id = results_endpoint.store.save(OPPORTUNITIES)
+
+    response = client.get(f"/api/results?scan_id={scan_id}&cursor={cursor}")
+
+    assert response.status_code == 400
+    assert response.get_json() == {'error': 'Invalid cursor.'}
+
+
+def test_unknown_scan_is_not_found(client):
+    response = client.get(f"/api/results?scan_id=missing&cursor={encode_cursor(2)}")
+
+    assert response.status_code == 404
+
+
+def test_invalid_cursor_is_a_bad_request_for_an_unknown_scan(client):
+    assert client.get("/api/results?scan_id=missing&cursor=not-a-cursor").status_code == 400
@@ -0,0 +1,62 @@
+"""The CLI scan's stages: nothing is fetched for an event the time filter drops."""
+
+import os
+import sys
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import arbitrageCalculator  # noqa: E402
+from arbitrageCalculator import ScanStages, filterEventsByTime, scanSport  # noqa: E402
+
+NOW = datetime(2030, 1, 1, 12, 0, tzinfo=timezone.utc)
+
+
+def at(minutes):
+    return (NOW + timedelta(minutes=minutes)).strftime('%Y-%m-%dT%H:%M:%SZ')
+
+
+EVENTS = [
+    {'id': 'started', 'home_team': 'A', 'away_team': 'B', 'commence_time': at(-30)},
+    {'id': 'in-buffer', 'home_team': 'C', 'away_team': 'D', 'commence_time': at(5)},
+    {'id': 'later', 'home_team': 'E', 'away_team': 'F', 'commence_time': at(120)},
+    {'id': 'no-time', 'home_team': 'G', 'away_team': 'H'},
+]
+
+
+class FakeClient:
+    def __init__(self):
+        self.event_odds = []
+
+    def getSportsOdds(self, sport_key, bookmakers=None, markets=None):
+        return [dict(event, bookmakers=[]) for event in EVENTS]
+
+    def getEvents(self, sportKey):
+        return EVENTS
+
+    def getEventOdds(self, sportKey, eventId, bookmakers=None):
+        self.event_odds.append(eventId)
+        return {'id': eventId, 'bookmakers': []}
+
+
+def test_time_filter_uses_one_clock_and_counts_what_it_kept():
+    stages = ScanStages()
+    kept = filterEventsByTime(EVENTS, 'basketball_nba', NOW, stages)
+    assert [event['id'] for event, _ in kept] == ['later']
+    assert kept[0][1]['sport'] == 'basketball_nba'
+    assert stages.summary() == 'time-filter: 1/4'
+
+
+def test_props_are_fetched_only_for_events_that_pass_the_filter(monkeypatch):
+    class FrozenDatetime(datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return NOW.astimezone(tz) if tz else NOW
+
+    monkeypatch.setattr(arbitrageCalculator, 'datetime', FrozenDatetime)
+    client = FakeClient()
+    stages = ScanStages()
+
+    assert list(scanSport(client, 'basketball_nba', 'draftkings,fanduel', stages)) == []
+    assert client.event_odds == ['later']
+    assert stages.summary() == 'list: 8/8 -> time-filter: 2/8 -> fetch: 1/1 -> analyze: 0/2'
@@ -0,0 +1,31 @@
+"""Sharded CLI scans: sports split across worker processes, merged in the parent."""
+
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from test_coordinator import SPORTS, build_corpus, cli  # noqa: E402
+
+
+def scan(tmp_path, workers):
+    process = cli(tmp_path, '--batch', '--bookmakers', 'DraftKings,FanDuel', '--checkpoint', '',
+                  '--workers', str(workers), API_KEYS='key-1,key-2', SUPERSET_FETCH='0')
+    output, errors = process.communicate(timeout=60)
+    assert process.returncode == 0, errors
+    stages = next(line for line in errors.splitlines() if line.startswith('Stages'))
+    return [json.loads(line) for line in output.splitlines()], stages
+
+
+def test_sharded_scan_matches_a_single_process_scan(tmp_path):
+    build_corpus(str(tmp_path / 'corpus'))
+    single, single_stages = scan(tmp_path, 1)
+    # More workers than keys: capped at one worker per key slice
+    sharded, sharded_stages = scan(tmp_path, 4)
+
+    assert sorted(o['sport'] for o in sharded) == sorted(SPORTS)
+    key = lambda o: (o['sport'], o['market'])
+    assert sorted(sharded, key=key) == sorted(single, key=key)
+    # Every stage count is merged back into the parent
+    assert sharded_stages == single_stages
@@ -0,0 +1,66 @@
+"""Coalescing identical calls across instances through the shared store."""
+
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'api'))
+
+from lib.singleflight import SingleFlight  # noqa: E402
+from lib.storage import FileStore  # noqa: E402
+
+
+def race(flights, fn):
+    """Call fn for the same key once through each flight group at the same time."""
+    results = [None] * len(flights)
+
+    def call(i):
+        try:
+            results[i] = flights[i].do(('odds', 'basketball_nba'), fn)
+        except RuntimeError as e:
+            results[i] = e
+
+    threads = [threading.Thread(target=call, args=(i,)) for i in range(len(flights))]
+    for thread in threads:
+        thread.start()
+        time.sleep(0.05)
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def test_instances_share_one_call(tmp_path):
+    store = FileStore(str(tmp_path))
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        time.sleep(0.3)
+        return {'data': [], 'remaining': '41'}
+
+    flights = [SingleFlight(store), SingleFlight(store)]
+    results = race(flights, fetch)
+
+    assert len(calls) == 1
+    assert results[0] == ({'data': [], 'remaining': '41'}, False)
+    assert results[1] == ({'data': [], 'remaining': '41'}, True)
+    assert flights[1].stats()['remote'] == 1
+
+
+def test_failed_leader_lets_the_waiter_call(tmp_path):
+    store = FileStore(str(tmp_path))
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        time.sleep(0.3)
+        if len(calls) == 1:
+            raise RuntimeError('upstream down')
+        return {'data': [], 'remaining': '40'}
+
+    results = race([SingleFlight(store), SingleFlight(store)], fetch)
+
+    assert len(calls) == 2
+    assert isinstance(results[0], RuntimeError)
+    assert results[1] == ({'data': [], 'remaining': '40'}, False)
@@ -0,0 +1,129 @@
+"""Shared store backends and the result store built on them."""
+
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'api'))
+
+from lib.result_store import ResultStore  # noqa: E402
+from lib.storage import FileStore, RedisRESTStore  # noqa: E402
+
+
+class FakeRedis:
+    """The handful of Redis commands the store sends, with expiry."""
+
+    def __init__(self):
+        self.values = {}
+        self.expires = {}
+
+    def _live(self, key):
+        if key in self.expires and self.expires[key] < time.time():
+            self.values.pop(key, None)
+            self.expires.pop(key, None)
+        return key in self.values
+
+    def run(self, command, *args):
+        if command == 'GET':
+            return self.values[args[0]] if self._live(args[0]) else None
+        if command == 'SET':
+            key, value, options = args[0], args[1], list(args[2:])
+            if 'NX' in options and self._live(key):
+                return None
+            self.values[key] = value
+            self.expires.pop(key, None)
+            if 'PX' in options:
+                self.expires[key] = time.time() + int(options[options.index('PX') + 1]) / 1000
+            return 'OK'
+        if command == 'DEL':
+            return int(self.values.pop(args[0], None) is not None)
+        if command == 'HSET':
+            self._live(args[0])
+            self.values.setdefault(args[0], {})[args[1]] = args[2]
+            return 1
+        if command == 'HGETALL':
+            fields = self.values.get(args[0], {}) if self._live(args[0]) else {}
+            return [item for pair in fields.items() for item in pair]
+        if command == 'HDEL':
+            fields = self.values.get(args[0], {})
+            return sum(fields.pop(field, None) is not None for field in args[1:])
+        if command == 'PEXPIRE':
+            self.expires[args[0]] = time.time() + int(args[1]) / 1000
+            return 1
+        raise ValueError(command)
+
+
+@pytest.fixture
+def redis_url():
+    redis = FakeRedis()
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            assert self.path == '/pipeline'
+            assert self.headers['Authorization'] == 'Bearer token'
+            commands = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+            body = json.dumps([{'result': redis.run(*command)} for command in commands]).encode()
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture(params=['redis', 'file'])
+def store(request, tmp_path, monkeypatch):
+    monkeypatch.delenv('VERCEL', raising=False)
+    if request.param == 'redis':
+        return RedisRESTStore(request.getfixturevalue('redis_url'), 'token')
+    return FileStore(str(tmp_path))
+
+
+def test_values_expire_and_set_nx_claims_once(store):
+    assert store.set('lock', {'owner': 'a'}, ttl=0.2, nx=True)
+    assert not store.set('lock', {'owner': 'b'}, ttl=0.2, nx=True)
+    assert store.get('lock') == {'owner': 'a'}
+    time.sleep(0.3)
+    assert store.get('lock') is None
+    assert store.set('lock', {'owner': 'b'}, nx=True)
+
+
+def test_large_values_round_trip_and_hashes(store):
+    big = [{'market': 'player_points', 'roi': i / 7} for i in range(2000)]
+    store.set('big', big)
+    assert store.get('big') == big
+
+    store.hset('metrics', 'fn-1', {'count': 1})
+    store.hset('metrics', 'fn-2', {'count': 2})
+    store.hdel('metrics', 'fn-1')
+    assert store.hgetall('metrics') == {'fn-2': {'count': 2}}
+
+
+def test_results_saved_by_one_function_page_from_another(store):
+    opportunities = [{'market': 'h2h', 'roi': 3 - i / 100, 'bets': []} for i in range(120)]
+    scan_id = ResultStore(store=store).save(opportunities)
+
+    # A separate function: nothing in memory, only the shared store
+    page = ResultStore(store=store).page(scan_id, limit=50)
+    assert len(page['opportunities']) == 50
+    last = ResultStore(store=store).page(scan_id, cursor=page['next_cursor'], limit=100)
+    assert len(last['opportunities']) == 70
+    assert last['next_cursor'] is None
+
+
+def test_file_store_is_not_shared_on_vercel(tmp_path, monkeypatch):
+    monkeypatch.setenv('VERCEL', '1')
+    assert not FileStore(str(tmp_path)).shared
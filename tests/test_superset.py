@@ -0,0 +1,56 @@
+"""/api/scan fetches every supported bookmaker once and filters each request's subset."""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'api'))
+
+import scan as scan_endpoint  # noqa: E402
+from lib import planner, storage  # noqa: E402
+from lib.cache import TTLCache  # noqa: E402
+from lib.planner import SUPERSET_BOOKMAKERS  # noqa: E402
+from lib.storage import FileStore  # noqa: E402
+
+
+def book(key, title, home, away):
+    return {'key': key, 'title': title, 'markets': [{'key': 'h2h', 'outcomes': [
+        {'name': 'Home', 'price': home}, {'name': 'Away', 'price': away}]}]}
+
+
+class FakeClient:
+    calls = []
+
+    def __init__(self):
+        self.remaining_credits = '100'
+        self.coalesced_calls = 0
+        self.skipped = {}
+
+    def get_sports_odds(self, sport_key, bookmakers=None, markets=None):
+        self.calls.append(bookmakers)
+        return {'remaining': '100', 'data': [{
+            'id': 'e1', 'sport_key': sport_key, 'home_team': 'Home', 'away_team': 'Away',
+            'commence_time': '2099-01-01T00:00:00Z',
+            'bookmakers': [book('draftkings', 'DraftKings', 150, -200), book('fanduel', 'FanDuel', -200, 150),
+                           book('betmgm', 'BetMGM', -200, 170)]
+        }]}
+
+
+def test_two_subsets_share_one_upstream_fetch(tmp_path, monkeypatch):
+    monkeypatch.setenv('SUPERSET_FETCH', '1')
+    monkeypatch.setattr(storage, '_store', FileStore(str(tmp_path)))
+    monkeypatch.setattr(planner, 'odds_cache', TTLCache('odds', ttl=60, store=FileStore(str(tmp_path))))
+    monkeypatch.setattr(scan_endpoint, 'APIClient', FakeClient)
+    client = scan_endpoint.app.test_client()
+
+    scans = {}
+    for subset in (['draftkings', 'fanduel'], ['draftkings', 'betmgm']):
+        response = client.post('/api/scan', json={'sport_key': 'basketball_nba', 'bookmakers': subset,
+                                                   'include_props': False})
+        assert response.status_code == 200, response.get_json()
+        scans[subset[1]] = response.get_json()
+
+    assert FakeClient.calls == [SUPERSET_BOOKMAKERS]
+    assert scans['betmgm']['requests']['saved_by_reason'] == {'cache': 1}
+    # Each request only sees (and bets at) its own bookmakers
+    assert {b['bookmaker'] for b in scans['fanduel']['opportunities'][0]['bets']} == {'DraftKings', 'FanDuel'}
+    assert {b['bookmaker'] for b in scans['betmgm']['opportunities'][0]['bets']} == {'DraftKings', 'BetMGM'}
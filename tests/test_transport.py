@@ -0,0 +1,75 @@
+"""Recording upstream exchanges and replaying them offline."""
+
+import os
+import socket
+import sys
+
+import pytest
+import requests
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'api'))
+
+from lib.api_client import APIClient, APIError  # noqa: E402
+from lib.transport import CorpusMissError, RecordingTransport, ReplayTransport  # noqa: E402
+
+URL = 'https://api.the-odds-api.com/v4/sports/basketball_nba/odds/'
+# Not valid UTF-8 on purpose: replay must not re-encode the body
+BODIES = [b'[{"id":"e1","price":-110}]', b'[{"id":"e1","price":-105}]\xff\x00']
+
+
+class LiveSession:
+    """Stands in for the network while recording."""
+
+    def __init__(self):
+        self.sent = []
+
+    def get(self, url, params=None, **kwargs):
+        self.sent.append(dict(params))
+        response = requests.Response()
+        response.status_code = 200
+        response._content = BODIES[min(len(self.sent) - 1, len(BODIES) - 1)]
+        response.headers['x-requests-remaining'] = str(500 - len(self.sent))
+        response.headers['Content-Type'] = 'application/json'
+        return response
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def no_network(monkeypatch):
+    def refuse(*args, **kwargs):
+        raise AssertionError('replay touched the network')
+    monkeypatch.setattr(socket.socket, 'connect', refuse)
+    monkeypatch.setattr(requests.Session, 'send', refuse)
+
+
+def test_replay_serves_recorded_exchanges_byte_for_byte(tmp_path, no_network):
+    live = LiveSession()
+    recorder = RecordingTransport(str(tmp_path), session=live)
+    params = {'markets': 'h2h', 'bookmakers': 'draftkings'}
+    recorded = [recorder.get(URL, params=dict(params, apiKey='secret'), timeout=5) for _ in range(2)]
+    assert recorder.recorded == 2
+
+    # The API key is not part of the request's identity, nor written to the corpus
+    replay = ReplayTransport(str(tmp_path), timing=0)
+    replayed = [replay.get(URL, params=dict(params, apiKey='other'), timeout=5) for _ in range(3)]
+    for original, copy in zip(recorded, replayed):
+        assert copy.status_code == original.status_code
+        assert copy.content == original.content
+        assert copy.headers['x-requests-remaining'] == original.headers['x-requests-remaining']
+    # Served in recorded order, repeating the last
+    assert replayed[2].content == BODIES[1]
+    assert not any(b'secret' in path.read_bytes() for path in tmp_path.rglob('*.gz'))
+
+
+def test_replay_miss_fails_instead_of_fetching(tmp_path, no_network):
+    replay = ReplayTransport(str(tmp_path), timing=0)
+    with pytest.raises(CorpusMissError):
+        replay.get(URL, params={'markets': 'h2h'})
+    assert replay.misses == 1
+
+    client = APIClient(api_key='test', transport=replay)
+    with pytest.raises(APIError):
+        client.get_sports_odds('basketball_nba', bookmakers='draftkings')
+    assert replay.misses == 2